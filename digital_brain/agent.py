@@ -14,8 +14,10 @@ from .agents.retriever import context_retriever
 from .agents.writer import write_agent
 from .agents.executor import executor_agent
 from .agents.response import response_agent
-from .tools.utils import retry_generator
+from .tools.utils import Stage, retry_generator, run_stage_graph
 from .callbacks.context_cleaner import clean_context_after_write
+from .tools.mcp_client import MCPClientPlugin
+from .services.schema_setup import SchemaSetupPlugin
 
 async def consume_generator(gen):
     """Helper to drive an async generator to completion in the background."""
@@ -27,6 +29,11 @@ async def consume_generator(gen):
 
 from pydantic import ConfigDict
 
+# Per-stage timeouts (seconds) for the pre-retrieval stage graph
+RESOLVE_ENTITIES_TIMEOUT = 30
+CORE_ENTITIES_TIMEOUT = 15
+EMBEDDING_TIMEOUT = 10
+
 class DigitalBrainOrchestrator(BaseAgent):
     model_config = ConfigDict(extra="allow")
     
@@ -88,6 +95,11 @@ class DigitalBrainOrchestrator(BaseAgent):
         print(f"DEBUG: Previous Context (already written): {len(previous_buffer)} items")
         print(f"DEBUG: Current Thoughts (new): {len(current_buffer)} items")
 
+        # Turns evicted from the event window survive as a rolling summary (already saved)
+        history_summary = ctx.session.state.get("history_summary")
+        if history_summary:
+            previous_buffer = [history_summary] + previous_buffer
+
         # Previous context for reference (read-only, already saved)
         ctx.session.state["previous_context"] = "\n".join(previous_buffer) if previous_buffer else "(No previous context)"
         
@@ -100,17 +112,44 @@ class DigitalBrainOrchestrator(BaseAgent):
         ctx.session.state["thought_buffer_context"] = "\n".join(full_context)
         
 
+        # Revalidate the core entity snapshot in the background while routing runs
+        from .services.core_entity_service import core_entity_snapshot
+        core_entity_snapshot.prefetch()
+
         # 1. Run Router
-        async for event in router_agent.run_async(ctx):
-             yield event
+        # Obvious fillers (SKIP) and long structured entries (WRITE) are routed
+        # locally; everything else goes to router_agent
+        from .services.fast_router import fast_route
+        fast_decision = fast_route(current_thoughts_list)
+        speculation = None
+        if fast_decision:
+            ctx.session.state["routing_decision"] = fast_decision
+            print(f"⚡ FAST ROUTE: {fast_decision['route']} (router_agent skipped)")
+        else:
+            # Opt-in: start entity extraction while the router decides
+            from .services.speculation import SPECULATIVE_EXTRACTION, SpeculativeExtraction
+            if SPECULATIVE_EXTRACTION:
+                speculation = SpeculativeExtraction(entity_extractor, ctx).start()
+            
+            try:
+                async for event in router_agent.run_async(ctx):
+                     yield event
+            except BaseException:
+                if speculation:
+                    speculation.discard()
+                raise
         
         # 2. Handle Decision
         decision = ctx.session.state.get("routing_decision")
+        route = decision.get("route") if decision else None
+        if speculation and route != "WRITE":
+            speculation.discard()
+            speculation = None
+        
         if not decision:
             print("ERROR: No routing decision found.")
             return
 
-        route = decision.get("route")
         print(f"🔀 ROUTER DECISION: {route}")
 
         if route == "SKIP":
@@ -133,35 +172,76 @@ class DigitalBrainOrchestrator(BaseAgent):
             )
             
             # Step 1: Extract Entities (Pure LLM)
-            async for event in entity_extractor.run_async(ctx):
-                yield event
+            # Replay the speculative run if there is one, otherwise extract now
+            speculative_events = await speculation.commit() if speculation else None
+            if speculative_events is not None:
+                for event in speculative_events:
+                    yield event
+            else:
+                speculation = None
+                async for event in entity_extractor.run_async(ctx):
+                    yield event
             
-            # Step 1.5: DETERMINISTIC ENTITY RESOLUTION (Phase 1)
-            # Check which entities already exist in Neo4j BEFORE Retriever runs
+            # Steps 1.5 + 1.6: PRE-RETRIEVAL STAGE GRAPH
+            # Entity resolution (Phase 1: which entities already exist in Neo4j)
+            # and core entity lookup (Phase 0: Heavy Nodes grouped by label,
+            # served from the in-memory snapshot) are independent, so they run
+            # concurrently; a failure or timeout in one leaves the other intact.
+            from .services.entity_resolver import resolve_entities
+            from .services.core_entity_service import get_core_entities_cached
             entity_output = ctx.session.state.get("entity_output", {})
+            
+            async def resolve_stage():
+                if speculation and speculation.resolution is not None and speculation.entity_output == entity_output:
+                    return speculation.resolution
+                return await resolve_entities(entity_output) if entity_output else None
+            
+            # Journal text and search_query are embedded together in one
+            # batched call (content-hash cache; retries reuse the vectors)
+            from .services.embedding_cache import get_embedding_service
+            embedder = get_embedding_service()
+            
+            async def embed_stage():
+                texts = [ctx.session.state["thought_for_journal_entry"]]
+                if entity_output.get("search_query"):
+                    texts.append(entity_output["search_query"])
+                vectors = await embedder.embed_many(texts)
+                print(f"🧮 EMBEDDINGS: {embedder.stats()}")
+                return {"journal": vectors[0], "search": vectors[1] if len(vectors) > 1 else None}
+            
+            stages = {
+                "resolve_entities": Stage(resolve_stage, timeout=RESOLVE_ENTITIES_TIMEOUT),
+                "core_entities": Stage(get_core_entities_cached, timeout=CORE_ENTITIES_TIMEOUT, default={}),
+            }
+            if embedder:
+                stages["embeddings"] = Stage(embed_stage, timeout=EMBEDDING_TIMEOUT, default={})
+            stage_results = await run_stage_graph(stages)
+            
+            resolution = stage_results["resolve_entities"]
             if entity_output:
-                try:
-                    from .services.entity_resolver import resolve_entities
-                    resolution = await resolve_entities(entity_output)
-                    ctx.session.state["existing_entities"] = resolution.get("existing_entities", [])
-                    ctx.session.state["new_entities"] = resolution.get("new_entities", [])
-                    print(f"🔍 ENTITY RESOLUTION: {len(resolution.get('existing_entities', []))} existing, {len(resolution.get('new_entities', []))} new")
-                except Exception as e:
-                    print(f"⚠️ Entity resolution failed: {e}")
-                    ctx.session.state["existing_entities"] = []
-                    ctx.session.state["new_entities"] = []
-            
-            # Step 1.6: CORE ENTITY LOOKUP (Phase 0)
-            # Load ALL Heavy Nodes grouped by label for Retriever and Writer
-            ctx.session.state["potential_core_entities"] = {}
-            try:
-                from .services.core_entity_service import get_all_core_entities
-                core_entities = await get_all_core_entities()
-                ctx.session.state["potential_core_entities"] = core_entities
-            except Exception as e:
-                print(f"⚠️ Core Entity Lookup failed: {e}")
+                ctx.session.state["existing_entities"] = (resolution or {}).get("existing_entities", [])
+                ctx.session.state["new_entities"] = (resolution or {}).get("new_entities", [])
+                print(f"🔍 ENTITY RESOLUTION: {len(ctx.session.state['existing_entities'])} existing, {len(ctx.session.state['new_entities'])} new")
+            ctx.session.state["potential_core_entities"] = stage_results["core_entities"] or {}
+            embeddings = stage_results.get("embeddings") or {}
                 
             # Step 2: Retrieve Context from DB (MCP - Network sensitive)
+            # Hybrid search (vector + entity history) runs deterministically in
+            # one query; context_retriever gets it ready-made and only has to
+            # detect duplicates
+            from .services.hybrid_retrieval import retrieve_context
+            try:
+                retrieval = await retrieve_context(
+                    entity_output.get("search_query"),
+                    ctx.session.state.get("existing_entities", []),
+                    ctx.session.state.get("new_entities", []),
+                    embedding=embeddings.get("search")
+                )
+                ctx.session.state["retrieved_context"] = retrieval["context"]
+            except Exception as e:
+                print(f"⚠️ Hybrid retrieval failed: {e}")
+                ctx.session.state["retrieved_context"] = "(Retrieval failed: fetch entity history with a tool call if needed)"
+            
             # Pass accumulated findings to retriever
             ctx.session.state["previous_findings"] = ctx.session.state.get("accumulated_context", [])
             
@@ -175,23 +255,105 @@ class DigitalBrainOrchestrator(BaseAgent):
                 accumulated.append({"turn": current_time, "findings": new_context})
                 ctx.session.state["accumulated_context"] = accumulated[-10:]  # Keep last 10 turns
                 
-            # Step 3: Write Queries (Pure LLM)
-            async for event in write_agent.run_async(ctx):
-                yield event
+            # Step 3: Write Queries
+            # Deterministic compiler for schema-conformant extractions,
+            # write_agent (LLM) for anything it cannot express
+            from .services.cypher_compiler import compile_queries
+            compiled = None
+            try:
+                compiled = compile_queries(
+                    ctx.session.state.get("entity_output", {}),
+                    ctx.session.state.get("existing_entities", []),
+                    ctx.session.state["thought_for_journal_entry"],
+                    current_time,
+                    ctx.session.state.get("context_output"),
+                    embedding=embeddings.get("journal")
+                )
+            except Exception as e:
+                print(f"⚠️ Cypher compiler failed, using write_agent: {e}")
+            if compiled:
+                ctx.session.state["queries_output"] = compiled
+            else:
+                async for event in write_agent.run_async(ctx):
+                    yield event
             
             # Step 4: Execute Queries (MCP - Network sensitive)
-            async for event in retry_generator(lambda: executor_agent.run_async(ctx), max_retries=4, initial_delay=5):
-                yield event
+            # Deterministic executor first (one transaction, sanitizer checks
+            # as pre-flight); executor_agent only if pre-flight declines the
+            # turn or nothing could be sent (a partial failure is not replayed)
+            from .services.query_executor import execute_queries
+            executor_reply = ""
+            execution = None
+            try:
+                execution = await execute_queries(
+                    ctx.session.state.get("queries_output") or {},
+                    journal_text=ctx.session.state.get("thought_for_journal_entry")
+                )
+            except Exception as e:
+                print(f"⚠️ Direct executor failed: {e}")
+            executed_ids = []
+            if execution is not None:
+                executed_ids = execution["node_ids"]
+            else:
+                async for event in retry_generator(lambda: executor_agent.run_async(ctx), max_retries=4, initial_delay=5):
+                    if event.author == executor_agent.name and event.content and event.content.parts:
+                        executor_reply = "".join(part.text or "" for part in event.content.parts) or executor_reply
+                    yield event
+            
+            # IDs touched this turn: resolved entities, IDs referenced by the
+            # generated Cypher and nodes the executor reports as created
+            from .services.degree_service import extract_created_ids, extract_node_ids, refresh_degrees
+            from .services.job_queue import job_queue
+            queries = (ctx.session.state.get("queries_output") or {}).get("queries", [])
+            touched_ids = list(dict.fromkeys(
+                [e.get("id") for e in ctx.session.state.get("existing_entities", [])]
+                + extract_node_ids(queries)
+                + extract_created_ids(executor_reply)
+                + (ctx.session.state.get("queries_output") or {}).get("node_ids", [])
+                + executed_ids
+            ))
+            
+            # executor_agent writes bypass the direct executor's invalidation
+            if execution is None:
+                from .services.history_cache import history_cache
+                history_cache.invalidate_for_write(queries, touched_ids)
+            
+            # Maintain materialized degree on touched nodes in the background
+            # (coalesced across turns); the job marks the core snapshot stale
+            # again once the new degrees are in
+            try:
+                job = job_queue.submit("degree_refresh", refresh_degrees, node_ids=touched_ids)
+                print(f"📐 DEGREE: refresh {job.state} for {len(touched_ids)} nodes")
+            except Exception as e:
+                print(f"⚠️ Degree refresh scheduling failed: {e}")
+            
+            from .services.core_entity_service import mark_core_entities_stale
+            mark_core_entities_stale()
+            
+            # Keep the in-process fuzzy name index current with names just written
+            from .services.name_index import name_index
+            name_index.invalidate_for_write(queries)  # Merge commands delete nodes by name
+            name_index.mark_pending([
+                e.get("name") for e in ctx.session.state.get("new_entities", [])
+                if e.get("type") in name_index.labels
+            ])
             
             # Step 5.5: POST-WRITE REFLEX LOOP (Phase 3)
-            # Check for duplicates that slipped through and auto-merge them
+            # Check the nodes touched this turn for duplicates that slipped
+            # through and auto-merge them (full scan runs as a scheduled job).
+            # Runs in the background job queue: the reply does not depend on it,
+            # and rapid consecutive turns are coalesced into one check.
             try:
                 from .services.consistency_checker import run_consistency_check
-                consistency_result = await run_consistency_check()
-                if consistency_result.get("merged", 0) > 0:
-                    print(f"🔄 REFLEX LOOP: Merged {consistency_result['merged']} duplicates, created {consistency_result['aliases_created']} aliases")
+                job = job_queue.submit(
+                    "consistency_check",
+                    run_consistency_check,
+                    node_ids=touched_ids,
+                    names=[e.get("name") for e in ctx.session.state.get("new_entities", [])]
+                )
+                print(f"🔄 REFLEX LOOP: consistency check {job.state} ({job.triggers} triggers queued)")
             except Exception as e:
-                print(f"⚠️ Consistency check failed: {e}")
+                print(f"⚠️ Consistency check scheduling failed: {e}")
             
             # Step 6: Final Psychologist Response
             async for event in response_agent.run_async(ctx):
@@ -230,5 +392,7 @@ app = App(
     root_agent=root_agent,
     plugins=[
         ReflectAndRetryToolPlugin(max_retries=3),
+        MCPClientPlugin(),  # Releases pooled MCP connections on runner shutdown
+        SchemaSetupPlugin(),  # Creates service indexes once, off the read path
     ],
 )
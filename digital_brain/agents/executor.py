@@ -1,13 +1,14 @@
 from google.adk.agents.llm_agent import LlmAgent
 from ..tools.neo4j_toolkit import full_access_toolset
 from ..callbacks.combined_tool_callbacks import combined_after_tool_callback
+from ..callbacks.read_projection import project_reads_before_tool
 from ..callbacks.query_sanitizer import query_sanitizer_callback
 
 executor_agent = LlmAgent(
     model="gemini-3-flash-preview",
     name="executor_agent",
     include_contents='none',
-    before_tool_callback=query_sanitizer_callback,
+    before_tool_callback=[query_sanitizer_callback, project_reads_before_tool],
     after_tool_callback=combined_after_tool_callback,
     instruction="""
     You are an execution agent for the Digital Brain.
@@ -22,7 +23,9 @@ executor_agent = LlmAgent(
 
     **Rules:**
     - Execute queries in order
-    - For JournalEntry creation, use embed_text parameter with the content
+    - If `params` is present, pass `params[i]` as the params of `queries[i]`
+    - If `embed_texts` is present, pass `embed_texts[i]` (when not null) as embed_text of `queries[i]`
+    - Otherwise, for JournalEntry creation, use embed_text parameter with the content
     - On error: retry once, then report failure
     - Return created node IDs
 
@@ -28,6 +28,8 @@ entity_extractor = LlmAgent(
     If CURRENT THOUGHTS contains multiple dated journal entries (e.g., "24/11/18 ... 05/12/18 ..."), 
     you MUST extract each as a SEPARATE entry in the `entries` list.
     Each entry should have its own `entry_date`, `mood`, `entities`, and `events`.
+    If an entry opens with a marker like "[#3]", set its `section` to 3 (entries that
+    share a date are still separate entries).
 
     **For Each Entry, Extract:**
     1. **entry_date** - The date of that specific journal entry (convert to YYYY-MM-DD format)
@@ -37,6 +39,15 @@ entity_extractor = LlmAgent(
        - `timestamp`: When the event happened (YYYY-MM-DD)
        - `source_date`: The journal entry date this event was written about
        - `is_clarified`: False if date is vague
+    5. **relationships** - Relationships between the entities/events of THAT entry
+       (`source` and `target` are entity names, or an event's `type`):
+       - `EXPERIENCED`: Person → State (another person's emotional state; the user's
+         own mood goes into `mood`, not into a State entity)
+       - `PARTICIPATED`: Person → Event
+       - `OWNS`: Person → Pet/Object, `WORKS_AT`: Person → Organization,
+         `LIVES_IN`: Person → Location, `LOCATED_AT`: Event → Location,
+         `RELATED_TO`: Topic → Topic
+       Every State entity needs an EXPERIENCED relationship from a Person.
 
     **Output Example (Multiple Entries):**
     {
@@ -1,12 +1,14 @@
 from google.adk.agents.llm_agent import LlmAgent
 from ..tools import read_only_toolset
 from ..callbacks.combined_tool_callbacks import combined_after_tool_callback
+from ..callbacks.read_projection import project_reads_before_tool
 from ..models.retriever_output import RetrieverOutput
 
 context_retriever = LlmAgent(
     model="gemini-3-flash-preview",
     name="context_retriever",
     include_contents='none',
+    before_tool_callback=project_reads_before_tool,
     after_tool_callback=combined_after_tool_callback,
     output_schema=RetrieverOutput,
     instruction="""
@@ -29,12 +31,17 @@ context_retriever = LlmAgent(
     - New: {new_entities}
     
     ---
-    ## TASK 1: FETCH CONTEXT
+    ## TASK 1: USE PRE-FETCHED CONTEXT
     
-    Query history for entities mentioned in current input:
-    - If ID is NOT "MISSING": `MATCH (e {id: $entity_id})-[r]-(j:JournalEntry) RETURN ...`
-    - If ID IS "MISSING": `MATCH (e) WHERE e.name = $entity_name AND NOT 'JournalEntry' IN labels(e) MATCH (e)-[r]-(j:JournalEntry) RETURN ...`
+    History was already retrieved by hybrid search (semantic match on the
+    current input + latest entries for each entity above), ranked by relevance
+    and recency:
+    {retrieved_context?}
     
+    Summarize what is relevant in `context_summary`. Do NOT re-query history
+    for these entities. Only if the text above says retrieval failed, fetch it:
+    ```cypher
+    MATCH (e {id: $entity_id})-[r]-(j:JournalEntry)
     RETURN e.name, j.content, j.timestamp
     ORDER BY j.timestamp DESC
     LIMIT 3
@@ -66,7 +73,7 @@ context_retriever = LlmAgent(
     
     ---
     ## RULES
-    - MAX 3 tool calls
+    - MAX 1 tool call (context is pre-fetched)
     - NEVER return `embedding` property
     - Always check for duplicates before outputting
     
@@ -58,7 +58,7 @@ write_agent = LlmAgent(
     MATCH (keep {id: $keep_id})
     MATCH (remove) WHERE remove.name = $remove_name AND id(keep) <> id(remove) AND NOT 'JournalEntry' IN labels(remove)
     MERGE (a:Alias {from_name: remove.name, to_name: keep.name})
-    SET a.canonical_id = keep.id
+    SET a.canonical_id = keep.id, a.created_at = datetime()
     DETACH DELETE remove
     ```
     
@@ -67,7 +67,7 @@ write_agent = LlmAgent(
     ```cypher
     MATCH (keep {id: $keep_id})
     MERGE (a:Alias {from_name: $remove_name, to_name: keep.name})
-    SET a.canonical_id = keep.id
+    SET a.canonical_id = keep.id, a.created_at = datetime()
     ```
     This preserves data integrity — duplicates can be cleaned later manually.
     
@@ -85,7 +85,7 @@ write_agent = LlmAgent(
     | Location | id, name | type (City/Country) |
     | Pet | id, name | species, breed |
     | Object | id, name | type, description |
-    | JournalEntry | id, content, timestamp, mood | - |
+    | JournalEntry | id, content, timestamp, mood | embedding |
     
     ### Relationships:
     | Relationship | From → To |
@@ -97,6 +97,9 @@ write_agent = LlmAgent(
     | OWNS | Person → Pet/Object |
     | WORKS_AT | Person → Organization |
     
+    JournalEntry: `CREATE (j:JournalEntry {id: randomUUID(), ...}) SET j.embedding = $embedding RETURN j.id AS id`
+    ($embedding is filled by the server from the journal content; return the id of every node you create)
+
     ---
     ## DUPLICATE PREVENTION
     
@@ -6,7 +6,7 @@ Prevents context overflow when Neo4j returns full node objects with embeddings.
 from google.adk.tools.tool_context import ToolContext
 from google.adk.tools.base_tool import BaseTool
 from typing import Optional, Dict, Any
-from copy import deepcopy
+from .response_transformer import transform_response
 
 
 def strip_embeddings_after_tool(
@@ -28,24 +28,10 @@ def strip_embeddings_after_tool(
         Modified tool_response without embedding fields, or None if no changes.
     """
     
-    def remove_embeddings(obj: Any) -> Any:
-        """Recursively remove 'embedding' keys from nested structures."""
-        if isinstance(obj, dict):
-            return {k: remove_embeddings(v) for k, v in obj.items() 
-                    if k.lower() != 'embedding'}
-        elif isinstance(obj, list):
-            return [remove_embeddings(item) for item in obj]
-        else:
-            return obj
-    
-    # Check if response contains any embedding data
-    response_str = str(tool_response)
-    if 'embedding' not in response_str.lower():
+    cleaned_response, _ = transform_response(tool_response, decode_unicode=False)
+    if cleaned_response is tool_response:
         return None  # No embeddings, return original
     
-    # Strip embeddings from response
-    cleaned_response = remove_embeddings(deepcopy(tool_response))
-    
     agent_name = tool_context.agent_name
     print(f"[EmbeddingFilter] Agent '{agent_name}' - Stripped embeddings from '{tool.name}' response")
     
@@ -0,0 +1,146 @@
+# File: digital_brain/callbacks/offload.py
+"""
+Size-threshold offload for after-tool processing.
+Regex passes over multi-megabyte strings and dict rebuilding run on the
+event loop and stall every other session in the process. Responses are
+routed by estimated size:
+
+- below OFFLOAD_THRESHOLD_BYTES: processed inline (no hand-off cost)
+- above it: a bounded thread pool (the loop keeps getting the GIL every
+  switch interval instead of being blocked for the whole pass)
+- above PROCESS_THRESHOLD_BYTES: a process pool (true parallelism, worth
+  the pickling cost only for very large payloads)
+
+loop_lag measures how late the event loop wakes up (scheduled vs actual
+time of a periodic sleep), so the effect is visible in production.
+
+Configuration: DIGITAL_BRAIN_OFFLOAD_BYTES, DIGITAL_BRAIN_PROCESS_OFFLOAD_BYTES
+(0 disables the process pool), DIGITAL_BRAIN_OFFLOAD_THREADS.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional
+from .response_transformer import transform_response
+
+OFFLOAD_THRESHOLD_BYTES = int(os.getenv("DIGITAL_BRAIN_OFFLOAD_BYTES", 256 * 1024))
+PROCESS_THRESHOLD_BYTES = int(os.getenv("DIGITAL_BRAIN_PROCESS_OFFLOAD_BYTES", 8 * 1024 * 1024))
+THREAD_WORKERS = int(os.getenv("DIGITAL_BRAIN_OFFLOAD_THREADS", 2))
+PROCESS_WORKERS = 1
+MAX_IN_FLIGHT = THREAD_WORKERS * 2  # Offloaded jobs queued or running at once
+
+LAG_INTERVAL = 0.05  # seconds between loop lag probes
+LAG_SAMPLES = 1200  # rolling window (~1 minute)
+
+offload_stats = {"inline": 0, "thread": 0, "process": 0}
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def estimate_size(obj: Any, limit: int) -> int:
+    """Approximate payload size in bytes; stops counting once `limit` is reached."""
+    size, stack = 0, [obj]
+    while stack and size < limit:
+        item = stack.pop()
+        if isinstance(item, str):
+            size += len(item)
+        elif isinstance(item, dict):
+            size += 8 * len(item)
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        else:
+            size += 8
+    return size
+
+
+def _transform_in_process(response: Any) -> tuple[Any, dict[str, int]]:
+    """Process pool entry point: an unchanged response is not sent back (None)."""
+    result, changes = transform_response(response)
+    return (None if result is response else result), changes
+
+
+def _executor(kind: str) -> Executor:
+    global _thread_pool, _process_pool
+    if kind == "process":
+        if _process_pool is None:
+            # spawn: forking a process that runs threads and an event loop is unsafe
+            _process_pool = ProcessPoolExecutor(PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(THREAD_WORKERS, thread_name_prefix="tool-response")
+    return _thread_pool
+
+
+async def transform_response_offloaded(response: Any) -> tuple[Any, dict[str, int]]:
+    """
+    transform_response(), run inline or in a worker pool depending on size.
+    Returns the same (response, changes) tuple.
+    """
+    global _slots, _slots_loop
+    loop_lag.ensure_started()
+    size = estimate_size(response, max(OFFLOAD_THRESHOLD_BYTES, PROCESS_THRESHOLD_BYTES))
+    if size < OFFLOAD_THRESHOLD_BYTES:
+        offload_stats["inline"] += 1
+        return transform_response(response)
+
+    kind = "process" if PROCESS_THRESHOLD_BYTES and size >= PROCESS_THRESHOLD_BYTES else "thread"
+    if _slots is None or _slots_loop is not asyncio.get_running_loop():
+        _slots, _slots_loop = asyncio.Semaphore(MAX_IN_FLIGHT), asyncio.get_running_loop()
+    worker = _transform_in_process if kind == "process" else transform_response
+    async with _slots:
+        offload_stats[kind] += 1
+        result, changes = await asyncio.get_running_loop().run_in_executor(_executor(kind), worker, response)
+    return (response if result is None else result), changes
+
+
+class LoopLagMonitor:
+    """
+    Periodic probe of event loop responsiveness.
+    """
+
+    def __init__(self, interval: float = LAG_INTERVAL, samples: int = LAG_SAMPLES):
+        self.interval = interval
+        self._lags: deque[float] = deque(maxlen=samples)
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self) -> None:
+        """Start probing on the running loop (restarted if the loop changed)."""
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            scheduled = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self._lags.append(max(0.0, time.perf_counter() - scheduled))
+
+    def reset(self) -> None:
+        self._lags.clear()
+
+    def metrics(self) -> dict[str, float]:
+        """Loop lag over the rolling window, in milliseconds."""
+        if not self._lags:
+            return {"samples": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        lags = sorted(self._lags)
+        return {
+            "samples": len(lags),
+            "p50_ms": round(lags[len(lags) // 2] * 1000, 1),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 1),
+            "max_ms": round(lags[-1] * 1000, 1),
+        }
+
+
+# Process-wide singleton
+loop_lag = LoopLagMonitor()
@@ -12,6 +12,20 @@ from typing import Optional, Dict, Any
 logger = structlog.get_logger(__name__)
 
 
+# Pattern: MATCH (x {id: "MISSING"}) or MATCH (x) WHERE x.id = "MISSING"
+MISSING_ID_PATTERNS = [
+    re.compile(r'\{id:\s*["\']MISSING["\']\}', re.IGNORECASE),  # {id: "MISSING"}
+    re.compile(r'\.id\s*=\s*["\']MISSING["\']', re.IGNORECASE),  # .id = "MISSING"
+]
+
+
+def is_unsafe_delete(query: str) -> bool:
+    """True for a DETACH DELETE that targets a node by the placeholder id "MISSING"."""
+    if "DETACH DELETE" not in query.upper():
+        return False
+    return any(p.search(query) for p in MISSING_ID_PATTERNS)
+
+
 async def query_sanitizer_callback(
     tool: BaseTool,
     args: Dict[str, Any],
@@ -42,15 +56,7 @@ async def query_sanitizer_callback(
     
     logger.info(f"[QuerySanitizer] ⚠️ DETACH DELETE detected: {query_preview}")
     
-    # Pattern: MATCH (x {id: "MISSING"}) or MATCH (x) WHERE x.id = "MISSING"
-    missing_id_patterns = [
-        r'\{id:\s*["\']MISSING["\']\}',  # {id: "MISSING"}
-        r'\.id\s*=\s*["\']MISSING["\']',  # .id = "MISSING"
-    ]
-    
-    has_missing_id = any(re.search(p, query, re.IGNORECASE) for p in missing_id_patterns)
-    
-    if not has_missing_id:
+    if not is_unsafe_delete(query):
         logger.info(f"[QuerySanitizer] ✅ PASS (no MISSING ID found, query is safe)")
         return None
     
@@ -1,46 +1,212 @@
 # File: digital_brain/callbacks/rate_limiter.py
 """
-Rate limiting callback for tool calls to prevent Gemini API rate limit errors.
+Rate limiting for tool calls to prevent Gemini API rate limit errors.
+
+Awaitable token buckets, one per key, shared by every session in the process:
+- "model:<model>": paces an agent's next LLM request after each tool result
+- "mcp:<endpoint>": paces requests to an MCP server
+
+A caller over quota awaits its own delay (asyncio.sleep), so only that
+caller is throttled; other sessions on the event loop keep running.
+Buckets reserve tokens in arrival order (the balance may go negative),
+which keeps waiting callers FIFO without a lock.
+
+Configuration: DIGITAL_BRAIN_RATE_LIMITS="model:*=4/5,mcp:*=10/20"
+(key pattern = tokens per second / burst size; exact keys win over patterns).
 """
+import asyncio
+import fnmatch
+import os
 import time
 from google.adk.tools.tool_context import ToolContext
 from google.adk.tools.base_tool import BaseTool
 from typing import Optional, Dict, Any
 
+DEFAULT_RATE_LIMITS = "model:*=4/5,mcp:*=10/20"
+
+
+def parse_rate_limits(spec: str) -> dict[str, tuple[float, float]]:
+    """'pattern=rate/burst,...' -> {pattern: (rate, burst)}; malformed rules are skipped."""
+    limits = {}
+    for rule in spec.split(","):
+        pattern, _, value = rule.strip().partition("=")
+        rate, _, burst = value.partition("/")
+        try:
+            limits[pattern.strip()] = (float(rate), float(burst or rate))
+        except ValueError:
+            if rule.strip():
+                print(f"⚠️ [RateLimiter] Ignoring malformed rate limit {rule.strip()!r}")
+    return limits
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens/s up to `burst` tokens.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self.queued = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now; returns the seconds the caller must wait for them."""
+        if self.rate <= 0:
+            return 0.0  # Unlimited
+        self._refill()
+        self._tokens -= tokens
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until tokens are available; returns the queueing delay in seconds."""
+        delay = self.reserve(tokens)
+        self.acquired += 1
+        if delay > 0:
+            self.delayed += 1
+            self.queued += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.queued -= 1
+            self.wait_total += delay
+            self.wait_max = max(self.wait_max, delay)
+        return delay
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "queued": self.queued,
+            "wait_total_ms": round(self.wait_total * 1000, 1),
+            "wait_avg_ms": round(self.wait_total * 1000 / self.delayed, 1) if self.delayed else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 1),
+        }
+
+
+class RateLimiterRegistry:
+    """
+    Process-wide token buckets by key ("model:<name>", "mcp:<url>").
+    """
+
+    def __init__(self, limits: Optional[dict[str, tuple[float, float]]] = None):
+        self.limits = limits if limits is not None else parse_rate_limits(
+            os.getenv("DIGITAL_BRAIN_RATE_LIMITS", DEFAULT_RATE_LIMITS)
+        )
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _limit_for(self, key: str) -> tuple[float, float]:
+        if key in self.limits:
+            return self.limits[key]
+        for pattern, limit in self.limits.items():
+            if fnmatch.fnmatchcase(key, pattern):
+                return limit
+        return (0.0, 1.0)  # No rule: unlimited
+
+    def bucket(self, key: str) -> TokenBucket:
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(*self._limit_for(key))
+        return self._buckets[key]
+
+    async def acquire(self, key: str, tokens: float = 1.0) -> float:
+        return await self.bucket(key).acquire(tokens)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Queueing-delay metrics per key."""
+        return {key: bucket.metrics() for key, bucket in self._buckets.items()}
+
+
+# Process-wide singleton
+rate_limits = RateLimiterRegistry()
+
+
+def mcp_endpoint(tool: BaseTool) -> Optional[str]:
+    """URL of the MCP server behind an ADK MCP tool (None for other tools)."""
+    session_manager = getattr(tool, "_mcp_session_manager", None)
+    return getattr(getattr(session_manager, "_connection_params", None), "url", None)
+
 
-def rate_limit_after_tool(
+# Session state key: id of the function call whose MCP request a before-tool
+# callback already sent through the direct client (charged in _post_rpc)
+MCP_PREPAID_CALL_KEY = "mcp_prepaid_call_id"
+
+
+def mark_mcp_prepaid(tool_context: ToolContext) -> None:
+    """Record that this call's MCP request was already charged to the mcp: bucket."""
+    tool_context.state[MCP_PREPAID_CALL_KEY] = tool_context.function_call_id
+
+
+def limiter_keys(tool: BaseTool, tool_context: ToolContext) -> list[str]:
+    """
+    Bucket keys a tool call counts against: the agent's model and the MCP
+    endpoint (unless the call's MCP request was already charged).
+    """
+    keys = []
+    agent = getattr(getattr(tool_context, "_invocation_context", None), "agent", None)
+    model = getattr(agent, "model", None)
+    model = model if isinstance(model, str) else getattr(model, "model", None)
+    if model:
+        keys.append(f"model:{model}")
+    url = mcp_endpoint(tool)
+    prepaid = tool_context.state.get(MCP_PREPAID_CALL_KEY)
+    if url and not (prepaid and prepaid == tool_context.function_call_id):
+        keys.append(f"mcp:{url}")
+    return keys
+
+
+async def throttle_tool_call(tool: BaseTool, tool_context: ToolContext) -> float:
+    """
+    Count the call in session state and wait for its rate limit tokens.
+
+    Returns:
+        Queueing delay in seconds (0.0 when under quota)
+    """
+    state = tool_context.state
+    call_count = state.get("tool_call_count", 0) + 1
+    state["tool_call_count"] = call_count
+
+    agent_name = tool_context.agent_name
+    print(f"[RateLimiter] Agent '{agent_name}' - Tool '{tool.name}' completed. Total calls: {call_count}")
+
+    keys = limiter_keys(tool, tool_context)
+    delays = await asyncio.gather(*(rate_limits.acquire(key) for key in keys))
+    delay = max(delays, default=0.0)
+    if delay > 0:
+        print(f"⏳ [RateLimiter] Waited {delay * 1000:.0f}ms for {', '.join(keys)} after {call_count} calls")
+    return delay
+
+
+async def rate_limit_after_tool(
     tool: BaseTool,
     args: Dict[str, Any],
     tool_context: ToolContext,
     tool_response: Dict
 ) -> Optional[Dict]:
     """
-    Rate limiting callback: adds delay after every N tool calls.
+    Rate limiting callback: waits (without blocking the event loop) when the
+    agent's model or the tool's MCP endpoint is over its rate limit.
     Attach this to agents that make many rapid tool calls (e.g., context_retriever, executor).
-    
+
     Args:
         tool: The tool that was executed
         args: Arguments passed to the tool
         tool_context: Context containing state and agent info
         tool_response: The result from the tool
-    
+
     Returns:
         None to keep original tool_response unchanged
     """
-    CALLS_BEFORE_DELAY = 5  # Add delay after every 5 calls
-    DELAY_SECONDS = 1.0     # Wait 1 second
-    
-    state = tool_context.state
-    
-    # Initialize or increment counter
-    call_count = state.get("tool_call_count", 0) + 1
-    state["tool_call_count"] = call_count
-    
-    agent_name = tool_context.agent_name
-    print(f"[RateLimiter] Agent '{agent_name}' - Tool '{tool.name}' completed. Total calls: {call_count}")
-    
-    if call_count % CALLS_BEFORE_DELAY == 0:
-        print(f"⏳ [RateLimiter] Sleeping {DELAY_SECONDS}s after {call_count} calls...")
-        time.sleep(DELAY_SECONDS)
-    
+    await throttle_tool_call(tool, tool_context)
     return None  # Return None to keep original tool_response
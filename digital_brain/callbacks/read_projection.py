@@ -0,0 +1,44 @@
+# File: digital_brain/callbacks/read_projection.py
+"""
+Before-tool callback that keeps embeddings out of read query results.
+Whole-node RETURNs in LLM-written read_neo4j_cypher calls are rewritten to
+embedding-free map projections (tools/projection_rewriter) and sent through
+the direct MCP client, which falls back to the original query if the
+rewrite is rejected. Queries that need no rewrite run through the tool as usual.
+
+The direct client charges the mcp: rate-limit bucket itself, so the call is
+marked as prepaid for throttle_tool_call. Transport errors come back as an
+isError tool response instead of aborting the agent run.
+"""
+from google.adk.tools.tool_context import ToolContext
+from google.adk.tools.base_tool import BaseTool
+from typing import Optional, Dict, Any
+from ..tools.mcp_client import DEFAULT_MCP_URL, _response_bytes, call_mcp_tool
+from ..tools.projection_rewriter import rewrite_projections
+from .rate_limiter import mark_mcp_prepaid, mcp_endpoint
+
+
+async def project_reads_before_tool(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: ToolContext
+) -> Optional[Dict[str, Any]]:
+    """
+    Before-tool callback for read_neo4j_cypher.
+
+    Returns:
+        The tool response of the projected query, or None to run the tool unchanged.
+    """
+    if tool.name != "read_neo4j_cypher" or not rewrite_projections(args.get("query") or ""):
+        return None
+
+    mark_mcp_prepaid(tool_context)  # _post_rpc charges the mcp: bucket
+    try:
+        response = await call_mcp_tool("read_neo4j_cypher", dict(args), url=mcp_endpoint(tool) or DEFAULT_MCP_URL)
+    except Exception as e:
+        print(f"⚠️ [ReadProjection] Projected read failed: {e}")
+        return {"isError": True, "content": [{"type": "text", "text": f"read_neo4j_cypher failed: {e}"}]}
+    received = _response_bytes(response)
+    tool_context.state["read_bytes"] = tool_context.state.get("read_bytes", 0) + received
+    print(f"[ReadProjection] Agent '{tool_context.agent_name}' - {received} bytes for '{tool.name}'")
+    return response
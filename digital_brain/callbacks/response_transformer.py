@@ -0,0 +1,108 @@
+# File: digital_brain/callbacks/response_transformer.py
+"""
+Single-pass tool response transformer.
+One traversal of a tool response that:
+1. Drops 'embedding' keys and replaces embedding arrays inside strings
+   (serialized Neo4j nodes) with a placeholder
+2. Decodes \\uXXXX escape runs and heals surrogate pairs (emoji)
+
+Only containers on the path to a changed value are copied; untouched
+subtrees and strings are shared with the input, and an unchanged response
+is returned as the same object.
+"""
+from itertools import islice
+import re
+from typing import Any
+
+EMBEDDING_KEY = "embedding"
+STRIPPED_VECTOR = '"embedding": [<stripped_vector>]'
+
+# `[^\]]*\]` matches exactly what a lazy `.*?\]` would, without backtracking
+_EMBEDDING_IN_STRING = re.compile(r"(?:\\?['\"])embedding(?:\\?['\"])\s*:\s*\[[^\]]*\]", re.IGNORECASE)
+_UNICODE_ESCAPES = re.compile(r"(?:\\u[0-9a-fA-F]{4})+")
+
+_DROP = object()
+
+
+def _decode_escapes(match: re.Match) -> str:
+    """Decode one run of \\uXXXX escapes; pairs become one character, lone surrogates U+FFFD."""
+    units = match.group(0).encode("ascii").decode("unicode_escape")
+    return units.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+class _Transformer:
+    def __init__(self, strip_embeddings: bool, decode_unicode: bool):
+        self.strip_embeddings = strip_embeddings
+        self.decode_unicode = decode_unicode
+        self.embeddings_stripped = 0
+        self.strings_decoded = 0
+
+    def string(self, value: str) -> str:
+        # Substring checks first: no regex runs on strings that cannot match
+        if self.strip_embeddings and ("mbedding" in value or "MBEDDING" in value):
+            value, count = _EMBEDDING_IN_STRING.subn(STRIPPED_VECTOR, value)
+            self.embeddings_stripped += count
+        if self.decode_unicode and "\\u" in value:
+            decoded = _UNICODE_ESCAPES.sub(_decode_escapes, value)
+            if decoded is not value:
+                self.strings_decoded += 1
+                value = decoded
+        return value
+
+    def value(self, obj: Any) -> Any:
+        if isinstance(obj, str):
+            return self.string(obj)
+        if isinstance(obj, dict):
+            return self.mapping(obj)
+        if isinstance(obj, (list, tuple)):
+            return self.sequence(obj)
+        return obj
+
+    def mapping(self, obj: dict) -> dict:
+        out = None
+        for i, (key, value) in enumerate(obj.items()):
+            if self.strip_embeddings and isinstance(key, str) and len(key) == 9 and key.lower() == EMBEDDING_KEY:
+                self.embeddings_stripped += 1
+                new = _DROP
+            else:
+                new = self.value(value)
+            if out is None:
+                if new is value:
+                    continue
+                out = dict(islice(obj.items(), i))  # Copy-on-first-change
+            if new is not _DROP:
+                out[key] = new
+        return obj if out is None else out
+
+    def sequence(self, obj):
+        out = None
+        for i, item in enumerate(obj):
+            new = self.value(item)
+            if out is None:
+                if new is item:
+                    continue
+                out = list(obj[:i])
+            out.append(new)
+        if out is None:
+            return obj
+        return tuple(out) if isinstance(obj, tuple) else out
+
+
+def transform_response(
+    response: Any,
+    strip_embeddings: bool = True,
+    decode_unicode: bool = True
+) -> tuple[Any, dict[str, int]]:
+    """
+    Transform a tool response in one pass.
+
+    Returns:
+        (response, {"embeddings_stripped": N, "strings_decoded": M});
+        the response is the input object itself when nothing changed
+    """
+    transformer = _Transformer(strip_embeddings, decode_unicode)
+    result = transformer.value(response)
+    return result, {
+        "embeddings_stripped": transformer.embeddings_stripped,
+        "strings_decoded": transformer.strings_decoded,
+    }
@@ -16,12 +16,24 @@ class ExtractedEvent(BaseModel):
     is_clarified: bool = Field(..., description="True if time is clear, False if needs clarification")
 
 
+class EntityRelationship(BaseModel):
+    """Relationship between two items of the same entry (graph schema section 2)."""
+    type: str = Field(..., description="EXPERIENCED, PARTICIPATED, OWNS, WORKS_AT, LIVES_IN, LOCATED_AT or RELATED_TO")
+    source: str = Field(..., description="Name of the source entity, or the type of the source event")
+    target: str = Field(..., description="Name of the target entity, or the type of the target event")
+
+
 class JournalEntryExtraction(BaseModel):
     """Represents extraction from a single dated journal entry."""
     entry_date: str = Field(..., description="Date of this specific journal entry (YYYY-MM-DD)")
     mood: str = Field(..., description="Emotional state for this entry")
     entities: List[Entity] = Field(default_factory=list, description="Entities mentioned in this entry")
     events: List[ExtractedEvent] = Field(default_factory=list, description="Events described in this entry")
+    relationships: List[EntityRelationship] = Field(
+        default_factory=list,
+        description="Person-anchored and other entity relationships stated in this entry"
+    )
+    section: Optional[int] = Field(None, description="N of the [#N] marker opening this entry, if the input has markers")
 
 
 class EntityOutput(BaseModel):
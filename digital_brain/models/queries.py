@@ -1,6 +1,14 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class QueriesOutput(BaseModel):
     queries: List[str] = Field(..., description="List of Cypher queries")
+
+
+class CompiledQueries(QueriesOutput):
+    """QueriesOutput produced by the deterministic Cypher compiler (not an LLM schema)."""
+    params: List[dict] = Field(default_factory=list, description="Parameters for each query, by position")
+    embed_texts: List[Optional[str]] = Field(default_factory=list, description="embed_text for each query, by position")
+    node_ids: List[str] = Field(default_factory=list, description="IDs of every node the queries write or link")
+    keys: Dict[str, str] = Field(default_factory=dict, description="Client-side temp key -> node id")
@@ -0,0 +1,159 @@
+# File: digital_brain/services/alias_index.py
+"""
+In-process Alias Index.
+Keeps learned name mappings (Alias nodes) in memory so entity resolution
+can answer alias hits without a network call.
+
+Loaded once with a full export, then kept current by:
+- add() when the consistency checker writes a new Alias
+- remove_canonical() when a merge deletes the node an alias points to
+- a watermark query on Alias.created_at for aliases written elsewhere
+  (e.g. by write_agent merge commands), run in the background
+- a full reload every ALIAS_RELOAD_INTERVAL, which drops deleted aliases
+
+The watermark is the server time of the last load/refresh (minus a small
+overlap), so an empty alias set does not force repeated full loads. The
+created_at index is a schema write: schema_setup creates it once at
+startup, never on this read path.
+"""
+
+import asyncio
+import time
+from typing import Optional
+from ..tools.mcp_client import execute_cypher
+from .text_matching import normalize_name
+
+# Seconds between background watermark refreshes
+ALIAS_REFRESH_INTERVAL = 60
+# Seconds between full reloads (evicts aliases deleted in the graph)
+ALIAS_RELOAD_INTERVAL = 600
+# Seconds re-read before the watermark, for aliases committed mid-query
+REFRESH_OVERLAP_SECONDS = 5
+
+# Range index so the watermark query is a seek, not a label scan
+ALIAS_CREATED_AT_INDEX = """
+CREATE INDEX alias_created_at IF NOT EXISTS FOR (a:Alias) ON (a.created_at)
+"""
+
+# Both queries return one row (also with no aliases) carrying the server time
+LOAD_ALIASES_QUERY = """
+OPTIONAL MATCH (a:Alias)
+WITH a ORDER BY a.created_at
+RETURN collect(a {.from_name, .to_name, .canonical_id}) AS aliases,
+       toString(datetime()) AS as_of
+"""
+
+REFRESH_ALIASES_QUERY = """
+OPTIONAL MATCH (a:Alias)
+WHERE a.created_at > datetime($since) - duration({seconds: $overlap})
+WITH a ORDER BY a.created_at
+RETURN collect(a {.from_name, .to_name, .canonical_id}) AS aliases,
+       toString(datetime()) AS as_of
+"""
+
+
+class AliasIndex:
+    """
+    Dictionary index: normalized alias name -> (canonical_id, to_name).
+    """
+
+    def __init__(self, refresh_interval: float = ALIAS_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._aliases: dict[str, tuple[str, str]] = {}
+        self._watermark: Optional[str] = None
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._last_load = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def lookup(self, name: str) -> Optional[tuple[str, str]]:
+        """Return (canonical_id, to_name) for a learned alias, or None."""
+        return self._aliases.get(normalize_name(name))
+
+    def add(self, from_name: str, to_name: str, canonical_id: str) -> None:
+        """Record an alias that was just written to the graph."""
+        if from_name and canonical_id:
+            self._aliases[normalize_name(from_name)] = (canonical_id, to_name)
+
+    def remove_canonical(self, canonical_ids: list[str]) -> int:
+        """Drop aliases pointing at deleted nodes; returns how many were dropped."""
+        gone = set(canonical_ids)
+        stale = [name for name, (canonical_id, _) in self._aliases.items() if canonical_id in gone]
+        for name in stale:
+            del self._aliases[name]
+        return len(stale)
+
+    @staticmethod
+    def _unpack(records: list[dict]) -> tuple[list[dict], Optional[str]]:
+        row = records[0] if records else {}
+        return row.get("aliases") or [], row.get("as_of")
+
+    async def load(self) -> None:
+        """Full load of all Alias nodes; replaces the index (drops deleted aliases)."""
+        aliases, as_of = self._unpack(await execute_cypher(LOAD_ALIASES_QUERY))
+        loaded: dict[str, tuple[str, str]] = {}
+        # Ordered by created_at, so the newest mapping wins
+        for r in aliases:
+            if r.get("from_name") and r.get("canonical_id"):
+                loaded[normalize_name(r["from_name"])] = (r["canonical_id"], r.get("to_name"))
+        self._aliases = loaded
+        self._watermark = as_of
+        self._loaded = True
+        self._last_refresh = self._last_load = time.monotonic()
+        print(f"🧠 Alias index loaded: {len(self._aliases)} aliases")
+
+    async def refresh(self) -> None:
+        """Pick up aliases created since the watermark; periodically reload in full."""
+        if self._watermark is None or time.monotonic() - self._last_load >= ALIAS_RELOAD_INTERVAL:
+            await self.load()
+            return
+        aliases, as_of = self._unpack(await execute_cypher(
+            REFRESH_ALIASES_QUERY, {"since": self._watermark, "overlap": REFRESH_OVERLAP_SECONDS}
+        ))
+        added = sum(1 for r in aliases if normalize_name(r.get("from_name") or "") not in self._aliases)
+        for r in aliases:
+            self.add(r.get("from_name"), r.get("to_name"), r.get("canonical_id"))
+        self._watermark = as_of or self._watermark
+        self._last_refresh = time.monotonic()
+        if added:
+            print(f"🧠 Alias index refreshed: +{added} aliases")
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"Alias index refresh failed: {e}")
+
+    async def ensure_fresh(self) -> bool:
+        """
+        Make sure the index is usable.
+        The first call loads the index inline; later calls only schedule a
+        background refresh when the interval has elapsed, so they never block.
+
+        Returns:
+            True if the index is loaded and can answer lookups
+        """
+        if not self._loaded:
+            try:
+                await self.load()
+            except Exception as e:
+                print(f"Alias index load failed: {e}")
+                return False
+            return True
+
+        stale = time.monotonic() - self._last_refresh >= self.refresh_interval
+        if stale and (self._refresh_task is None or self._refresh_task.done()):
+            self._last_refresh = time.monotonic()
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+        return True
+
+
+# Process-wide index shared by the resolver and the consistency checker
+alias_index = AliasIndex()
@@ -0,0 +1,364 @@
+# File: digital_brain/services/archive_import.py
+"""
+Bulk Import of Journal Archives.
+Streams a text / Markdown diary, splits it into dated entries and writes
+them to the graph without going through the chat loop:
+
+1. Split: a line starting with a date ("24/11/18", "24.11.2018",
+   "2018-11-24", optionally as a Markdown heading or bold) opens an entry
+2. Extract: chunks of entries go to entity_extractor concurrently,
+   bounded by a concurrency limit and a requests-per-minute limit
+3. Resolve: extractions are resolved in batches (resolve_entities uses the
+   in-process alias / name indexes); new Person / Pet names are added to
+   the name index right after each write so later batches link to them
+4. Write: each batch is one bulk transaction (cypher_compiler.bulk_write).
+   Entries are embedded client-side, so an import needs
+   DIGITAL_BRAIN_EMBEDDING_MODEL (see embedding_cache). An entry whose
+   extraction the compiler cannot express is written without entities and
+   its date goes to `failed_dates`, like a failed extraction
+5. Checkpoint: the number of entries written is saved after every batch;
+   a re-run skips them (writes are idempotent, so a batch interrupted
+   mid-write is simply written again)
+
+Run: python -m digital_brain.services.archive_import diary.md [--concurrency 4] [--rpm 30]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+from .cypher_compiler import bulk_write, compile_bulk_write
+from .embedding_cache import get_embedding_service
+from .entity_resolver import resolve_entities
+from .name_index import name_index
+from ..tools.mcp_client import run_with_mcp_client
+
+ENTRIES_PER_CHUNK = 5  # dated entries per extractor call
+MAX_CHUNK_CHARS = 8000  # keeps an extractor prompt bounded for long entries
+CHUNKS_PER_BATCH = 4  # extraction chunks per resolve + bulk write transaction
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RPM = 30  # extractor requests per minute
+
+_DATE_LINE = re.compile(
+    r"^\s*(?:#{1,6}\s*|\*\*|__)?\s*"
+    r"(?:(?P<iso>\d{4}-\d{2}-\d{2})|(?P<d>\d{1,2})[./](?P<m>\d{1,2})[./](?P<y>\d{4}|\d{2}))"
+    r"(?:\*\*|__)?[\s:.\-—]*(?P<rest>.*)$"
+)
+
+
+def parse_date_line(line: str) -> Optional[tuple[str, str]]:
+    """(YYYY-MM-DD, rest of the line) if the line opens a dated entry."""
+    match = _DATE_LINE.match(line)
+    if not match:
+        return None
+    try:
+        if match.group("iso"):
+            date = datetime.strptime(match.group("iso"), "%Y-%m-%d")
+        else:
+            year = int(match.group("y"))
+            year += 2000 if year < 70 else 1900 if year < 100 else 0
+            date = datetime(year, int(match.group("m")), int(match.group("d")))
+    except ValueError:
+        return None
+    return date.strftime("%Y-%m-%d"), match.group("rest").strip()
+
+
+def iter_dated_entries(path: str) -> Iterator[tuple[str, str]]:
+    """
+    Stream (date, text) entries from an archive, one line at a time.
+    Consecutive sections with the same date are one entry; text before the
+    first date is skipped.
+    """
+    date, lines = None, []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            header = parse_date_line(line)
+            if header and header[0] != date:
+                if date and "".join(lines).strip():
+                    yield date, "".join(lines).strip()
+                date, lines = header[0], []
+            if header:
+                if header[1]:
+                    lines.append(header[1] + "\n")
+            elif date:
+                lines.append(line)
+            elif line.strip():
+                print(f"⚠️ Skipping undated text: {line.strip()[:60]}")
+    if date and "".join(lines).strip():
+        yield date, "".join(lines).strip()
+
+
+def iter_chunks(entries: Iterator[tuple[str, str]]) -> Iterator[list[tuple[str, str]]]:
+    """Group entries into extractor-sized chunks."""
+    chunk, size = [], 0
+    for entry in entries:
+        if chunk and (len(chunk) >= ENTRIES_PER_CHUNK or size + len(entry[1]) > MAX_CHUNK_CHARS):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(entry)
+        size += len(entry[1])
+    if chunk:
+        yield chunk
+
+
+class RequestRateLimiter:
+    """Spaces request starts so at most `rpm` begin per minute."""
+
+    def __init__(self, rpm: int):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            delay = self._next - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = max(self._next, time.monotonic()) + self.interval
+
+
+class ArchiveImporter:
+    """
+    Streaming import of one archive with checkpoint / resume.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        checkpoint_path: Optional[str] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: int = DEFAULT_RPM
+    ):
+        self.path = path
+        self.checkpoint_path = checkpoint_path or f"{path}.import.json"
+        self.concurrency = concurrency
+        self.limiter = RequestRateLimiter(rpm)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._runner = None
+        self.failed_dates: list[str] = []
+        self.stats = {
+            "entries": 0, "skipped": 0, "batches": 0, "failed_chunks": 0, "uncompiled_entries": 0,
+            "entries_per_minute": 0.0
+        }
+
+    # --- checkpoint ---
+
+    def _load_checkpoint(self) -> int:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        if checkpoint.get("archive") != os.path.abspath(self.path):
+            return 0
+        self.failed_dates = checkpoint.get("failed_dates", [])
+        return int(checkpoint.get("entries_done", 0))
+
+    def _save_checkpoint(self, entries_done: int) -> None:
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "archive": os.path.abspath(self.path),
+                "entries_done": entries_done,
+                "failed_dates": self.failed_dates,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            }, f)
+        os.replace(tmp, self.checkpoint_path)  # Atomic: never a half-written checkpoint
+
+    # --- extraction ---
+
+    async def _extract(self, chunk: list[tuple[str, str]]) -> Optional[dict]:
+        """Run entity_extractor on one chunk (same prompt as the chat flow)."""
+        from google.adk.runners import InMemoryRunner
+        from google.genai import types
+        from ..agents.extractor import entity_extractor
+
+        if self._runner is None:
+            self._runner = InMemoryRunner(agent=entity_extractor, app_name="digital_brain_import")
+        text = "\n\n".join(f"[#{index}] {date}\n{content}" for index, (date, content) in enumerate(chunk))
+
+        async with self._semaphore:
+            await self.limiter.wait()
+            session = await self._runner.session_service.create_session(
+                app_name="digital_brain_import",
+                user_id="import",
+                state={
+                    "previous_context": "(No previous context)",
+                    "current_thoughts": text,
+                    "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                }
+            )
+            async for _ in self._runner.run_async(
+                user_id="import",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=text)])
+            ):
+                pass
+            session = await self._runner.session_service.get_session(
+                app_name="digital_brain_import", user_id="import", session_id=session.id
+            )
+            await self._runner.session_service.delete_session(
+                app_name="digital_brain_import", user_id="import", session_id=session.id
+            )
+        return session.state.get("entity_output") if session else None
+
+    async def _extract_safely(self, chunk: list[tuple[str, str]]) -> tuple[list[tuple[str, str]], Optional[dict]]:
+        try:
+            return chunk, await self._extract(chunk)
+        except Exception as e:
+            print(f"⚠️ Extraction failed for {chunk[0][0]}..{chunk[-1][0]}: {e}")
+            return chunk, None
+
+    @staticmethod
+    def _align(chunk: list[tuple[str, str]], entity_output: Optional[dict]) -> list[dict]:
+        """
+        One extraction entry per source section, matched by its [#N] marker
+        (sections can share a date). Entries without a usable marker take
+        the next unclaimed section of their date, in order. Source sections
+        the extractor skipped are still written, without entities.
+        """
+        sections = [
+            {"entry_date": date, "mood": "", "entities": [], "events": [], "relationships": []}
+            for date, _ in chunk
+        ]
+        unclaimed: dict[str, list[int]] = {}
+        for index, (date, _) in enumerate(chunk):
+            unclaimed.setdefault(date, []).append(index)
+
+        extracted = (entity_output or {}).get("entries", [])
+        marked = {id(e) for e in extracted if isinstance(e.get("section"), int) and 0 <= e["section"] < len(chunk)}
+        for entry in extracted:
+            if id(entry) in marked and entry["section"] in unclaimed[chunk[entry["section"]][0]]:
+                unclaimed[chunk[entry["section"]][0]].remove(entry["section"])
+        for entry in extracted:
+            if id(entry) in marked:
+                index = entry["section"]
+            elif unclaimed.get(entry.get("entry_date")):
+                index = unclaimed[entry.get("entry_date")].pop(0)
+            else:
+                print(f"⚠️ Dropping extraction for {entry.get('entry_date')}: no matching section")
+                continue
+            section = sections[index]
+            section["mood"] = section["mood"] or entry.get("mood", "")
+            for key in ("entities", "events", "relationships"):
+                section[key] += entry.get(key) or []
+        return sections
+
+    # --- resolve + write ---
+
+    def _drop_uncompilable(self, entries: list[dict], contents: list[str]) -> None:
+        """
+        Strip the extraction from entries the compiler cannot express (unknown
+        types or relationships, a State without EXPERIENCED, ...) so one bad
+        entry does not fail the batch. Their text is still written; the dates
+        are kept for a re-extraction pass, like failed extractions.
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for entry, content in zip(entries, contents):
+            if compile_bulk_write({"entries": [entry]}, [], [content], timestamp) is None:
+                print(f"⚠️ Writing {entry['entry_date']} without entities: extraction outside the schema contract")
+                entry.update(entities=[], events=[], relationships=[])
+                self.stats["uncompiled_entries"] += 1
+                self.failed_dates.append(entry["entry_date"])
+
+    async def _write_batch(self, batch: list[tuple[list[tuple[str, str]], Optional[dict]]]) -> int:
+        entries, contents = [], []
+        for chunk, entity_output in batch:
+            entries += self._align(chunk, entity_output)
+            contents += [content for _, content in chunk]
+            if entity_output is None:
+                # Text is still written; the dates are kept for a re-extraction pass
+                self.stats["failed_chunks"] += 1
+                self.failed_dates += [date for date, _ in chunk]
+        self._drop_uncompilable(entries, contents)
+        entity_output = {"entries": entries, "search_query": ""}
+
+        resolution = await resolve_entities(entity_output)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        result = await bulk_write(entity_output, resolution.get("existing_entities", []), contents, timestamp)
+        if not result["success"]:
+            raise RuntimeError(f"Bulk write failed: {result['error']}")
+
+        # Later batches resolve against names written by this one
+        new_names = {(e.get("type"), e.get("name")) for e in resolution.get("new_entities", [])}
+        for i, entry in enumerate(entries):
+            for j, entity in enumerate(entry["entities"]):
+                node_id = result["keys"].get(f"entry:{i}:entity:{j}")
+                if node_id and (entity.get("type"), entity.get("name")) in new_names:
+                    name_index.add(entity["type"], node_id, entity.get("name"))
+        return len(entries)
+
+    async def run(self) -> dict[str, Any]:
+        """Import the archive, resuming from the checkpoint."""
+        if get_embedding_service() is None:
+            # Without client-side vectors every entry is a separate embed_text statement
+            raise RuntimeError("Archive import needs DIGITAL_BRAIN_EMBEDDING_MODEL (entries must be embedded)")
+        entries_done = self._load_checkpoint()
+        if entries_done:
+            print(f"↩️ Resuming {self.path} after {entries_done} entries")
+        await name_index.ensure_warm()
+
+        def remaining() -> Iterator[tuple[str, str]]:
+            for index, entry in enumerate(iter_dated_entries(self.path)):
+                if index >= entries_done:
+                    yield entry
+        self.stats["skipped"] = entries_done
+
+        # Extraction tasks are started in order; the bounded queue caps how
+        # far extraction runs ahead of the (ordered) writer
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def produce() -> None:
+            for chunk in iter_chunks(remaining()):
+                await queue.put(asyncio.create_task(self._extract_safely(chunk)))
+            await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        start = time.perf_counter()
+        batch = []
+        try:
+            while True:
+                task = await queue.get()
+                if task is not None:
+                    batch.append(await task)
+                if batch and (task is None or len(batch) >= CHUNKS_PER_BATCH):
+                    written = await self._write_batch(batch)
+                    entries_done += written
+                    self.stats["entries"] += written
+                    self.stats["batches"] += 1
+                    self._save_checkpoint(entries_done)
+                    batch = []
+                    minutes = (time.perf_counter() - start) / 60
+                    self.stats["entries_per_minute"] = round(self.stats["entries"] / minutes, 1) if minutes else 0.0
+                    print(f"📥 IMPORT: {entries_done} entries written "
+                          f"({self.stats['entries_per_minute']} entries/min)")
+                if task is None:
+                    break
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                task = queue.get_nowait()
+                if task is not None:
+                    task.cancel()
+        return self.stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a dated journal archive into the Digital Brain graph")
+    parser.add_argument("path", help="Text or Markdown archive")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.import.json)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM, help="Extractor requests per minute")
+    args = parser.parse_args()
+
+    importer = ArchiveImporter(args.path, args.checkpoint, args.concurrency, args.rpm)
+    print(asyncio.run(run_with_mcp_client(importer.run())))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,33 +2,284 @@
 """
 Post-Write Consistency Checker (Phase 3: Reflex Loop).
 Detects duplicate nodes, merges them, and creates Alias records for learning.
+
+Two modes:
+- scoped (after each WRITE turn): only the nodes the turn created or touched
+  are compared against their candidates, across all entity labels (labels
+  other than Person/Pet only merge on identical normalized names)
+- full (scheduled maintenance): blocked scan of the whole Person population,
+  run with `python -m digital_brain.services.consistency_checker`
+
+Exact and containment matches are merged directly; a pair that only has
+Levenshtein similarity > 0.8 is merged only if both nodes share a
+JournalEntry (contract Rule 4), checked in the delete query itself.
 """
 
-from typing import Any
-from ..tools.mcp_client import execute_cypher, call_mcp_tool
+from typing import Any, Optional
+from ..tools.mcp_client import _records_from_result, execute_cypher, execute_cypher_many, call_mcp_tool
+from .alias_index import alias_index
+from .name_index import name_index
+from .core_entity_service import mark_core_entities_stale
+from .graph_schema import ENTITY_LABELS, ENTITY_RELATIONSHIPS, JOURNAL_RELATIONSHIPS
+from .history_cache import history_cache
+from .text_matching import blocking_keys, levenshtein_similarity, normalize_name, transliterate
 import json
+import time
+
+
+PERSON_NAMES_QUERY = """
+MATCH (p:Person)
+WHERE p.id IS NOT NULL AND p.name IS NOT NULL
+RETURN p.id AS id, p.name AS name
+"""
+
+# Levenshtein similarity above which two names are duplicates (contract Rule 4)
+SIMILARITY_THRESHOLD = 0.8
+# How a pair matched: identical normalized names, one name containing the
+# other, or transliterated Levenshtein similarity. Only "similar" pairs need
+# Rule 4's shared JournalEntry before they are merged.
+EXACT, CONTAINS, SIMILAR = "exact", "contains", "similar"
+MAX_DUPLICATES = 10
+# Blocks larger than this (e.g. a very common first-name prefix) are skipped;
+# their members still meet through their other tokens' keys
+MAX_BLOCK_SIZE = 100
+
+
+def _name_match(a: str, b: str, containment: bool = True) -> tuple[float, str]:
+    """
+    (score, kind): exact (and, for fuzzy labels, containment) matches score
+    1.0, otherwise transliterated Levenshtein similarity.
+    """
+    a, b = normalize_name(a), normalize_name(b)
+    if a == b:
+        return 1.0, EXACT
+    if containment and (a in b or b in a):
+        return 1.0, CONTAINS
+    a, b = transliterate(a), transliterate(b)
+    # Edit distance is at least the length difference: skip hopeless pairs
+    if 1 - abs(len(a) - len(b)) / max(len(a), len(b)) <= SIMILARITY_THRESHOLD:
+        return 0.0, SIMILAR
+    return levenshtein_similarity(a, b), SIMILAR
+
+
+def _better(candidate: tuple[float, str], current: Optional[dict]) -> bool:
+    """Higher score wins; on a tie a direct (exact/contains) match beats a similar one."""
+    if current is None:
+        return True
+    score, kind = candidate
+    return (score, kind != SIMILAR) > (current["similarity_score"], current["match"] != SIMILAR)
+
+
+def block_duplicate_candidates(nodes: list[tuple[str, Any]]) -> tuple[list[dict], int]:
+    """
+    Blocking-key duplicate detection over (id, name) pairs.
+
+    Names are bucketed by transliterated prefix and phonetic prefix of each
+    token; only names sharing a bucket are compared, instead of all n² pairs.
+
+    Returns:
+        (duplicate pairs sorted by similarity, number of candidate pairs compared);
+        each pair records its "match" kind (exact / contains / similar)
+    """
+    blocks: dict[str, list[tuple[str, str]]] = {}
+    for node_id, names in nodes:
+        for name in (names if isinstance(names, list) else [names]):
+            if not isinstance(name, str) or not name.strip():
+                continue
+            for key in blocking_keys(name):
+                blocks.setdefault(key, []).append((node_id, name))
+
+    compared: set[tuple[str, str]] = set()
+    best: dict[tuple[str, str], dict] = {}
+    for key, members in blocks.items():
+        if len(members) > MAX_BLOCK_SIZE:
+            print(f"⚠️ Blocking key {key} has {len(members)} names, skipped")
+            continue
+        for i, (id_a, name_a) in enumerate(members):
+            for id_b, name_b in members[i + 1:]:
+                if id_a == id_b:
+                    continue
+                # Keep the lower id, like the `a.id < b.id` rule of the old query
+                (lo_id, lo_name), (hi_id, hi_name) = sorted([(id_a, name_a), (id_b, name_b)])
+                pair = (lo_id, hi_id)
+                compared.add(pair)
+                score, kind = _name_match(lo_name, hi_name)
+                if score > SIMILARITY_THRESHOLD and _better((score, kind), best.get(pair)):
+                    best[pair] = {
+                        "id_a": lo_id, "name_a": lo_name,
+                        "id_b": hi_id, "name_b": hi_name,
+                        "similarity_score": round(score, 3),
+                        "match": kind
+                    }
 
+    duplicates = sorted(best.values(), key=lambda d: d["similarity_score"], reverse=True)
+    return duplicates, len(compared)
 
-async def find_duplicate_persons() -> list[dict]:
+
+async def find_duplicate_persons(stats: Optional[dict] = None) -> list[dict]:
     """
     Find Person nodes that might be duplicates based on similar names.
-    Uses fuzzy matching with Levenshtein-like comparison.
+    Uses blocking keys (see block_duplicate_candidates) instead of a
+    Cartesian product; names come from the in-process name index when warm.
+    
+    Args:
+        stats: Optional dict that receives candidate_pairs / blocking_ms
     """
-    query = """
-    MATCH (a:Person), (b:Person)
-    WHERE a.id < b.id  // Avoid self-comparison and duplicates
-      AND (
-        toLower(a.name) = toLower(b.name)  // Exact match
-        OR toLower(a.name) CONTAINS toLower(b.name)  // Partial match
-        OR toLower(b.name) CONTAINS toLower(a.name)
-      )
-    RETURN 
-      a.id AS id_a, a.name AS name_a,
-      b.id AS id_b, b.name AS name_b,
-      1.0 AS similarity_score  // Simplified scoring for now
-    LIMIT 10
+    start = time.perf_counter()
+    if name_index.warm:
+        nodes = [(i, names) for i, names in name_index.nodes("Person") if i != "MISSING"]
+    else:
+        nodes = [(r.get("id"), r.get("name")) for r in await execute_cypher(PERSON_NAMES_QUERY)]
+    
+    duplicates, candidate_pairs = block_duplicate_candidates(nodes)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"🧱 Blocking: {len(nodes)} Person nodes, {candidate_pairs} candidate pairs, "
+          f"{len(duplicates)} duplicates ({elapsed_ms:.1f} ms)")
+    
+    if stats is not None:
+        stats["nodes_checked"] = len(nodes)
+        stats["candidate_pairs"] = candidate_pairs
+        stats["blocking_ms"] = round(elapsed_ms, 1)
+    return duplicates[:MAX_DUPLICATES]
+
+
+def _touched_nodes_query(labels: tuple[str, ...] = ENTITY_LABELS) -> str:
+    """
+    Nodes touched by a write turn: explicit IDs plus nodes carrying a name
+    just written. One branch per label, so IDs are index seeks and names
+    are scanned within a label, never across all nodes.
+    """
+    branches = []
+    for label in labels:
+        branches.append(f"""
+    UNWIND $ids AS node_id
+    MATCH (n:{label} {{id: node_id}})
+    WHERE n.name IS NOT NULL
+    RETURN n.id AS id, '{label}' AS label, n.name AS name""")
+        branches.append(f"""
+    UNWIND $names AS name
+    MATCH (n:{label})
+    WHERE n.id IS NOT NULL
+      AND (n.name = name OR (n.name IS :: LIST<STRING> AND name IN n.name))
+    RETURN n.id AS id, '{label}' AS label, n.name AS name""")
+    return "\n    UNION".join(branches)
+
+
+TOUCHED_NODES_QUERY = _touched_nodes_query()
+
+
+def _candidate_query(label: str) -> str:
+    """
+    Nodes of one label whose name contains a token prefix of a touched node.
+    """
+    return f"""
+    UNWIND $touched AS t
+    MATCH (c:{label})
+    WHERE c.id IS NOT NULL AND c.id <> t.id AND c.name IS NOT NULL
+      AND any(v IN CASE WHEN c.name IS :: LIST<STRING> THEN c.name ELSE [toString(c.name)] END
+              WHERE any(p IN t.prefixes WHERE toLower(v) CONTAINS p))
+    RETURN t.id AS touched_id, c.id AS id, c.name AS name
+    """
+
+
+def _name_variants(names: Any) -> list[str]:
+    return [n for n in (names if isinstance(names, list) else [names]) if isinstance(n, str) and n.strip()]
+
+
+def _token_prefixes(names: list[str], prefix_len: int = 3) -> list[str]:
+    return sorted({token[:prefix_len] for n in names for token in normalize_name(n).split() if len(token) > 1})
+
+
+async def find_duplicates_for_nodes(
+    node_ids: list[str],
+    names: Optional[list[str]] = None,
+    stats: Optional[dict] = None
+) -> list[dict]:
+    """
+    Scoped duplicate detection for the nodes touched by one write turn.
+
+    Touched nodes (by ID, or by a name written this turn when the executor
+    did not report IDs) are compared only against candidates of their own
+    label: fuzzy labels come from the in-process name index, other labels
+    from one batched token-prefix query per label.
+    Outside the fuzzy labels (Person, Pet) only exact normalized name
+    matches are reported, since a merge deletes the duplicate.
+
+    Args:
+        node_ids: IDs created, merged or referenced this turn
+        names: Entity names written this turn (finds new nodes with unknown IDs)
+        stats: Optional dict that receives nodes_checked / candidate_pairs
+
+    Returns:
+        Duplicate pairs with the same shape as find_duplicate_persons(),
+        plus the "label" of the pair
     """
-    return await execute_cypher(query)
+    ids = [i for i in dict.fromkeys(node_ids) if i and i != "MISSING"]
+    names = [n for n in dict.fromkeys(names or []) if n]
+    if not ids and not names:
+        return []
+
+    touched = await execute_cypher(TOUCHED_NODES_QUERY, {"ids": ids, "names": names})
+    touched = list({t["id"]: t for t in touched if t.get("id") and t.get("id") != "MISSING"}.values())
+
+    # touched id -> [(candidate id, candidate names)]
+    candidates: dict[str, list[tuple[str, Any]]] = {t["id"]: [] for t in touched}
+    by_label: dict[str, list[dict]] = {}
+    for t in touched:
+        variants = _name_variants(t["name"])
+        if t["label"] in name_index.labels and name_index.warm:
+            for variant in variants:
+                for hit in name_index.lookup(t["label"], variant, limit=10, min_score=0.5):
+                    if hit["id"] not in (t["id"], "MISSING"):
+                        candidates[t["id"]].append((hit["id"], hit["name"]))
+        else:
+            prefixes = _token_prefixes(variants)
+            if prefixes:
+                by_label.setdefault(t["label"], []).append({"id": t["id"], "prefixes": prefixes})
+
+    labels = list(by_label)
+    results = await execute_cypher_many([(_candidate_query(label), {"touched": by_label[label]}) for label in labels])
+    for label, result in zip(labels, results):
+        if isinstance(result, Exception):
+            print(f"Candidate lookup failed for {label}: {result}")
+            continue
+        for r in result:
+            candidates[r["touched_id"]].append((r.get("id"), r.get("name")))
+
+    label_of = {t["id"]: t["label"] for t in touched}
+    names_of = {t["id"]: _name_variants(t["name"]) for t in touched}
+    compared: set[tuple[str, str]] = set()
+    best: dict[tuple[str, str], dict] = {}
+    for touched_id, found in candidates.items():
+        for candidate_id, candidate_names in found:
+            pair = tuple(sorted((touched_id, candidate_id)))
+            if not candidate_id or pair in compared:
+                continue
+            compared.add(pair)
+            fuzzy = label_of[touched_id] in name_index.labels
+            (score, kind), name_t, name_c = max(
+                ((_name_match(a, b, containment=fuzzy), a, b) for a in names_of[touched_id] for b in _name_variants(candidate_names)),
+                key=lambda item: (item[0][0], item[0][1] != SIMILAR),
+                default=((0.0, SIMILAR), "", "")
+            )
+            # Merging deletes a node with its edges: outside the fuzzy labels
+            # ("Python 3.11" vs "Python 3.12") only identical names qualify
+            if score > SIMILARITY_THRESHOLD and (fuzzy or kind == EXACT):
+                by_id = {touched_id: name_t, candidate_id: name_c}
+                best[pair] = {
+                    "id_a": pair[0], "name_a": by_id[pair[0]],
+                    "id_b": pair[1], "name_b": by_id[pair[1]],
+                    "label": label_of[touched_id],
+                    "similarity_score": round(score, 3),
+                    "match": kind
+                }
+
+    print(f"🎯 Scoped check: {len(touched)} touched nodes, {len(compared)} candidate pairs, {len(best)} duplicates")
+    if stats is not None:
+        stats["nodes_checked"] = len(touched)
+        stats["candidate_pairs"] = len(compared)
+    duplicates = sorted(best.values(), key=lambda d: d["similarity_score"], reverse=True)
+    return duplicates[:MAX_DUPLICATES]
 
 
 async def find_duplicates_by_topology() -> list[dict]:
@@ -59,37 +310,114 @@ async def find_duplicates_by_topology() -> list[dict]:
         return []
 
 
-async def merge_duplicate_nodes(keep_id: str, remove_id: str, entity_type: str = "Person") -> bool:
+# Relationship types a merge moves onto the kept node (graph schema section 2)
+MERGE_RELATIONSHIP_TYPES = tuple(sorted(set(JOURNAL_RELATIONSHIPS.values()) | set(ENTITY_RELATIONSHIPS)))
+
+
+def _delete_duplicate_query(entity_type: str) -> str:
     """
-    Merge two duplicate nodes, keeping one and removing the other.
-    Transfers all relationships from removed node to kept node.
+    Query that moves a duplicate's relationships onto the kept node, deletes
+    the duplicate and recomputes the materialized degree of the nodes whose
+    relationships changed. Schema relationship types are moved (without
+    properties); a duplicate with any other relationship type is left alone
+    rather than losing it. With $require_shared_entry (similarity-only
+    matches, contract Rule 4) nothing is deleted unless both nodes share a
+    JournalEntry.
     """
-    # First, transfer all relationships
-    transfer_query = f"""
+    transfers = "".join(f"""
+    CALL {{
+        WITH keep, remove
+        MATCH (source)-[:{rel_type}]->(remove) WHERE NOT source IN [keep, remove]
+        MERGE (source)-[:{rel_type}]->(keep)
+    }}
+    CALL {{
+        WITH keep, remove
+        MATCH (remove)-[:{rel_type}]->(target) WHERE NOT target IN [keep, remove]
+        MERGE (keep)-[:{rel_type}]->(target)
+    }}""" for rel_type in MERGE_RELATIONSHIP_TYPES)
+    known = ", ".join(f"'{rel_type}'" for rel_type in MERGE_RELATIONSHIP_TYPES)
+    return f"""
     MATCH (keep:{entity_type} {{id: $keep_id}}), (remove:{entity_type} {{id: $remove_id}})
-    OPTIONAL MATCH (remove)-[r]->(target)
-    WHERE NOT target.id = keep.id
-    WITH keep, remove, collect({{rel: type(r), target: target}}) AS outgoing
-    OPTIONAL MATCH (source)-[r2]->(remove)
-    WHERE NOT source.id = keep.id
-    WITH keep, remove, outgoing, collect({{rel: type(r2), source: source}}) AS incoming
-    RETURN keep.id AS kept, remove.id AS removed, size(outgoing) AS out_rels, size(incoming) AS in_rels
+    WHERE (NOT $require_shared_entry OR EXISTS {{ (keep)--(:JournalEntry)--(remove) }})
+      AND NOT EXISTS {{ (remove)-[r]-() WHERE NOT type(r) IN [{known}] }}
+    OPTIONAL MATCH (remove)--(neighbour)
+    WITH keep, remove, collect(DISTINCT neighbour) AS neighbours{transfers}
+    DETACH DELETE remove
+    WITH keep, neighbours
+    FOREACH (n IN neighbours + [keep] | SET n.degree = COUNT {{ (n)--() }})
+    RETURN count(*) AS deleted
+    """
+
+
+CREATE_ALIAS_QUERY = """
+MERGE (a:Alias {from_name: $from_name, to_name: $to_name})
+SET a.canonical_id = $canonical_id,
+    a.created_at = datetime(),
+    a.confidence = 1.0
+RETURN a.from_name AS created
+"""
+
+
+def _delete_params(keep_id: str, remove_id: str, require_shared_entry: bool) -> dict[str, Any]:
+    return {"keep_id": keep_id, "remove_id": remove_id, "require_shared_entry": require_shared_entry}
+
+
+def _deleted_count(result: dict | list[dict]) -> int:
+    """
+    Nodes deleted by a merge. The write tool replies with its counters
+    ({"nodes_deleted": 1, ...}); a server that returns records gives the
+    query's `deleted` column ([{"deleted": 1}]).
+    """
+    if isinstance(result, dict):
+        value = result.get("nodes_deleted", 0)
+    elif isinstance(result, list) and result and isinstance(result[0], dict):
+        value = result[0].get("deleted", result[0].get("nodes_deleted", 0))
+    else:
+        value = 0
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _disjoint_pass(duplicates: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Split pairs into one merge pass where no id appears twice, and the rest (in order)."""
+    used: set[str] = set()
+    batch, rest = [], []
+    for dup in duplicates:
+        ids = {dup.get("id_a"), dup.get("id_b")}
+        if ids & used:
+            rest.append(dup)
+        else:
+            used |= ids
+            batch.append(dup)
+    return batch, rest
+
+
+async def merge_duplicate_nodes(
+    keep_id: str,
+    remove_id: str,
+    entity_type: str = "Person",
+    require_shared_entry: bool = True
+) -> bool:
+    """
+    Merge two duplicate nodes, keeping one and removing the other.
+    Relationships of the schema types are moved onto the kept node first
+    (see _delete_duplicate_query). The duplicate is only deleted if both
+    nodes share a JournalEntry, unless require_shared_entry is False
+    (exact / containment matches).
     """
-    
     try:
-        # For safety, we'll use a simpler approach without APOC
-        # Just delete the duplicate and keep the original
-        delete_query = f"""
-        MATCH (remove:{entity_type} {{id: $remove_id}})
-        DETACH DELETE remove
-        RETURN count(*) AS deleted
-        """
-        
         arguments = {
-            "query": delete_query,
-            "params": json.dumps({"remove_id": remove_id})
+            "query": _delete_duplicate_query(entity_type),
+            "params": json.dumps(_delete_params(keep_id, remove_id, require_shared_entry))
         }
-        await call_mcp_tool("write_neo4j_cypher", arguments)
+        result = await call_mcp_tool("write_neo4j_cypher", arguments)
+        if not _deleted_count(_records_from_result(result)):
+            return False
+        name_index.remove(remove_id)
+        alias_index.remove_canonical([remove_id])
+        history_cache.invalidate([remove_id])
         return True
     except Exception as e:
         print(f"Merge failed: {e}")
@@ -100,16 +428,9 @@ async def create_alias(from_name: str, to_name: str, canonical_id: str) -> bool:
     """
     Create an Alias record so future lookups know these names refer to same entity.
     """
-    query = """
-    MERGE (a:Alias {from_name: $from_name, to_name: $to_name})
-    SET a.canonical_id = $canonical_id,
-        a.created_at = datetime(),
-        a.confidence = 1.0
-    RETURN a.from_name AS created
-    """
     try:
         arguments = {
-            "query": query,
+            "query": CREATE_ALIAS_QUERY,
             "params": json.dumps({
                 "from_name": from_name,
                 "to_name": to_name,
@@ -117,54 +438,133 @@ async def create_alias(from_name: str, to_name: str, canonical_id: str) -> bool:
             })
         }
         await call_mcp_tool("write_neo4j_cypher", arguments)
+        alias_index.add(from_name, to_name, canonical_id)
         return True
     except Exception as e:
         print(f"Alias creation failed: {e}")
         return False
 
 
-async def run_consistency_check() -> dict[str, Any]:
+async def run_consistency_check(
+    node_ids: Optional[list[str]] = None,
+    names: Optional[list[str]] = None
+) -> dict[str, Any]:
     """
     Main entry point for the Reflex Loop.
     Finds duplicates, merges them, and creates Alias records.
     
+    Args:
+        node_ids: IDs touched by the current write turn. When given (or when
+            `names` is given) only those nodes are checked; when both are
+            None the whole Person population is scanned (maintenance mode).
+        names: Entity names written by the current turn
+    
     Returns:
         {
+            "scope": "touched",
             "duplicates_found": 2,
             "merged": 2,
-            "aliases_created": 2
+            "aliases_created": 2,
+            "nodes_checked": 4,
+            "candidate_pairs": 14,
+            "blocking_ms": 0.4
         }
     """
+    scoped = node_ids is not None or names is not None
     stats = {
+        "scope": "touched" if scoped else "full",
         "duplicates_found": 0,
         "merged": 0,
-        "aliases_created": 0
+        "aliases_created": 0,
+        "nodes_checked": 0,
+        "candidate_pairs": 0,
+        "blocking_ms": 0.0
     }
     
-    # Step 1: Find duplicates by name similarity
-    duplicates = await find_duplicate_persons()
+    # Step 1: Find duplicates by name similarity (blocked / scoped candidate pairs only)
+    if scoped:
+        duplicates = await find_duplicates_for_nodes(node_ids or [], names, stats)
+    else:
+        duplicates = await find_duplicate_persons(stats)
     stats["duplicates_found"] = len(duplicates)
     
     if not duplicates:
         print("✅ No duplicates found")
         return stats
     
-    print(f"⚠️ Found {len(duplicates)} potential duplicate Person nodes")
+    print(f"⚠️ Found {len(duplicates)} potential duplicate nodes")
     
-    # Step 2: Merge each duplicate pair
-    for dup in duplicates:
-        keep_id = dup.get("id_a")
-        remove_id = dup.get("id_b")
-        keep_name = dup.get("name_a")
-        remove_name = dup.get("name_b")
+    # Step 2: Merge duplicate pairs in batched write round trips. Batched calls
+    # run in no particular order, so a pass never holds two pairs sharing an
+    # id; pairs whose node was removed by an earlier pass are dropped (the
+    # next check sees them against the surviving node)
+    merged = []
+    removed: set[str] = set()
+    pending = duplicates
+    while pending:
+        batch, pending = _disjoint_pass(pending)
+        merge_results = await execute_cypher_many(
+            [
+                (
+                    _delete_duplicate_query(dup.get("label", "Person")),
+                    json.dumps(_delete_params(dup.get("id_a"), dup.get("id_b"), dup.get("match") == SIMILAR))
+                )
+                for dup in batch
+            ],
+            tool_name="write_neo4j_cypher"
+        )
         
-        # Merge (delete the duplicate)
-        if await merge_duplicate_nodes(keep_id, remove_id):
+        for dup, result in zip(batch, merge_results):
+            if isinstance(result, Exception):
+                print(f"Merge failed: {result}")
+                continue
+            if not _deleted_count(result):
+                # Similarity-only match without a shared JournalEntry (Rule 4), a
+                # relationship type the merge cannot move, or already gone
+                print(f"   Not merged (no shared JournalEntry or non-schema relationships): "
+                      f"{dup.get('name_b')} ~ {dup.get('name_a')}")
+                continue
             stats["merged"] += 1
-            print(f"   Merged: {remove_name} → {keep_name}")
-            
-            # Create alias for learning
-            if await create_alias(remove_name, keep_name, keep_id):
-                stats["aliases_created"] += 1
+            merged.append(dup)
+            removed.add(dup.get("id_b"))
+            name_index.remove(dup.get("id_b"))
+            alias_index.remove_canonical([dup.get("id_b")])
+            history_cache.invalidate([dup.get("id_b")])
+            print(f"   Merged: {dup.get('name_b')} → {dup.get('name_a')}")
+        
+        for dup in pending:
+            if {dup.get("id_a"), dup.get("id_b")} & removed:
+                print(f"   Deferred: {dup.get('name_b')} ~ {dup.get('name_a')} (node merged in this check)")
+        pending = [dup for dup in pending if not {dup.get("id_a"), dup.get("id_b")} & removed]
+    
+    if merged:
+        mark_core_entities_stale()
+    
+    # Step 3: Create aliases for learning (one batched write round trip)
+    alias_results = await execute_cypher_many(
+        [
+            (CREATE_ALIAS_QUERY, json.dumps({
+                "from_name": dup.get("name_b"),
+                "to_name": dup.get("name_a"),
+                "canonical_id": dup.get("id_a")
+            }))
+            for dup in merged
+        ],
+        tool_name="write_neo4j_cypher"
+    )
+    
+    for dup, result in zip(merged, alias_results):
+        if isinstance(result, Exception):
+            print(f"Alias creation failed: {result}")
+        else:
+            stats["aliases_created"] += 1
+            alias_index.add(dup.get("name_b"), dup.get("name_a"), dup.get("id_a"))
     
     return stats
+
+
+if __name__ == "__main__":
+    # Scheduled maintenance: full scan of the Person population
+    import asyncio
+    from ..tools.mcp_client import run_with_mcp_client
+    print(asyncio.run(run_with_mcp_client(run_consistency_check())))
@@ -2,17 +2,88 @@
 Core Entity Service (Phase 0).
 Identifies "Heavy Nodes" (Core Entities) in the graph based on connection count.
 Returns structured data grouped by label with weights.
+
+The graph-wide aggregation is served from an in-memory snapshot with a TTL
+and stale-while-revalidate semantics, refreshed by a background task.
 """
 
-from typing import Any
+from typing import Any, Optional
+import asyncio
 import logging
+import time
 from ..tools.mcp_client import execute_cypher
+from .graph_schema import ALWAYS_CORE_LABELS, ENTITY_LABELS
 
 logger = logging.getLogger(__name__)
 
 # Threshold to be considered "Core" (Heavy)
 CONNECTION_THRESHOLD = 3
 
+# Seconds a snapshot is served before a background refresh is triggered
+CORE_ENTITY_TTL = 300
+
+
+async def _fetch_core_entities() -> dict[str, list[dict[str, Any]]]:
+    """Run the core entity query and group results by label. Raises on failure."""
+    # Each branch is an index seek on the materialized `degree` property
+    # (see degree_service) instead of a graph-wide COUNT aggregation
+    branches = [
+        f"MATCH (n:{label}) WHERE n.name IS NOT NULL RETURN n"
+        for label in ALWAYS_CORE_LABELS
+    ] + [
+        f"MATCH (n:{label}) WHERE n.degree >= $threshold AND n.name IS NOT NULL RETURN n"
+        for label in ENTITY_LABELS if label not in ALWAYS_CORE_LABELS
+    ]
+    union = "\n        UNION\n        ".join(branches)
+    query = f"""
+    CALL {{
+        {union}
+    }}
+    WITH DISTINCT n
+    RETURN
+        coalesce(n.id, 'MISSING') AS id,
+        CASE WHEN n.name IS :: LIST<STRING> THEN n.name[0] ELSE n.name END AS name,
+        labels(n) AS labels,
+        coalesce(n.degree, 0) AS weight
+    ORDER BY weight DESC
+    LIMIT 200
+    """
+    
+    params = {"threshold": CONNECTION_THRESHOLD}
+    
+    logger.info(f"🌟 CORE ENTITY LOOKUP: Starting query (threshold={CONNECTION_THRESHOLD})...")
+    
+    results = await execute_cypher(query, params)
+    logger.info(f"🌟 CORE ENTITY LOOKUP: Query returned {len(results)} results")
+    
+    # Group by primary label
+    grouped: dict[str, list[dict]] = {}
+    
+    for r in results:
+        labels = r.get("labels", [])
+        # Get primary label (first non-internal label)
+        primary_label = labels[0] if labels else "Unknown"
+        
+        entity = {
+            "id": r.get("id"),
+            "name": r.get("name"),
+            "weight": r.get("weight", 0)
+        }
+        
+        if primary_label not in grouped:
+            grouped[primary_label] = []
+        grouped[primary_label].append(entity)
+    
+    # Log summary
+    total = sum(len(v) for v in grouped.values())
+    if total > 0:
+        summary = ", ".join([f"{k}: {len(v)}" for k, v in grouped.items()])
+        logger.info(f"🌟 CORE ENTITIES LOADED ({total}): {summary}")
+    else:
+        logger.info(f"🌟 CORE ENTITIES: None found with >= {CONNECTION_THRESHOLD} connections")
+    
+    return grouped
+
 
 async def get_all_core_entities() -> dict[str, list[dict[str, Any]]]:
     """
@@ -29,66 +100,88 @@ async def get_all_core_entities() -> dict[str, list[dict[str, Any]]]:
             ...
         }
     """
-    query = """
-    MATCH (n)
-    WHERE n.name IS NOT NULL
-      AND NOT 'JournalEntry' IN labels(n)
-      AND NOT 'Alias' IN labels(n)
-      AND NOT 'LearningLog' IN labels(n)
-      AND (
-        any(label IN labels(n) WHERE label IN ['Person', 'Organization'])
-        OR COUNT { (n)--() } >= $threshold
-      )
-    RETURN DISTINCT
-        coalesce(n.id, 'MISSING') AS id,
-        CASE WHEN n.name IS :: LIST<STRING> THEN n.name[0] ELSE n.name END AS name,
-        labels(n) AS labels,
-        COUNT { (n)--() } AS weight
-    ORDER BY weight DESC
-    LIMIT 200
-    """
-    
-    params = {"threshold": CONNECTION_THRESHOLD}
-    
-    logger.info(f"🌟 CORE ENTITY LOOKUP: Starting query (threshold={CONNECTION_THRESHOLD})...")
-    
     try:
-        results = await execute_cypher(query, params)
-        logger.info(f"🌟 CORE ENTITY LOOKUP: Query returned {len(results)} results")
-        
-        # Group by primary label
-        grouped: dict[str, list[dict]] = {}
-        
-        for r in results:
-            labels = r.get("labels", [])
-            # Get primary label (first non-internal label)
-            primary_label = labels[0] if labels else "Unknown"
-            
-            entity = {
-                "id": r.get("id"),
-                "name": r.get("name"),
-                "weight": r.get("weight", 0)
-            }
-            
-            if primary_label not in grouped:
-                grouped[primary_label] = []
-            grouped[primary_label].append(entity)
-        
-        # Log summary
-        total = sum(len(v) for v in grouped.values())
-        if total > 0:
-            summary = ", ".join([f"{k}: {len(v)}" for k, v in grouped.items()])
-            logger.info(f"🌟 CORE ENTITIES LOADED ({total}): {summary}")
-        else:
-            logger.info(f"🌟 CORE ENTITIES: None found with >= {CONNECTION_THRESHOLD} connections")
-        
-        return grouped
-        
+        return await _fetch_core_entities()
     except Exception as e:
         logger.error(f"⚠️ Core Entity Lookup FAILED: {e}")
         return {}
 
 
+class CoreEntitySnapshot:
+    """
+    Cached result of the core entity query with stale-while-revalidate refresh.
+
+    - Fresh snapshot: returned from memory.
+    - Expired (TTL) or marked stale: the old snapshot is returned immediately
+      and a single background task refreshes it.
+    - No snapshot yet: the caller waits for the first fetch.
+    A failed refresh keeps serving the previous snapshot.
+    """
+
+    def __init__(self, ttl: float = CORE_ENTITY_TTL):
+        self.ttl = ttl
+        self._data: Optional[dict[str, list[dict[str, Any]]]] = None
+        self._fetched_at = 0.0
+        self._stale = False
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self._data is not None
+            and not self._stale
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    async def _refresh(self) -> None:
+        # Clear the flag first: a write landing mid-refresh marks it stale again
+        self._stale = False
+        try:
+            self._data = await _fetch_core_entities()
+            self._fetched_at = time.monotonic()
+        except Exception as e:
+            self._stale = True
+            logger.error(f"⚠️ Core Entity snapshot refresh FAILED: {e}")
+
+    def prefetch(self) -> Optional[asyncio.Task]:
+        """Start a background refresh if the snapshot is missing, expired or stale."""
+        if self.is_fresh:
+            return None
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    def mark_stale(self) -> None:
+        """Called after graph writes: revalidate in the background right away."""
+        self._stale = True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Revalidated on the next get()
+        self.prefetch()
+
+    async def get(self) -> dict[str, list[dict[str, Any]]]:
+        """Return the snapshot, only blocking if there has never been one."""
+        task = self.prefetch()
+        if self._data is None and task is not None:
+            await asyncio.shield(task)
+        return self._data or {}
+
+
+# Process-wide snapshot shared by all sessions
+core_entity_snapshot = CoreEntitySnapshot()
+
+
+async def get_core_entities_cached() -> dict[str, list[dict[str, Any]]]:
+    """Core Entities served from the in-memory snapshot (see CoreEntitySnapshot)."""
+    return await core_entity_snapshot.get()
+
+
+def mark_core_entities_stale() -> None:
+    """Invalidate the snapshot after a write so it is revalidated in the background."""
+    core_entity_snapshot.mark_stale()
+
+
 # Keep old function signature for backward compatibility
 async def get_potential_core_entities(text: str = None) -> list[dict[str, Any]]:
     """Backward compatible wrapper - returns flat list."""
@@ -0,0 +1,405 @@
+# File: digital_brain/services/cypher_compiler.py
+"""
+Deterministic Cypher Compiler.
+Turns `entity_output` plus the entity resolution result into parameterized
+Cypher that follows docs/GRAPH_SCHEMA_CONTRACT.md, so WRITE turns do not
+need a write_agent LLM round trip.
+
+Emitted statements (all idempotent, safe to retry):
+1. Alias records for retriever merge_commands (the writer's "safest" option)
+2. Repair of existing entities whose id is MISSING (name lookup, set id)
+3. One UNWIND statement for all JournalEntries with a precomputed
+   embedding, and one embed_text statement per entry without one
+4. One UNWIND statement per label: MERGE the nodes by id and link them from
+   their JournalEntries (MENTIONS, or DESCRIBES for Event; State is not
+   linked from entries)
+5. One UNWIND statement per entity relationship type and label pair from
+   the extractor's `relationships` (EXPERIENCED, PARTICIPATED, OWNS,
+   WORKS_AT, ...)
+
+The statement count depends on the labels present, not on the number of
+entries, so a whole diary batch is a handful of statements that the query
+executor sends as one transaction (see bulk_write()).
+
+IDs of new nodes are UUIDv5 of their label and normalized name (JournalEntry:
+timestamp and content), so a retried turn merges onto the same nodes.
+Every node also gets a client-side temp key ("entry:0", "entry:0:entity:2",
+"entry:1:event:0") so callers can map their input to the written IDs.
+
+compile_queries() returns None for turns it cannot express (multiple dated
+entries without per-entry text, unknown entity types or relationships,
+relationship endpoints that are not in the entry, a State without the
+Person that EXPERIENCED it, merge commands without a keep id); the
+orchestrator then falls back to write_agent.
+"""
+
+import uuid
+from typing import Any, Optional
+from ..models.queries import CompiledQueries
+from .graph_schema import (
+    ANCHOR_RELATIONSHIPS,
+    ENTITY_LABELS,
+    ENTITY_RELATIONSHIPS,
+    JOURNAL_RELATIONSHIPS,
+    LABEL_SYNONYMS,
+)
+from .text_matching import normalize_name
+
+# Namespace for deterministic node IDs
+NODE_ID_NAMESPACE = uuid.UUID("5b0c7a52-3f0e-4a8e-9d7a-0c6f5f2d9b11")
+
+ALIAS_QUERY = """
+MATCH (keep {id: $keep_id})
+MERGE (a:Alias {from_name: $remove_name, to_name: keep.name})
+SET a.canonical_id = keep.id, a.created_at = datetime()
+RETURN a.from_name AS alias
+"""
+
+
+def _journal_entries_query(embed_text: bool) -> str:
+    """
+    MERGE JournalEntries. With embed_text (one entry per statement) the
+    server-computed $embedding is stored, otherwise each entry's own vector.
+    """
+    embedding = "$embedding" if embed_text else "e.embedding"
+    return f"""
+    UNWIND $entries AS e
+    MERGE (j:JournalEntry {{id: e.id}})
+    ON CREATE SET j.content = e.content,
+                  j.timestamp = e.timestamp,
+                  j.mood = e.mood,
+                  j.embedding = {embedding}
+    RETURN count(j) AS entries
+    """
+
+
+def _repair_missing_ids_query(label: str) -> str:
+    """Give unresolved-ID nodes (id: MISSING) the id the compiler links them by."""
+    return f"""
+    UNWIND $nodes AS node
+    MATCH (n:{label})
+    WHERE (n.id IS NULL OR n.id = 'MISSING')
+      AND CASE
+          WHEN n.name IS :: LIST<STRING> THEN node.name IN n.name
+          ELSE toLower(n.name) = toLower(node.name)
+      END
+    SET n.id = node.id
+    RETURN count(n) AS repaired
+    """
+
+
+def _link_nodes_query(label: str) -> str:
+    """MERGE nodes of one label by id and link them from their JournalEntries."""
+    name_property = "type" if label == "Event" else "name"
+    if label not in JOURNAL_RELATIONSHIPS:
+        return f"""
+    UNWIND $nodes AS node
+    MERGE (n:{label} {{id: node.id}})
+    ON CREATE SET n.{name_property} = node.name, n += node.properties
+    RETURN count(n) AS linked
+    """
+    return f"""
+    UNWIND $nodes AS node
+    MERGE (n:{label} {{id: node.id}})
+    ON CREATE SET n.{name_property} = node.name, n += node.properties
+    WITH n, node
+    UNWIND node.journal_ids AS journal_id
+    MATCH (j:JournalEntry {{id: journal_id}})
+    MERGE (j)-[:{JOURNAL_RELATIONSHIPS[label]}]->(n)
+    RETURN count(DISTINCT n) AS linked
+    """
+
+
+def _relationship_query(rel_type: str, source_label: str, target_label: str) -> str:
+    """MERGE one entity relationship type between nodes written this turn."""
+    return f"""
+    UNWIND $links AS link
+    MATCH (a:{source_label} {{id: link.source}}), (b:{target_label} {{id: link.target}})
+    MERGE (a)-[:{rel_type}]->(b)
+    RETURN count(*) AS linked
+    """
+
+
+def _endpoint(named: dict[str, set], name: Any, labels: tuple[str, ...]) -> Optional[tuple[str, str]]:
+    """(label, id) of the single item of the entry called `name` with one of `labels`."""
+    if not isinstance(name, str):
+        return None
+    matches = {item for item in named.get(normalize_name(name), set()) if item[0] in labels}
+    return matches.pop() if len(matches) == 1 else None
+
+
+def _entry_links(entry: dict, named: dict[str, set]) -> Optional[list[tuple[str, str, str, str, str]]]:
+    """
+    Entity relationships of one entry as (type, source label, source id,
+    target label, target id), or None if one cannot be expressed.
+    """
+    links = []
+    for rel in entry.get("relationships") or []:
+        rel_type = str(rel.get("type", "")).upper()
+        if rel_type not in ENTITY_RELATIONSHIPS:
+            print(f"🧩 COMPILER: unknown relationship {rel.get('type')!r}")
+            return None
+        source_labels, target_labels = ENTITY_RELATIONSHIPS[rel_type]
+        source = _endpoint(named, rel.get("source"), source_labels)
+        target = _endpoint(named, rel.get("target"), target_labels)
+        if source is None or target is None:
+            print(f"🧩 COMPILER: {rel_type} {rel.get('source')!r} -> {rel.get('target')!r} has no unique endpoint in the entry")
+            return None
+        links.append((rel_type, *source, *target))
+
+    anchored = {(rel_type, target_id) for rel_type, _, _, _, target_id in links}
+    for label, item_id in set().union(*named.values()):
+        rel_type = ANCHOR_RELATIONSHIPS.get(label)
+        if rel_type and (rel_type, item_id) not in anchored:
+            print(f"🧩 COMPILER: {label} without {rel_type} relationship")
+            return None
+    return links
+
+
+def node_id(*parts: str) -> str:
+    """Deterministic node id from its identifying parts."""
+    return str(uuid.uuid5(NODE_ID_NAMESPACE, "|".join(normalize_name(p) for p in parts)))
+
+
+def _label(entity_type: str) -> Optional[str]:
+    label = LABEL_SYNONYMS.get(entity_type, entity_type)
+    return label if label in ENTITY_LABELS else None
+
+
+def _merge_commands(context_output: Any) -> list[dict]:
+    if isinstance(context_output, dict):
+        return context_output.get("merge_commands") or []
+    return []
+
+
+def _resolved_ids(existing_entities: list[dict]) -> dict[tuple[str, str], str]:
+    """(label, normalized name) -> resolved id ("MISSING" if the node has none)."""
+    resolved = {}
+    for e in existing_entities:
+        label = _label(e.get("type", ""))
+        for name in (e.get("original_query"), e.get("name")):
+            if label and isinstance(name, str):
+                resolved.setdefault((label, normalize_name(name)), e.get("id") or "MISSING")
+    return resolved
+
+
+def compile_bulk_write(
+    entity_output: dict,
+    existing_entities: list[dict],
+    contents: list[str],
+    timestamp: str,
+    embeddings: Optional[list[Optional[list[float]]]] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Compile every entry of an EntityOutput into a few UNWIND statements.
+
+    Args:
+        entity_output: EntityOutput (all entries, entities and events)
+        existing_entities: Resolution result (entities already in the graph)
+        contents: Journal text of each entry, by position
+        timestamp: Time of the write ("YYYY-MM-DD HH:MM:SS"); entries dated
+            another day keep their entry_date
+        embeddings: Optional precomputed embedding per entry; an entry
+            without one gets its own statement with embed_text, so the
+            server embeds it (several embed_texts run sequentially)
+
+    Returns:
+        CompiledQueries as a dict (with `keys`: temp key -> node id),
+        or None if an entity type or relationship is outside the schema
+        contract (see _entry_links)
+    """
+    entries = (entity_output or {}).get("entries") or []
+    if len(contents) != len(entries):
+        raise ValueError(f"{len(entries)} entries but {len(contents)} contents")
+    embeddings = embeddings or [None] * len(entries)
+    resolved = _resolved_ids(existing_entities)
+
+    keys: dict[str, str] = {}
+    journal_rows = []
+    # label -> id -> node params; label -> repair rows
+    nodes: dict[str, dict[str, dict]] = {}
+    missing: dict[str, dict[str, dict]] = {}
+    # (type, source label, target label) -> (source id, target id) -> link params
+    links: dict[tuple[str, str, str], dict[tuple[str, str], dict]] = {}
+
+    for i, (entry, content, embedding) in enumerate(zip(entries, contents, embeddings)):
+        entry_date = entry.get("entry_date") or timestamp[:10]
+        journal_timestamp = timestamp if timestamp.startswith(entry_date) else entry_date
+        journal_id = node_id("JournalEntry", journal_timestamp, content)
+        keys[f"entry:{i}"] = journal_id
+        journal_rows.append({
+            "id": journal_id, "content": content, "timestamp": journal_timestamp,
+            "mood": entry.get("mood", ""), "embedding": embedding
+        })
+
+        # Normalized name (events: type and description) -> {(label, id)} in this entry
+        named: dict[str, set] = {}
+
+        for j, entity in enumerate(entry.get("entities", [])):
+            label = _label(entity.get("type", ""))
+            name = (entity.get("name") or "").strip()
+            if not name:
+                continue
+            if label is None:
+                print(f"🧩 COMPILER: unknown entity type {entity.get('type')!r}")
+                return None
+
+            new_id = node_id(label, name)
+            resolved_id = resolved.get((label, normalize_name(name)))
+            if resolved_id == "MISSING":
+                missing.setdefault(label, {})[new_id] = {"id": new_id, "name": name}
+                resolved_id = new_id
+            target_id = resolved_id or new_id
+            properties = {"relation": entity["relation"]} if label == "Person" and entity.get("relation") else {}
+            node = nodes.setdefault(label, {}).setdefault(
+                target_id, {"id": target_id, "name": name, "properties": properties, "journal_ids": []}
+            )
+            if journal_id not in node["journal_ids"]:
+                node["journal_ids"].append(journal_id)
+            keys[f"entry:{i}:entity:{j}"] = target_id
+            named.setdefault(normalize_name(name), set()).add((label, target_id))
+
+        for j, event in enumerate(entry.get("events", [])):
+            event_id = node_id("Event", event.get("type", ""), event.get("timestamp", ""), event.get("description") or "")
+            properties = {
+                k: event[k] for k in ("timestamp", "description", "source_date", "is_clarified")
+                if event.get(k) is not None
+            }
+            node = nodes.setdefault("Event", {}).setdefault(
+                event_id, {"id": event_id, "name": event.get("type"), "properties": properties, "journal_ids": []}
+            )
+            if journal_id not in node["journal_ids"]:
+                node["journal_ids"].append(journal_id)
+            keys[f"entry:{i}:event:{j}"] = event_id
+            for event_name in (event.get("type"), event.get("description")):
+                if isinstance(event_name, str) and event_name.strip():
+                    named.setdefault(normalize_name(event_name), set()).add(("Event", event_id))
+
+        entry_links = _entry_links(entry, named)
+        if entry_links is None:
+            return None
+        for rel_type, source_label, source_id, target_label, target_id in entry_links:
+            links.setdefault((rel_type, source_label, target_label), {})[(source_id, target_id)] = {
+                "source": source_id, "target": target_id
+            }
+
+    queries, params, embed_texts = [], [], []
+    for label, rows in missing.items():
+        queries.append(_repair_missing_ids_query(label))
+        params.append({"nodes": list(rows.values())})
+        embed_texts.append(None)
+    embedded = [row for row in journal_rows if row["embedding"]]
+    if embedded:
+        queries.append(_journal_entries_query(embed_text=False))
+        params.append({"entries": embedded})
+        embed_texts.append(None)
+    for row in journal_rows:
+        if not row["embedding"]:
+            queries.append(_journal_entries_query(embed_text=True))
+            params.append({"entries": [{k: v for k, v in row.items() if k != "embedding"}]})
+            embed_texts.append(row["content"])
+    for label, label_nodes in nodes.items():
+        queries.append(_link_nodes_query(label))
+        params.append({"nodes": list(label_nodes.values())})
+        embed_texts.append(None)
+    for (rel_type, source_label, target_label), rows in links.items():
+        queries.append(_relationship_query(rel_type, source_label, target_label))
+        params.append({"links": list(rows.values())})
+        embed_texts.append(None)
+
+    return CompiledQueries(
+        queries=queries, params=params, embed_texts=embed_texts,
+        node_ids=list(dict.fromkeys(keys.values())), keys=keys
+    ).model_dump()
+
+
+def compile_queries(
+    entity_output: dict,
+    existing_entities: list[dict],
+    content: str,
+    timestamp: str,
+    context_output: Any = None,
+    embedding: Optional[list[float]] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Compile one WRITE turn into parameterized Cypher.
+
+    Args:
+        entity_output: EntityOutput from entity_extractor
+        existing_entities: Resolution result (entities already in the graph)
+        content: Journal text of this turn (thought_for_journal_entry)
+        timestamp: Time of the turn ("YYYY-MM-DD HH:MM:SS")
+        context_output: RetrieverOutput (for merge_commands), if any
+        embedding: Precomputed embedding of content (embedding cache); without
+            it the MCP server embeds the text (embed_text)
+
+    Returns:
+        CompiledQueries as a dict, or None when write_agent must handle the turn
+    """
+    entries = (entity_output or {}).get("entries") or []
+    if len(entries) != 1:
+        print(f"🧩 COMPILER: {len(entries)} entries, falling back to write_agent")
+        return None
+
+    merge_commands = _merge_commands(context_output)
+    if any(not m.get("keep_id") or m.get("keep_id") == "MISSING" for m in merge_commands):
+        print("🧩 COMPILER: merge command without keep id, falling back to write_agent")
+        return None
+
+    compiled = compile_bulk_write(
+        entity_output, existing_entities, [content], timestamp,
+        embeddings=[embedding] if embedding else None
+    )
+    if compiled is None:
+        print("🧩 COMPILER: falling back to write_agent")
+        return None
+
+    aliases = [(ALIAS_QUERY, {"keep_id": m["keep_id"], "remove_name": m.get("remove_name")}) for m in merge_commands]
+    compiled["queries"] = [q for q, _ in aliases] + compiled["queries"]
+    compiled["params"] = [p for _, p in aliases] + compiled["params"]
+    compiled["embed_texts"] = [None] * len(aliases) + compiled["embed_texts"]
+    print(f"🧩 COMPILER: {len(compiled['queries'])} queries, {len(compiled['node_ids'])} nodes (write_agent skipped)")
+    return compiled
+
+
+async def bulk_write(
+    entity_output: dict,
+    existing_entities: list[dict],
+    contents: list[str],
+    timestamp: str,
+    embeddings: Optional[list[Optional[list[float]]]] = None
+) -> dict[str, Any]:
+    """
+    Write a whole EntityOutput (all entries) in one transaction.
+    Without precomputed embeddings, all entries are embedded in one batch
+    through the embedding cache when it is configured. Entries still
+    without a vector are embedded by the server (embed_text per entry);
+    with more than one such entry the statements run sequentially.
+
+    Returns:
+        {"success": True, "keys": {"entry:0": "<id>", "entry:0:entity:1": "<id>"},
+         "statements": 6, "mode": "transaction", "error": None}
+    """
+    from .embedding_cache import get_embedding_service
+    from .query_executor import execute_queries
+
+    embedder = get_embedding_service()
+    if embeddings is None and embedder and contents:
+        try:
+            embeddings = await embedder.embed_many(contents)
+        except Exception as e:
+            print(f"⚠️ Embedding failed, leaving entries to the server (embed_text): {e}")
+    compiled = compile_bulk_write(entity_output, existing_entities, contents, timestamp, embeddings=embeddings)
+    if compiled is None:
+        return {"success": False, "keys": {}, "statements": 0, "mode": None, "error": "Extraction outside the schema contract"}
+
+    result = await execute_queries(compiled)
+    if result is None:
+        return {"success": False, "keys": {}, "statements": 0, "mode": None, "error": "Blocked by pre-flight checks"}
+    return {
+        "success": result["success"],
+        "keys": compiled["keys"] if result["success"] else {},
+        "statements": result["statements"],
+        "mode": result["mode"],
+        "error": result["error"],
+    }
@@ -0,0 +1,165 @@
+# File: digital_brain/services/degree_service.py
+"""
+Materialized Degree Service.
+Maintains a `degree` property (number of relationships) on graph nodes so
+core-entity ranking is an indexed range scan instead of a global
+`COUNT { (n)--() }` aggregation.
+
+Write-side maintenance:
+- refresh_degrees(): after each WRITE turn (in the background job queue),
+  recomputes degree for the nodes the turn touched: resolved entity IDs,
+  the IDs the writes returned or were compiled with, and the neighbours of
+  touched JournalEntries. Every lookup is an id seek within one label
+- consistency_checker merges recompute the neighbours of deleted duplicates
+- backfill_degrees(): one-off job for existing graphs
+"""
+
+import json
+import re
+from typing import Any
+from ..tools.mcp_client import call_mcp_tool, execute_cypher_many
+from .graph_schema import ENTITY_LABELS
+
+BACKFILL_BATCH_SIZE = 500
+
+def _refresh_touched_degrees_query(labels: tuple[str, ...] = ENTITY_LABELS + ("JournalEntry",)) -> str:
+    """
+    Recompute degree for touched nodes and the neighbours of touched
+    JournalEntries (a new entry links to every node it mentions). One
+    branch per label, so every ID is an index seek.
+    """
+    branches = [f"""
+    UNWIND $ids AS node_id
+    MATCH (n:{label} {{id: node_id}})
+    RETURN n""" for label in labels]
+    branches.append("""
+    UNWIND $ids AS node_id
+    MATCH (:JournalEntry {id: node_id})--(n)
+    RETURN n""")
+    union = "\n    UNION".join(branches)
+    return f"""
+CALL {{{union}
+}}
+WITH DISTINCT n
+SET n.degree = COUNT {{ (n)--() }}
+RETURN count(n) AS refreshed
+"""
+
+
+REFRESH_TOUCHED_DEGREES_QUERY = _refresh_touched_degrees_query()
+
+# Nodes whose degree is missing or out of date, one batch at a time
+BACKFILL_DEGREES_QUERY = """
+MATCH (n)
+WITH n, COUNT { (n)--() } AS actual
+WHERE n.degree IS NULL OR n.degree <> actual
+WITH n, actual LIMIT $batch_size
+SET n.degree = actual
+RETURN count(n) AS updated
+"""
+
+# Node IDs written as literals by write_agent, e.g. MERGE (p:Person {id: "..."})
+_ID_LITERAL_PATTERN = re.compile(r"""\bid\s*(?::|=)\s*["']([^"']+)["']""")
+
+
+def degree_index_statements() -> list[str]:
+    """Range indexes that serve `n.degree >= $threshold` per entity label."""
+    return [
+        f"CREATE INDEX {label.lower()}_degree IF NOT EXISTS FOR (n:{label}) ON (n.degree)"
+        for label in ENTITY_LABELS
+    ]
+
+
+def extract_node_ids(queries: list[str]) -> list[str]:
+    """IDs referenced as literals in generated Cypher (MISSING placeholders skipped)."""
+    ids = []
+    for query in queries:
+        for node_id in _ID_LITERAL_PATTERN.findall(query):
+            if node_id != "MISSING" and node_id not in ids:
+                ids.append(node_id)
+    return ids
+
+
+def extract_created_ids(executor_text: str) -> list[str]:
+    """IDs reported under `created_nodes` in the executor agent's JSON reply."""
+    start, end = executor_text.find("{"), executor_text.rfind("}")
+    if start == -1 or end <= start:
+        return []
+    try:
+        created = json.loads(executor_text[start:end + 1]).get("created_nodes") or {}
+    except (json.JSONDecodeError, AttributeError):
+        return []
+    ids = []
+    for value in created.values() if isinstance(created, dict) else []:
+        for node_id in (value if isinstance(value, list) else [value]):
+            if isinstance(node_id, str) and node_id and node_id != "MISSING" and node_id not in ids:
+                ids.append(node_id)
+    return ids
+
+
+def _first_count(result: dict[str, Any], key: str) -> int:
+    """Read an integer column from the first record of a write tool result."""
+    try:
+        records = json.loads(result["content"][0]["text"])
+        return int(records[0].get(key, 0)) if records else 0
+    except (KeyError, IndexError, TypeError, ValueError):
+        return 0
+
+
+async def refresh_degrees(node_ids: list[str]) -> int:
+    """
+    Recompute `degree` for nodes touched by a write turn. Runs as a
+    background job (job_queue key "degree_refresh"); node_ids of coalesced
+    turns are merged.
+
+    Args:
+        node_ids: IDs of nodes whose relationships may have changed, including
+            the IDs the writes created
+
+    Returns:
+        Number of nodes refreshed
+    """
+    arguments = {
+        "query": REFRESH_TOUCHED_DEGREES_QUERY,
+        "params": json.dumps({"ids": [i for i in node_ids if i and i != "MISSING"]})
+    }
+    result = await call_mcp_tool("write_neo4j_cypher", arguments)
+    refreshed = _first_count(result, "refreshed")
+    print(f"📐 DEGREE: refreshed {refreshed} nodes")
+
+    # Core entity ranking reads degree: revalidate it against the new values
+    from .core_entity_service import mark_core_entities_stale
+    mark_core_entities_stale()
+    return refreshed
+
+
+async def backfill_degrees(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    One-off job: create the degree indexes and set `degree` on every node.
+    Runs in batches until no node is missing or out of date. Safe to re-run.
+
+    Returns:
+        Total number of nodes updated
+    """
+    results = await execute_cypher_many(degree_index_statements(), tool_name="write_neo4j_cypher")
+    for statement, result in zip(degree_index_statements(), results):
+        if isinstance(result, Exception):
+            print(f"⚠️ Degree index creation failed ({statement}): {result}")
+
+    total = 0
+    while True:
+        arguments = {
+            "query": BACKFILL_DEGREES_QUERY,
+            "params": json.dumps({"batch_size": batch_size})
+        }
+        updated = _first_count(await call_mcp_tool("write_neo4j_cypher", arguments), "updated")
+        total += updated
+        print(f"📐 Degree backfill: {total} nodes updated")
+        if updated < batch_size:
+            return total
+
+
+if __name__ == "__main__":
+    import asyncio
+    from ..tools.mcp_client import run_with_mcp_client
+    asyncio.run(run_with_mcp_client(backfill_degrees()))
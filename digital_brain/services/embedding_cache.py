@@ -0,0 +1,245 @@
+# File: digital_brain/services/embedding_cache.py
+"""
+Content-Hash Embedding Cache.
+Computes JournalEntry and search_query embeddings client-side, once per
+distinct content, instead of sending `embed_text` to the MCP server on
+every (re)try.
+
+Storage (per model, under EMBEDDING_CACHE_DIR):
+- vectors.f32: fixed-width float32 rows, read through mmap
+- index.jsonl: append-only log of {"key": <sha256>, "row": N}
+Key = sha256(model + NFC-normalized, whitespace-collapsed text).
+
+Misses of one embed_many() call are embedded in a single batched request;
+concurrent requests for the same text share one in-flight computation.
+
+Opt-in: set DIGITAL_BRAIN_EMBEDDING_MODEL to the model used by the
+server's `journal_entry_embedding_index` (vectors from another model are
+not comparable). Without it, get_embedding_service() returns None and
+writes keep using embed_text.
+"""
+
+import array
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import re
+import time
+import unicodedata
+from typing import Optional
+
+EMBEDDING_MODEL = os.getenv("DIGITAL_BRAIN_EMBEDDING_MODEL")
+EMBEDDING_CACHE_DIR = os.getenv(
+    "DIGITAL_BRAIN_EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "digital_brain", "embeddings")
+)
+MAX_BATCH_SIZE = 100  # texts per embed_content request
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_content(text: str) -> str:
+    """Canonical form used for hashing: NFC, trimmed, whitespace collapsed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def content_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_content(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk float32 vector store addressed by content key.
+    """
+
+    def __init__(self, model: str, cache_dir: str = EMBEDDING_CACHE_DIR):
+        self.model = model
+        self.dir = os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", model))
+        os.makedirs(self.dir, exist_ok=True)
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.index_path = os.path.join(self.dir, "index.jsonl")
+        self.dim: Optional[int] = None
+        self._rows: dict[str, int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load_index(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line after a crash
+                if "dim" in record:
+                    self.dim = record["dim"]
+                else:
+                    self._rows[record["key"]] = record["row"]
+        # Drop rows whose vector bytes never made it to disk
+        if self.dim:
+            complete = os.path.getsize(self.vectors_path) // (self.dim * 4) if os.path.exists(self.vectors_path) else 0
+            self._rows = {k: r for k, r in self._rows.items() if r < complete}
+
+    def _view(self, row: int) -> Optional[mmap.mmap]:
+        end = (row + 1) * self.dim * 4
+        if self._mmap is None or len(self._mmap) < end:
+            if self._mmap is not None:
+                self._mmap.close()
+            with open(self.vectors_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def get(self, key: str) -> Optional[list[float]]:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        start = row * self.dim * 4
+        vector = array.array("f")
+        vector.frombytes(self._view(row)[start:start + self.dim * 4])
+        return vector.tolist()
+
+    def put_many(self, items: list[tuple[str, list[float]]]) -> None:
+        """Append vectors (all of the same dimension) and index them."""
+        items = [(k, v) for k, v in items if k not in self._rows]
+        if not items:
+            return
+        index_lines = []
+        if self.dim is None:
+            self.dim = len(items[0][1])
+            index_lines.append(json.dumps({"dim": self.dim}))
+        next_row = len(self._rows) and max(self._rows.values()) + 1
+        data = array.array("f")
+        for offset, (key, vector) in enumerate(items):
+            if len(vector) != self.dim:
+                raise ValueError(f"Embedding dimension {len(vector)} != cache dimension {self.dim}")
+            data.extend(vector)
+            index_lines.append(json.dumps({"key": key, "row": next_row + offset}))
+        # Vectors first, index second: an index entry never points past the data
+        with open(self.vectors_path, "ab") as f:
+            f.seek(next_row * self.dim * 4)
+            f.truncate()
+            f.write(data.tobytes())
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(index_lines) + "\n")
+        for offset, (key, _) in enumerate(items):
+            self._rows[key] = next_row + offset
+
+
+class EmbeddingService:
+    """
+    Batched, cached embeddings for one model.
+    """
+
+    def __init__(self, model: str, cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.cache = cache or EmbeddingCache(model)
+        self._client = None
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self._miss_seconds = 0.0
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        response = await self._client.aio.models.embed_content(model=self.model, contents=texts)
+        return [list(e.values) for e in response.embeddings]
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embeddings for texts, by position; only uncached texts hit the model."""
+        keys = [content_key(self.model, t) for t in texts]
+        results: dict[str, list[float]] = {}
+        waiting: dict[str, asyncio.Future] = {}
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in waiting or key in missing:
+                continue
+            vector = self.cache.get(key)
+            if vector is not None:
+                results[key] = vector
+                self.hits += 1
+            elif key in self._in_flight:
+                waiting[key] = self._in_flight[key]
+                self.hits += 1  # Computed once by the concurrent caller
+            else:
+                missing[key] = normalize_content(text)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._in_flight.update(futures)
+            try:
+                start = time.perf_counter()
+                pending = list(missing.items())
+                for i in range(0, len(pending), MAX_BATCH_SIZE):
+                    batch = pending[i:i + MAX_BATCH_SIZE]
+                    vectors = await self._embed_batch([text for _, text in batch])
+                    self.requests += 1
+                    self.cache.put_many([(key, vector) for (key, _), vector in zip(batch, vectors)])
+                    for (key, _), vector in zip(batch, vectors):
+                        results[key] = vector
+                        futures[key].set_result(vector)
+                self._miss_seconds += time.perf_counter() - start
+                self.misses += len(missing)
+            except BaseException as e:
+                # Also on cancellation (e.g. a wait_for timeout): concurrent
+                # callers awaiting these futures must not hang
+                for future in futures.values():
+                    if future.done():
+                        continue
+                    if isinstance(e, Exception):
+                        future.set_exception(e)
+                        future.exception()  # Retrieved here; concurrent waiters re-raise
+                    else:
+                        future.cancel()
+                raise
+            finally:
+                for key in futures:
+                    self._in_flight.pop(key, None)
+
+        for key, future in waiting.items():
+            try:
+                # Shielded: cancelling this caller must not cancel the shared future
+                results[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This caller was cancelled
+                # The caller computing it was cancelled: compute it here
+                results[key] = await self.embed(texts[keys.index(key)])
+        return [results[key] for key in keys]
+
+    async def embed(self, text: str) -> list[float]:
+        return (await self.embed_many([text]))[0]
+
+    def stats(self) -> dict:
+        """Hit rate and the embedding latency the hits saved (at the average miss cost)."""
+        lookups = self.hits + self.misses
+        per_miss_ms = self._miss_seconds * 1000 / self.misses if self.misses else 0.0
+        return {
+            "model": self.model,
+            "cached_vectors": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "embed_requests": self.requests,
+            "latency_saved_ms": round(self.hits * per_miss_ms, 1),
+        }
+
+
+_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> Optional[EmbeddingService]:
+    """Process-wide embedding service, or None when no model is configured."""
+    global _service
+    if _service is None and EMBEDDING_MODEL:
+        _service = EmbeddingService(EMBEDDING_MODEL)
+    return _service
@@ -4,8 +4,60 @@ Deterministic Entity Resolution Service.
 Uses PRD schema contract to check if entities already exist in Neo4j.
 """
 
+import asyncio
 from typing import Any
-from ..tools.mcp_client import execute_cypher
+from ..tools.mcp_client import execute_cypher_many
+from .alias_index import alias_index
+from .name_index import name_index
+
+
+# STEP 0 fallback query (used only when the in-process alias index is unavailable)
+BULK_ALIAS_QUERY = """
+UNWIND $names AS q
+MATCH (a:Alias)
+WHERE toLower(a.from_name) = toLower(q)
+WITH q, head(collect(a)) AS a
+RETURN q AS query, a.canonical_id AS id, a.to_name AS name
+"""
+
+
+def _build_bulk_lookup_query(entity_type: str) -> str:
+    """
+    Build the type-specific existence query based on PRD schema contract.
+    UNWINDs all names of one label; names without a match return no row.
+    """
+    if entity_type == "Person":
+        # Person: use CASE to handle both string and array name properties
+        return """
+        UNWIND $names AS q
+        CALL {
+            WITH q
+            MATCH (p:Person) 
+            WHERE CASE 
+                WHEN p.name IS :: LIST<STRING> THEN ANY(n IN p.name WHERE toLower(n) CONTAINS toLower(q))
+                ELSE toLower(p.name) CONTAINS toLower(q)
+            END
+            RETURN p
+            LIMIT 1
+        }
+        RETURN q AS query,
+               coalesce(p.id, 'MISSING') AS id, 
+               CASE WHEN p.name IS :: LIST<STRING> THEN p.name[0] ELSE p.name END AS name, 
+               'Person' AS type
+        """
+
+    # Event: lookup by type (not name); everything else by case-insensitive name
+    prop = "type" if entity_type == "Event" else "name"
+    return f"""
+    UNWIND $names AS q
+    CALL {{
+        WITH q
+        MATCH (n:{entity_type}) WHERE toLower(n.{prop}) = toLower(q)
+        RETURN n
+        LIMIT 1
+    }}
+    RETURN q AS query, coalesce(n.id, 'MISSING') AS id, n.{prop} AS name, '{entity_type}' AS type
+    """
 
 
 async def resolve_entities(entity_output: dict) -> dict[str, Any]:
@@ -13,6 +65,8 @@ async def resolve_entities(entity_output: dict) -> dict[str, Any]:
     Check which entities from entity_output already exist in Neo4j.
     Uses PRD schema contract for type-specific lookups.
     Also checks Alias nodes for learned mappings from past merges.
+    All names are UNWIND-ed into one query per label and sent in a
+    single batched round trip, regardless of entity count.
     
     Args:
         entity_output: Output from entity_extractor agent (EntityOutput schema)
@@ -43,87 +97,83 @@ async def resolve_entities(entity_output: dict) -> dict[str, Any]:
     if not all_entities:
         return {"existing_entities": [], "new_entities": []}
     
-    for entity in all_entities:
+    named_entities = [e for e in all_entities if e.get("name", "")]
+    
+    # Group distinct names by label so each label is a single UNWIND query
+    names_by_type: dict[str, list[str]] = {}
+    for entity in named_entities:
+        names = names_by_type.setdefault(entity.get("type", ""), [])
+        if entity["name"] not in names:
+            names.append(entity["name"])
+    
+    # In-process indexes (warmed once per process, then no network call)
+    use_alias_index, use_name_index = await asyncio.gather(
+        alias_index.ensure_fresh(), name_index.ensure_warm()
+    )
+    
+    # STEP 0: Alias hits are answered from the in-process index
+    aliases = {}
+    if use_alias_index:
+        for name in dict.fromkeys(e["name"] for e in named_entities):
+            hit = alias_index.lookup(name)
+            if hit:
+                aliases[name.lower()] = {"id": hit[0], "name": hit[1]}
+    
+    # Only names without an alias hit need a type-specific lookup
+    names_by_type = {
+        t: [n for n in names if n.lower() not in aliases]
+        for t, names in names_by_type.items()
+    }
+    
+    # STEP 1a: Fuzzy labels (Person, Pet) are ranked by the local trigram index
+    fuzzy_matches = {}
+    if use_name_index:
+        for t in name_index.labels:
+            for name in names_by_type.pop(t, []):
+                fuzzy_matches[(t, name)] = name_index.resolve(t, name)
+    
+    entity_types = [t for t, names in names_by_type.items() if names]
+    
+    queries = [(_build_bulk_lookup_query(t), {"names": names_by_type[t]}) for t in entity_types]
+    if not use_alias_index:
+        all_names = list(dict.fromkeys(e["name"] for e in named_entities))
+        queries.append((BULK_ALIAS_QUERY, {"names": all_names}))
+    
+    # One round trip: one bulk lookup per label (+ alias lookup if index is down)
+    batch = await execute_cypher_many(queries) if queries else []
+    type_results = dict(zip(entity_types, batch))
+    
+    if not use_alias_index:
+        alias_results = batch[-1]
+        if isinstance(alias_results, Exception):
+            print(f"Alias lookup failed: {alias_results}")
+        else:
+            aliases = {r.get("query", "").lower(): r for r in alias_results if r.get("id")}
+    
+    for entity in named_entities:
         entity_type = entity.get("type", "")
-        entity_name = entity.get("name", "")
+        entity_name = entity["name"]
         
-        if not entity_name:
+        # STEP 0: Alias hits win (learned from past merges)
+        alias = aliases.get(entity_name.lower())
+        if alias:
+            existing.append({
+                "id": alias.get("id"),
+                "name": alias.get("name"),
+                "type": entity_type,
+                "original_query": entity_name,
+                "source": "alias"  # Mark as learned mapping
+            })
+            print(f"🧠 LEARNED: '{entity_name}' → '{alias.get('name')}' (from Alias)")
             continue
         
-        # STEP 0: Check Alias nodes first (learned from past merges)
-        alias_query = """
-        MATCH (a:Alias)
-        WHERE toLower(a.from_name) = toLower($name)
-        RETURN a.canonical_id AS id, a.to_name AS name
-        LIMIT 1
-        """
-        try:
-            alias_results = await execute_cypher(alias_query, {"name": entity_name})
-            if alias_results and len(alias_results) > 0:
+        if (entity_type, entity_name) in fuzzy_matches:
+            match = fuzzy_matches[(entity_type, entity_name)]
+            if match:
                 existing.append({
-                    "id": alias_results[0].get("id"),
-                    "name": alias_results[0].get("name"),
-                    "type": entity_type,
-                    "original_query": entity_name,
-                    "source": "alias"  # Mark as learned mapping
-                })
-                print(f"🧠 LEARNED: '{entity_name}' → '{alias_results[0].get('name')}' (from Alias)")
-                continue
-        except Exception as e:
-            print(f"Alias lookup failed: {e}")
-        
-        # STEP 1: Build type-specific query based on PRD schema contract
-        query = None
-        params = {"name": entity_name}
-        
-        if entity_type == "Person":
-            # Person: use CASE to handle both string and array name properties
-            query = """
-            MATCH (p:Person) 
-            WHERE CASE 
-                WHEN p.name IS :: LIST<STRING> THEN ANY(n IN p.name WHERE toLower(n) CONTAINS toLower($name))
-                ELSE toLower(p.name) CONTAINS toLower($name)
-            END
-            RETURN coalesce(p.id, 'MISSING') AS id, 
-                   CASE WHEN p.name IS :: LIST<STRING> THEN p.name[0] ELSE p.name END AS name, 
-                   'Person' AS type
-            LIMIT 1
-            """
-        elif entity_type == "Topic":
-            query = """
-            MATCH (t:Topic) WHERE toLower(t.name) = toLower($name)
-            RETURN coalesce(t.id, 'MISSING') AS id, t.name AS name, 'Topic' AS type
-            LIMIT 1
-            """
-        elif entity_type == "State":
-            query = """
-            MATCH (s:State) WHERE toLower(s.name) = toLower($name)
-            RETURN coalesce(s.id, 'MISSING') AS id, s.name AS name, 'State' AS type
-            LIMIT 1
-            """
-        elif entity_type == "Event":
-            # Event: lookup by type (not name)
-            event_type = entity.get("event_type", entity_name)
-            query = """
-            MATCH (e:Event) WHERE toLower(e.type) = toLower($name)
-            RETURN coalesce(e.id, 'MISSING') AS id, e.type AS name, 'Event' AS type
-            LIMIT 1
-            """
-        else:
-            # Generic fallback for any other node type
-            query = f"""
-            MATCH (n:{entity_type}) WHERE toLower(n.name) = toLower($name)
-            RETURN coalesce(n.id, 'MISSING') AS id, n.name AS name, '{entity_type}' AS type
-            LIMIT 1
-            """
-        
-        try:
-            results = await execute_cypher(query, params)
-            if results and len(results) > 0:
-                existing.append({
-                    "id": results[0].get("id"),
-                    "name": results[0].get("name"),
-                    "type": results[0].get("type"),
+                    "id": match["id"],
+                    "name": match["name"],
+                    "type": match["type"],
                     "original_query": entity_name  # What user called it
                 })
             else:
@@ -131,13 +181,32 @@ async def resolve_entities(entity_output: dict) -> dict[str, Any]:
                     "name": entity_name,
                     "type": entity_type
                 })
-        except Exception as e:
-            print(f"Entity lookup failed for {entity_name}: {e}")
+            continue
+        
+        # STEP 1b: Type-specific server lookup result
+        results = type_results[entity_type]
+        if isinstance(results, Exception):
+            print(f"Entity lookup failed for {entity_name}: {results}")
             # On error, assume it's new to avoid blocking
             new_entities.append({
                 "name": entity_name,
                 "type": entity_type
             })
+            continue
+        
+        match = next((r for r in results if r.get("query") == entity_name), None)
+        if match:
+            existing.append({
+                "id": match.get("id"),
+                "name": match.get("name"),
+                "type": match.get("type"),
+                "original_query": entity_name  # What user called it
+            })
+        else:
+            new_entities.append({
+                "name": entity_name,
+                "type": entity_type
+            })
     
     return {
         "existing_entities": existing,
@@ -0,0 +1,114 @@
+# File: digital_brain/services/fast_router.py
+"""
+Deterministic Fast-Path Router.
+Decides the obvious cases before router_agent is called:
+- SKIP: every pending thought is a filler / acknowledgement / greeting,
+  emoji or punctuation only (Ukrainian, Russian and English lexicon)
+- WRITE: long (WRITE_MIN_WORDS+), multi-sentence input with at least one
+  feeling or reasoning marker. Length stands in for the router's "complete
+  picture" rule; there is no separate check that an event is named, so
+  shorter or marker-free input is left to router_agent
+Anything else returns None and goes to router_agent.
+
+Decisions use the RouterOutput shape so they can be stored in
+`routing_decision` directly. tests/eval_fast_router.py reports precision
+per route on a tuning set and on a held-out set.
+"""
+
+import re
+from typing import Any, Optional
+from ..models.router import RouterOutput
+
+# Normalized phrases that carry no journal content
+FILLER_PHRASES = {
+    # English
+    "ok", "okay", "k", "kk", "yes", "yeah", "yep", "no", "nope", "sure", "right",
+    "exactly", "true", "cool", "nice", "great", "good", "fine", "got it", "i see",
+    "makes sense", "thanks", "thank you", "thx", "ty", "hi", "hello", "hey", "bye",
+    "test", "hmm", "hm", "lol", "wow", "agreed", "same",
+    # Ukrainian
+    "так", "ні", "ок", "окей", "добре", "гаразд", "дякую", "дякс", "спасибі",
+    "привіт", "вітаю", "бувай", "ага", "угу", "точно", "саме так", "зрозуміло",
+    "згоден", "згодна", "клас", "супер", "круто", "ясно", "тест", "хм", "ну",
+    "дуже дякую", "та да", "ага так", "авжеж", "звісно", "ладно",
+    # Russian
+    "да", "нет", "хорошо", "спасибо", "понятно", "ясно", "пока", "ладно", "норм",
+}
+
+# Words that signal feelings or reasoning (the "analysis" part of a WRITE).
+# Each marker is a whole word or a stem with its allowed endings, matched on
+# word boundaries, so "сумно" counts but "сумка", "радіо" or "злива" do not.
+ANALYSIS_MARKERS = (
+    # Ukrainian
+    r"відчува\w*", r"відчу(?:в|ла|ли|ття)\w*", r"почува\w*", r"сум(?:н|ув|ую|ує)\w*",
+    r"рад(?:ий|а|е|і|ого|ому|ість|ості|ію|ієш|іє|ів|іла|іли)", r"щаслив\w*",
+    r"зл(?:ий|а|і|ість|ості|юся|юсь|ився|илася|илась|илися|ишся|иться)", r"страх(?:у|ом|и|ів|ам)?",
+    r"страшн\w*", r"боюс[яь]", r"тривог\w*", r"тривож\w*", r"хвилю[юєв]\w*",
+    r"образ(?:ив|ила|или|ливо|лив\w*|ився|илася|илась|ились|а|ою)", r"ображ\w*", r"сором\w*",
+    r"вдячн\w*", r"розчарув\w*", r"втомил\w*", r"втом(?:а|и|у|лен)\w*", r"бо", r"тому що",
+    r"через те", r"зрозумі(?:в|ла|ли)", r"усвідом\w*", r"думаю", r"здається",
+    # Russian
+    r"чувств\w*", r"почувств\w*", r"потому что", r"боюсь", r"понял[аи]?",
+    # English
+    r"feel\w*", r"felt", r"because", r"reali[sz]\w*", r"afraid", r"happy", r"sad", r"angry",
+    r"anxious", r"grateful", r"ashamed", r"upset", r"tired", r"i think",
+)
+_ANALYSIS = re.compile(rf"(?<!\w)(?:{'|'.join(ANALYSIS_MARKERS)})(?!\w)")
+
+# Minimum size of an obvious WRITE
+WRITE_MIN_WORDS = 60
+WRITE_MIN_SENTENCES = 3
+
+_WORD = re.compile(r"[^\W\d_]+(?:['ʼ’][^\W\d_]+)?")
+_SENTENCE_END = re.compile(r"[.!?…]+(?:\s|$)")
+_FILLER_STRIP = re.compile(r"[\s\W_]+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase words only, punctuation/emoji removed."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def is_filler(text: str) -> bool:
+    """
+    True for acknowledgements / greetings and input with no letters at all
+    (emoji, punctuation, "+", "👍👍").
+    """
+    if not _FILLER_STRIP.sub("", text):
+        return True  # Emoji / punctuation only
+    normalized = _normalize(text)
+    if not normalized:
+        return not any(ch.isdigit() for ch in text)
+    if normalized in FILLER_PHRASES:
+        return True
+    # Repeated fillers: "ок ок", "дякую дякую", "так так"
+    words = normalized.split()
+    return len(words) <= 3 and all(word in FILLER_PHRASES for word in words)
+
+
+def is_structured_write(text: str) -> bool:
+    """Long, multi-sentence input that also carries feelings or reasoning."""
+    if len(_WORD.findall(text)) < WRITE_MIN_WORDS:
+        return False
+    if len(_SENTENCE_END.findall(text.strip() + " ")) < WRITE_MIN_SENTENCES:
+        return False
+    return _ANALYSIS.search(text.lower()) is not None
+
+
+def fast_route(thoughts: list[str]) -> Optional[dict[str, Any]]:
+    """
+    Route obvious cases without an LLM.
+
+    Args:
+        thoughts: Unwritten thoughts of this turn (buffer + current input)
+
+    Returns:
+        A RouterOutput-shaped dict ({"route": ..., "missing": ...}),
+        or None when router_agent should decide
+    """
+    thoughts = [t for t in thoughts if t and t.strip()]
+    if not thoughts or all(is_filler(t) for t in thoughts):
+        return RouterOutput(route="SKIP", missing=None).model_dump()
+    if is_structured_write("\n".join(thoughts)):
+        return RouterOutput(route="WRITE", missing=None).model_dump()
+    return None
@@ -0,0 +1,56 @@
+# File: digital_brain/services/graph_schema.py
+"""
+Graph schema constants mirrored from docs/GRAPH_SCHEMA_CONTRACT.md.
+Keep in sync with the contract when labels or lookup strategies change.
+"""
+
+# Labels whose Phase 1 lookup strategy is "fuzzy" (served by the name index)
+FUZZY_LOOKUP_LABELS = ("Person", "Pet")
+
+# Core entity labels (section 1, "Core Entities")
+ENTITY_LABELS = ("Person", "Topic", "State", "Event", "Organization", "Location", "Pet", "Object")
+
+# Labels that are always core entities regardless of their degree
+ALWAYS_CORE_LABELS = ("Person", "Organization")
+
+# Operational nodes that never count as entities
+OPERATIONAL_LABELS = ("JournalEntry", "Alias", "LearningLog")
+
+# Relationship from a JournalEntry to each entity label (section 2).
+# State is not linked from entries: it hangs off (Person)-[:EXPERIENCED]->(State)
+JOURNAL_RELATIONSHIPS = {
+    "Person": "MENTIONS",
+    "Topic": "MENTIONS",
+    "Organization": "MENTIONS",
+    "Location": "MENTIONS",
+    "Pet": "MENTIONS",
+    "Object": "MENTIONS",
+    "Event": "DESCRIBES",
+}
+
+# Relationships between entities (section 2): type -> (source labels, target labels)
+ENTITY_RELATIONSHIPS = {
+    "EXPERIENCED": (("Person",), ("State",)),
+    "PARTICIPATED": (("Person",), ("Event",)),
+    "RELATED_TO": (("Topic",), ("Topic",)),
+    "LIVES_IN": (("Person",), ("Location",)),
+    "LOCATED_AT": (("Event",), ("Location",)),
+    "OWNS": (("Person",), ("Pet", "Object")),
+    "WORKS_AT": (("Person",), ("Organization",)),
+}
+
+# Labels that only exist through an entity relationship (Rule 3)
+ANCHOR_RELATIONSHIPS = {"State": "EXPERIENCED"}
+
+# Entity types the extractor sometimes emits outside the contract
+LABEL_SYNONYMS = {
+    "Place": "Location",
+    "City": "Location",
+    "Country": "Location",
+    "Company": "Organization",
+    "Emotion": "State",
+    "Feeling": "State",
+    "Animal": "Pet",
+    "Concept": "Topic",
+    "Project": "Topic",
+}
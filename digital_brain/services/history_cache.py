@@ -0,0 +1,87 @@
+# File: digital_brain/services/history_cache.py
+"""
+Entity History Cache.
+Keeps the latest JournalEntries of each entity (the exact-match branch of
+hybrid retrieval) in memory, keyed by entity id, so core people and places
+mentioned turn after turn are not re-fetched from the graph.
+
+- LRU eviction with a size cap (entities, not rows)
+- Invalidation: a write that creates MENTIONS / DESCRIBES / PARTICIPATED
+  edges to an entity drops its entry (invalidate_for_write), as does
+  deleting the entity (consistency checker merges)
+- Only entities with a real id are cached; name-matched (MISSING id)
+  lookups always go to the graph
+- A read that raced with an invalidation is not stored (version check)
+"""
+
+import re
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+HISTORY_CACHE_SIZE = 256  # entities
+
+# Relationship types that add an entry to an entity's history
+HISTORY_EDGE_PATTERN = re.compile(r"\b(MENTIONS|DESCRIBES|PARTICIPATED)\b")
+
+
+class EntityHistoryCache:
+    """
+    LRU map: entity id -> history rows (possibly empty).
+    """
+
+    def __init__(self, max_entities: int = HISTORY_CACHE_SIZE):
+        self.max_entities = max_entities
+        self._entries: OrderedDict[str, list[dict]] = OrderedDict()
+        self.version = 0  # Bumped by every invalidation
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._entries
+
+    def get(self, entity_id: str) -> Optional[list[dict]]:
+        rows = self._entries.get(entity_id)
+        if rows is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(entity_id)
+        self.stats["hits"] += 1
+        return rows
+
+    def put(self, entity_id: str, rows: list[dict], version: Optional[int] = None) -> None:
+        """Store rows read at `version` (skipped if anything was invalidated since)."""
+        if version is not None and version != self.version:
+            return
+        self._entries[entity_id] = rows
+        self._entries.move_to_end(entity_id)
+        while len(self._entries) > self.max_entities:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, entity_ids: Iterable[Optional[str]]) -> int:
+        """Drop the given entities; returns how many were cached."""
+        dropped = 0
+        for entity_id in entity_ids:
+            if entity_id and self._entries.pop(entity_id, None) is not None:
+                dropped += 1
+        self.version += 1
+        self.stats["invalidations"] += dropped
+        return dropped
+
+    def invalidate_for_write(self, queries: Iterable[str], node_ids: Iterable[Optional[str]]) -> int:
+        """
+        Invalidate the nodes a write touched if any of its queries creates
+        history edges (MENTIONS / DESCRIBES / PARTICIPATED).
+        """
+        if any(HISTORY_EDGE_PATTERN.search(q or "") for q in queries):
+            return self.invalidate(node_ids)
+        return 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Process-wide singleton
+history_cache = EntityHistoryCache()
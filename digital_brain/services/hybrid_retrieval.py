@@ -0,0 +1,243 @@
+# File: digital_brain/services/hybrid_retrieval.py
+"""
+Hybrid Context Retrieval.
+Deterministic implementation of the Context Retriever hybrid search
+(docs/PRD_MULTI_AGENT_ARCHITECTURE.md, "Hybrid Search Strategy"):
+
+1. Vector search: `journal_entry_embedding_index` with the turn's
+   search_query (precomputed embedding, or embed_text on the server)
+2. Exact match: latest JournalEntries linked to each entity of the turn
+   (by id, or by name for entities whose id is MISSING)
+3. Merge & rank: exact match > semantic score, times a recency boost
+
+Entity history is read from the in-process history cache first; only
+uncached entities are queried, and their rows are cached afterwards.
+
+All branches are one Cypher statement (UNION ALL of subqueries), so the
+whole retrieval is a single read_neo4j_cypher round trip. The result is
+handed to context_retriever as ready-made context.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+from ..tools.mcp_client import _records_from_result, call_mcp_tool
+from .graph_schema import ENTITY_LABELS, LABEL_SYNONYMS
+from .history_cache import history_cache
+
+VECTOR_INDEX = "journal_entry_embedding_index"
+VECTOR_TOP_K = 10
+MIN_VECTOR_SCORE = 0.7
+HISTORY_PER_ENTITY = 3
+MAX_CONTEXT_ENTRIES = 10
+EXACT_MATCH_SCORE = 1.0  # Ranks above any vector score
+RECENCY_WEIGHT = 0.1  # score * (1 + RECENCY_WEIGHT / days_ago)
+CONTENT_PREVIEW_CHARS = 300
+
+_HISTORY_RELS = "MENTIONS|DESCRIBES|PARTICIPATED"
+
+_VECTOR_BRANCH = f"""
+    CALL db.index.vector.queryNodes('{VECTOR_INDEX}', $top_k, $embedding)
+    YIELD node AS j, score
+    WHERE score >= $min_score
+    RETURN j, score, null AS entity_id, null AS entity_name"""
+
+
+def _history_branch(label: str, by_name: bool = False) -> str:
+    """Latest JournalEntries of one label's entities, matched by id or by name."""
+    if by_name:
+        param, match = f"$names_{label}", f"""MATCH (e:{label})
+    WHERE CASE
+        WHEN e.name IS :: LIST<STRING> THEN entity.name IN e.name
+        ELSE toLower(e.name) = toLower(entity.name)
+    END"""
+    else:
+        param, match = f"$ids_{label}", f"MATCH (e:{label} {{id: entity.id}})"
+    return f"""
+    UNWIND {param} AS entity
+    {match}
+    CALL {{
+        WITH e
+        MATCH (e)-[:{_HISTORY_RELS}]-(j:JournalEntry)
+        RETURN j ORDER BY j.timestamp DESC LIMIT $history_limit
+    }}
+    RETURN j, null AS score, e.id AS entity_id, entity.name AS entity_name"""
+
+
+def build_hybrid_query(entities: dict[str, list[dict]], vector: bool) -> Optional[str]:
+    """One statement: the vector branch plus id / name history branches per label."""
+    branches = [_VECTOR_BRANCH] if vector else []
+    for label in sorted(entities):
+        if any(e["id"] for e in entities[label]):
+            branches.append(_history_branch(label))
+        if any(not e["id"] for e in entities[label]):
+            branches.append(_history_branch(label, by_name=True))
+    if not branches:
+        return None
+    union = "\n    UNION ALL".join(branches)
+    return f"""
+    CALL {{{union}
+    }}
+    OPTIONAL MATCH (j)-[:MENTIONS]->(p:Person)
+    OPTIONAL MATCH (p)-[:EXPERIENCED]->(s:State)
+    RETURN j.id AS id,
+           substring(j.content, 0, $preview_chars) AS content,
+           toString(j.timestamp) AS timestamp,
+           score, entity_id, entity_name,
+           collect(DISTINCT p.name) AS people,
+           collect(DISTINCT s.name) AS states
+    """
+
+
+def _entities_by_label(existing_entities: list[dict], new_entities: list[dict]) -> dict[str, list[dict]]:
+    """{label: [{"id": id or None, "name": name}]} for the turn's entities."""
+    grouped: dict[str, dict[tuple, dict]] = {}
+    for entity in list(existing_entities) + list(new_entities):
+        label = LABEL_SYNONYMS.get(entity.get("type", ""), entity.get("type", ""))
+        name = entity.get("name")
+        if label not in ENTITY_LABELS or not name:
+            continue
+        entity_id = entity.get("id")
+        entity_id = None if not entity_id or entity_id == "MISSING" else entity_id
+        grouped.setdefault(label, {})[(entity_id, str(name).lower())] = {"id": entity_id, "name": name}
+    return {label: list(rows.values()) for label, rows in grouped.items()}
+
+
+def _days_ago(timestamp: Optional[str], now: datetime) -> float:
+    try:
+        return max((now - datetime.fromisoformat(str(timestamp)[:10])).days, 1)
+    except (TypeError, ValueError):
+        return float("inf")  # Undated entries get no boost
+
+
+def rank_results(records: list[dict], now: Optional[datetime] = None) -> list[dict]:
+    """
+    Merge vector and exact-match rows per JournalEntry and rank them.
+    Priority: exact match > semantic score, each boosted by recency.
+    """
+    now = now or datetime.now()
+    merged: dict[str, dict] = {}
+    for record in records:
+        entry = merged.setdefault(record.get("id"), {
+            "id": record.get("id"),
+            "content": record.get("content"),
+            "timestamp": record.get("timestamp"),
+            "people": record.get("people") or [],
+            "states": record.get("states") or [],
+            "matched_entities": [],
+            "vector_score": None,
+            "sources": [],
+        })
+        if record.get("score") is not None:
+            entry["vector_score"] = max(entry["vector_score"] or 0.0, record["score"])
+            source = "vector"
+        else:
+            if record.get("entity_name") not in entry["matched_entities"]:
+                entry["matched_entities"].append(record.get("entity_name"))
+            source = "exact"
+        if source not in entry["sources"]:
+            entry["sources"].append(source)
+
+    for entry in merged.values():
+        base = (EXACT_MATCH_SCORE if "exact" in entry["sources"] else 0.0) + (entry["vector_score"] or 0.0)
+        entry["score"] = round(base * (1 + RECENCY_WEIGHT / _days_ago(entry["timestamp"], now)), 4)
+    return sorted(merged.values(), key=lambda e: (-e["score"], str(e["timestamp"] or "")))
+
+
+def format_context(entries: list[dict]) -> str:
+    """Compact, prompt-ready rendering of ranked entries."""
+    if not entries:
+        return "(No related past entries found)"
+    lines = []
+    for entry in entries:
+        tags = []
+        if entry["matched_entities"]:
+            tags.append("about " + ", ".join(str(n) for n in entry["matched_entities"]))
+        if entry["vector_score"] is not None:
+            tags.append(f"similarity {entry['vector_score']:.2f}")
+        if entry["people"]:
+            tags.append("people: " + ", ".join(str(n) for n in entry["people"]))
+        if entry["states"]:
+            tags.append("states: " + ", ".join(str(n) for n in entry["states"]))
+        lines.append(f"- [{str(entry['timestamp'])[:10]}] ({'; '.join(tags)}) {entry['content']}")
+    return "\n".join(lines)
+
+
+async def retrieve_context(
+    search_query: Optional[str],
+    existing_entities: list[dict],
+    new_entities: list[dict],
+    embedding: Optional[list[float]] = None
+) -> dict[str, Any]:
+    """
+    Run the hybrid search for one turn in a single round trip.
+
+    Args:
+        search_query: EntityOutput.search_query (vector branch; skipped if empty)
+        existing_entities: Resolution result (entities already in the graph)
+        new_entities: Entities not found by resolution (name match fallback)
+        embedding: Precomputed search_query embedding; otherwise the MCP
+            server embeds search_query (embed_text)
+
+    Returns:
+        {"entries": [ranked entries], "context": "<prompt-ready text>",
+         "vector": bool, "entities": N, "cached_entities": M}
+    """
+    entities = _entities_by_label(existing_entities, new_entities)
+    vector = bool(search_query or embedding)
+    result = {"entries": [], "context": format_context([]), "vector": vector,
+              "entities": sum(len(rows) for rows in entities.values()), "cached_entities": 0}
+
+    # Entity history served from the cache is not queried again
+    records: list[dict] = []
+    for label, rows in entities.items():
+        uncached = []
+        for entity in rows:
+            cached = history_cache.get(entity["id"]) if entity["id"] else None
+            if cached is None:
+                uncached.append(entity)
+            else:
+                records += cached
+                result["cached_entities"] += 1
+        entities[label] = uncached
+    entities = {label: rows for label, rows in entities.items() if rows}
+
+    query = build_hybrid_query(entities, vector)
+    if query is not None:
+        params: dict[str, Any] = {
+            "history_limit": HISTORY_PER_ENTITY,
+            "preview_chars": CONTENT_PREVIEW_CHARS,
+        }
+        for label, rows in entities.items():
+            params[f"ids_{label}"] = [e for e in rows if e["id"]]
+            params[f"names_{label}"] = [e for e in rows if not e["id"]]
+        arguments: dict[str, Any] = {"query": query, "params": params}
+        if vector:
+            params.update({"top_k": VECTOR_TOP_K, "min_score": MIN_VECTOR_SCORE})
+            if embedding:
+                params["embedding"] = embedding
+            else:
+                arguments["embed_text"] = search_query
+
+        version = history_cache.version
+        response = await call_mcp_tool("read_neo4j_cypher", arguments)
+        if response.get("isError"):
+            raise RuntimeError((response.get("content") or [{}])[0].get("text", "MCP tool error"))
+        fetched = _records_from_result(response)
+        records += fetched
+
+        by_entity: dict[str, list[dict]] = {e["id"]: [] for rows in entities.values() for e in rows if e["id"]}
+        for record in fetched:
+            if record.get("score") is None and record.get("entity_id") in by_entity:
+                by_entity[record["entity_id"]].append(record)
+        for entity_id, rows in by_entity.items():
+            history_cache.put(entity_id, rows, version=version)
+
+    entries = rank_results(records)[:MAX_CONTEXT_ENTRIES]
+    result["entries"] = entries
+    result["context"] = format_context(entries)
+    print(f"🔎 HYBRID RETRIEVAL: {len(entries)} entries "
+          f"({sum('vector' in e['sources'] for e in entries)} semantic, "
+          f"{sum('exact' in e['sources'] for e in entries)} entity history, "
+          f"{result['cached_entities']} entities from cache) in "
+          f"{'one query' if query is not None else 'no queries'}")
+    return result
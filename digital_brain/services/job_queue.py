@@ -0,0 +1,152 @@
+# File: digital_brain/services/job_queue.py
+"""
+Background Job Queue.
+Runs post-write maintenance (e.g. the consistency reflex loop) off the
+request path so the response agent does not wait for it.
+
+- Debounce: a job starts only after `debounce` seconds without new triggers
+- Coalescing: repeated triggers for the same key are merged into one run;
+  list-valued arguments are concatenated (duplicates dropped)
+- One run per key at a time; triggers arriving mid-run schedule one follow-up
+- Bounded concurrency across keys via a semaphore
+- status() exposes the state of every job for logs / health endpoints
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+DEBOUNCE_SECONDS = 2.0
+MAX_CONCURRENT_JOBS = 2
+
+
+@dataclass
+class JobStatus:
+    key: str
+    state: str = "idle"  # idle | pending | running | done | failed
+    triggers: int = 0  # triggers coalesced into the pending / current run
+    runs: int = 0
+    last_started: Optional[float] = None
+    last_duration_ms: Optional[float] = None
+    last_result: Any = None
+    last_error: Optional[str] = None
+    # Arguments accumulated for the next run
+    pending_kwargs: dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "state": self.state,
+            "triggers": self.triggers,
+            "runs": self.runs,
+            "last_started": self.last_started,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+def _coalesce(current: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Merge trigger arguments: lists are concatenated, other values replaced."""
+    merged = dict(current)
+    for name, value in new.items():
+        previous = merged.get(name)
+        if isinstance(previous, list) and isinstance(value, list):
+            merged[name] = list(dict.fromkeys(previous + value))
+        else:
+            merged[name] = list(value) if isinstance(value, list) else value
+    return merged
+
+
+class BackgroundJobQueue:
+    """
+    Debounced, coalescing queue of keyed async jobs.
+    """
+
+    def __init__(self, debounce: float = DEBOUNCE_SECONDS, max_concurrency: int = MAX_CONCURRENT_JOBS):
+        self.debounce = debounce
+        self.max_concurrency = max_concurrency
+        self._jobs: dict[str, JobStatus] = {}
+        self._funcs: dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._last_trigger: dict[str, float] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def submit(self, key: str, func: Callable[..., Awaitable[Any]], **kwargs: Any) -> JobStatus:
+        """
+        Trigger a job. Returns immediately; the job runs in the background.
+
+        Args:
+            key: Coalescing key (one run per key at a time)
+            func: Coroutine function called with the merged kwargs
+            **kwargs: Arguments for this trigger (lists are merged across triggers)
+
+        Returns:
+            The job's status record
+        """
+        job = self._jobs.setdefault(key, JobStatus(key))
+        job.pending_kwargs = _coalesce(job.pending_kwargs, kwargs)
+        job.triggers += 1
+        if job.state != "running":
+            job.state = "pending"
+        self._funcs[key] = func
+        self._last_trigger[key] = time.monotonic()
+
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            self._tasks[key] = asyncio.get_running_loop().create_task(self._worker(key))
+        return job
+
+    async def _worker(self, key: str) -> None:
+        job = self._jobs[key]
+        while job.triggers:
+            # Debounce: wait until no trigger arrived for `debounce` seconds
+            while (wait := self._last_trigger[key] + self.debounce - time.monotonic()) > 0:
+                await asyncio.sleep(wait)
+
+            kwargs, job.pending_kwargs = job.pending_kwargs, {}
+            coalesced, job.triggers = job.triggers, 0
+
+            async with self._get_semaphore():
+                job.state = "running"
+                job.runs += 1
+                job.last_started = time.time()
+                start = time.perf_counter()
+                try:
+                    job.last_result = await self._funcs[key](**kwargs)
+                    job.last_error = None
+                    job.state = "done"
+                except Exception as e:
+                    job.last_error = str(e)
+                    job.state = "failed"
+                    print(f"Background job {key} failed: {e}")
+                job.last_duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            print(f"🧵 JOB {key}: {job.state} in {job.last_duration_ms} ms ({coalesced} triggers coalesced)")
+
+            if job.triggers:
+                job.state = "pending"
+
+    def status(self, key: Optional[str] = None) -> list[dict[str, Any]]:
+        """Status of one job or of all jobs."""
+        jobs = [self._jobs[key]] if key in self._jobs else [] if key else list(self._jobs.values())
+        return [job.as_dict() for job in jobs]
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for all scheduled jobs to finish (e.g. on shutdown or in scripts)."""
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+
+# Process-wide queue used by the orchestrator
+job_queue = BackgroundJobQueue()
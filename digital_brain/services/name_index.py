@@ -0,0 +1,299 @@
+# File: digital_brain/services/name_index.py
+"""
+In-process Fuzzy Name Index.
+Serves the "fuzzy" lookup strategy from GRAPH_SCHEMA_CONTRACT.md (Person, Pet)
+without `toLower(p.name) CONTAINS toLower($name)` scans on the server.
+
+Every name variant (string or LIST<STRING> `name` property) is split into
+character trigrams; a lookup only scores nodes that share one of the
+query's rarest trigrams, so it stays sub-millisecond for journal-sized
+graphs (hundreds to a couple of thousand names). Queries shorter than 3
+characters have no trigram of their own and scan the label, so substring
+recall matches the old CONTAINS lookup.
+
+Warmed from a single export query, then kept current by:
+- add()/remove() when services write or delete nodes directly
+- mark_pending() for names written by the executor, refreshed in the background
+- invalidate_for_write() when executed Cypher deletes or renames nodes
+  (write_agent merge commands delete by name, so ids are not known here):
+  a full reload runs in the background
+- a full reload every NAME_RELOAD_INTERVAL, like alias_index
+"""
+
+import asyncio
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+from ..tools.mcp_client import execute_cypher
+from .graph_schema import FUZZY_LOOKUP_LABELS
+from .text_matching import dice_similarity, normalize_name, trigrams
+
+# Trigram similarity at which a non-substring candidate counts as the same entity
+RESOLVE_THRESHOLD = 0.8
+# Seconds between background full reloads
+NAME_RELOAD_INTERVAL = 600
+
+# Cypher that can delete a node or change its name
+_DESTRUCTIVE_WRITE = re.compile(
+    r"\bDELETE\b|\bSET\s+(?:[^,\n]+,\s*)*\w+\.name\s*=|\bSET\s+\w+\s*\+?=\s*[{$]", re.IGNORECASE
+)
+
+EXPORT_NAMES_QUERY = """
+MATCH (n)
+WHERE n.name IS NOT NULL AND any(l IN labels(n) WHERE l IN $labels)
+RETURN elementId(n) AS key,
+       coalesce(n.id, 'MISSING') AS id,
+       [l IN labels(n) WHERE l IN $labels][0] AS label,
+       n.name AS name
+"""
+
+REFRESH_NAMES_QUERY = """
+UNWIND $names AS q
+MATCH (n)
+WHERE any(l IN labels(n) WHERE l IN $labels)
+  AND CASE
+      WHEN n.name IS :: LIST<STRING> THEN q IN n.name
+      ELSE n.name = q
+  END
+RETURN DISTINCT elementId(n) AS key,
+       coalesce(n.id, 'MISSING') AS id,
+       [l IN labels(n) WHERE l IN $labels][0] AS label,
+       n.name AS name
+"""
+
+
+@dataclass
+class NameRecord:
+    key: str
+    id: str
+    label: str
+    names: list[str]  # original name variants, first one is the display name
+    normalized: list[str]
+    grams: list[set[str]]
+
+
+class FuzzyNameIndex:
+    """
+    Trigram index over all name variants of fuzzy-lookup labels.
+    """
+
+    def __init__(self, labels: tuple[str, ...] = FUZZY_LOOKUP_LABELS):
+        self.labels = labels
+        self._records: dict[str, NameRecord] = {}
+        self._keys_by_id: dict[str, set[str]] = {}
+        # label -> trigram -> record keys
+        self._postings: dict[str, dict[str, set[str]]] = {label: {} for label in labels}
+        self._pending: set[str] = set()
+        self._warm = False
+        self._loaded_at = 0.0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._reload_task: Optional[asyncio.Task] = None
+
+    @property
+    def warm(self) -> bool:
+        return self._warm
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, label: str, node_id: str, names: Any, key: Optional[str] = None) -> None:
+        """Index (or re-index) one node. `names` may be a string or a list of strings."""
+        if label not in self._postings:
+            return
+        variants = [n for n in (names if isinstance(names, list) else [names]) if isinstance(n, str) and n.strip()]
+        if not variants:
+            return
+
+        key = key or node_id
+        self._unindex(key)
+
+        normalized = [normalize_name(n) for n in variants]
+        record = NameRecord(key, node_id, label, variants, normalized, [trigrams(n) for n in normalized])
+        self._records[key] = record
+        self._keys_by_id.setdefault(node_id, set()).add(key)
+        postings = self._postings[label]
+        for grams in record.grams:
+            for gram in grams:
+                postings.setdefault(gram, set()).add(key)
+
+    def remove(self, node_id: str) -> None:
+        """Drop a deleted node (e.g. after a duplicate merge)."""
+        for key in self._keys_by_id.pop(node_id, set()):
+            self._unindex(key)
+
+    def _unindex(self, key: str) -> None:
+        record = self._records.pop(key, None)
+        if record is None:
+            return
+        keys = self._keys_by_id.get(record.id)
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_id[record.id]
+        postings = self._postings[record.label]
+        for grams in record.grams:
+            for gram in grams:
+                bucket = postings.get(gram)
+                if bucket:
+                    bucket.discard(key)
+                    if not bucket:
+                        del postings[gram]
+
+    def lookup(self, label: str, name: str, limit: int = 5, min_score: float = 0.3) -> list[dict[str, Any]]:
+        """
+        Ranked candidates for a name within one label.
+
+        Scoring: exact variant match = 1.0; a variant containing the query
+        (the old CONTAINS semantics) = 0.9 + 0.1 * similarity; otherwise the
+        trigram Dice similarity of the best variant.
+
+        Returns:
+            [{"id": "...", "name": "...", "type": "Person", "score": 0.93}, ...]
+        """
+        postings = self._postings.get(label)
+        query = normalize_name(name)
+        if not postings or not query:
+            return []
+
+        query_grams = trigrams(query)
+
+        # A candidate must share `required` trigrams to reach min_score
+        # (dice >= min_score needs >= min_score * |q| / 2 shared trigrams) or to
+        # contain the query (at most 3 boundary trigrams differ). By pigeonhole it
+        # then shares one of the |q| - required + 1 rarest query trigrams, so only
+        # those posting lists are probed.
+        required = max(1, min(math.ceil(min_score * len(query_grams) / 2), len(query_grams) - 3))
+        if len(query) < 3:
+            # Every trigram of a 1-2 character query touches its padding, so a
+            # name containing it mid-word shares none: scan the label instead
+            # (the old CONTAINS semantics; short queries are rare)
+            candidates = {key for key, record in self._records.items() if record.label == label}
+        else:
+            rarest = sorted(query_grams, key=lambda gram: len(postings.get(gram, ())))
+            candidates = set()
+            for gram in rarest[:len(query_grams) - required + 1]:
+                candidates.update(postings.get(gram, ()))
+
+        scored = []
+        for key in candidates:
+            record = self._records[key]
+            best = 0.0
+            for variant, grams in zip(record.normalized, record.grams):
+                similarity = dice_similarity(query_grams, grams)
+                if variant == query:
+                    score = 1.0
+                elif query in variant:
+                    score = 0.9 + 0.1 * similarity
+                else:
+                    score = similarity
+                best = max(best, score)
+            if best >= min_score:
+                scored.append((best, record))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {"id": record.id, "name": record.names[0], "type": record.label, "score": round(score, 3)}
+            for score, record in scored[:limit]
+        ]
+
+    def resolve(self, label: str, name: str) -> Optional[dict[str, Any]]:
+        """
+        Best candidate if it is confidently the same entity, else None.
+        Exact and substring matches qualify, as does trigram Dice >= RESOLVE_THRESHOLD.
+        """
+        candidates = self.lookup(label, name, limit=1, min_score=RESOLVE_THRESHOLD)
+        return candidates[0] if candidates else None
+
+    def nodes(self, label: str) -> list[tuple[str, list[str]]]:
+        """All indexed (id, name variants) pairs of one label."""
+        return [(r.id, r.names) for r in self._records.values() if r.label == label]
+
+    def _apply(self, records: list[dict]) -> None:
+        for r in records:
+            self.add(r.get("label"), r.get("id"), r.get("name"), key=r.get("key"))
+
+    async def load(self) -> None:
+        """Warm the whole index from a single export query."""
+        records = await execute_cypher(EXPORT_NAMES_QUERY, {"labels": list(self.labels)})
+        self._records.clear()
+        self._keys_by_id.clear()
+        self._postings = {label: {} for label in self.labels}
+        self._apply(records)
+        self._warm = True
+        self._loaded_at = time.monotonic()
+        print(f"🔤 Name index warmed: {len(self._records)} nodes ({', '.join(self.labels)})")
+
+    async def _reload_in_background(self) -> None:
+        try:
+            await self.load()
+        except Exception as e:
+            print(f"Name index reload failed: {e}")
+
+    def _schedule_reload(self) -> None:
+        if self._reload_task is not None and not self._reload_task.done():
+            return
+        try:
+            self._reload_task = asyncio.get_running_loop().create_task(self._reload_in_background())
+        except RuntimeError:
+            self._loaded_at = 0.0  # No running loop: reloaded on next ensure_warm()
+
+    def invalidate_for_write(self, queries: list[str]) -> bool:
+        """
+        Reload in the background if executed queries deleted or renamed nodes.
+
+        Returns:
+            True if a reload was scheduled
+        """
+        if not self._warm or not any(_DESTRUCTIVE_WRITE.search(q or "") for q in queries):
+            return False
+        self._schedule_reload()
+        return True
+
+    def mark_pending(self, names: list[str]) -> None:
+        """
+        Queue names just written by the executor and refresh them in the background.
+        """
+        self._pending.update(n for n in names if n)
+        if not self._pending or not self._warm:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_pending())
+            except RuntimeError:
+                pass  # No running loop: flushed on next ensure_warm()
+
+    async def _flush_pending(self) -> None:
+        while self._pending:
+            names = list(self._pending)
+            self._pending.clear()
+            try:
+                records = await execute_cypher(REFRESH_NAMES_QUERY, {"names": names, "labels": list(self.labels)})
+                self._apply(records)
+            except Exception as e:
+                print(f"Name index refresh failed: {e}")
+                return
+
+    async def ensure_warm(self) -> bool:
+        """
+        Warm the index on first use.
+
+        Returns:
+            True if the index can answer lookups
+        """
+        if not self._warm:
+            try:
+                await self.load()
+            except Exception as e:
+                print(f"Name index warm-up failed: {e}")
+                return False
+        elif time.monotonic() - self._loaded_at >= NAME_RELOAD_INTERVAL:
+            self._schedule_reload()
+        if self._pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_pending())
+        return True
+
+
+# Process-wide index shared by the resolver and the consistency checker
+name_index = FuzzyNameIndex()
@@ -0,0 +1,194 @@
+# File: digital_brain/services/query_executor.py
+"""
+Deterministic Query Executor.
+Runs a turn's `queries_output` without the executor_agent LLM hop.
+
+- Pre-flight: the query_sanitizer safety checks run on every query first;
+  a blocked query sends the whole turn back to executor_agent, which can
+  rewrite it from the sanitizer's guidance
+- Transaction: compiler-generated queries (CompiledQueries: deterministic
+  ids, every parameter known, at most one top-level final RETURN) are
+  composed into ONE Cypher statement of sequential unit subqueries
+  (`CALL { ... }`) with namespaced parameters, sent in one
+  write_neo4j_cypher call, so the turn commits atomically in one round trip
+- Sequential: write_agent queries (their RETURNs carry randomUUID ids),
+  queries that cannot be composed (schema commands, CALL IN TRANSACTIONS,
+  more than one embed_text) and a composite the server rejected run one
+  by one in order over the pooled connection. JournalEntry writes without
+  an embed_text get the journal text, so the entry is embedded
+- A composite whose outcome is unknown (transport error, unreadable
+  reply) is NOT replayed: it may have committed
+"""
+
+import json
+import re
+from typing import Any, Optional
+from ..callbacks.query_sanitizer import is_unsafe_delete
+from ..tools.mcp_client import MCPError, _records_from_result, call_mcp_tool
+from .degree_service import extract_node_ids
+from .history_cache import history_cache
+
+# String literals are matched first so a `$` inside one is left alone
+_PARAM = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|\$(\w+)""")
+_RETURN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+_FINAL_RETURN = re.compile(r"\bRETURN\b(?:(?!\bRETURN\b|[{}]).)*$", re.IGNORECASE | re.DOTALL)
+_NOT_COMPOSABLE = re.compile(
+    r"\bIN\s+TRANSACTIONS\b|\b(?:CREATE|DROP)\s+(?:INDEX|CONSTRAINT)\b|\bUNION\b|\bUSING\s+PERIODIC\b",
+    re.IGNORECASE
+)
+
+_JOURNAL_WRITE = re.compile(r"\b(?:CREATE|MERGE)\s*\(\s*\w*\s*:\s*JournalEntry\b", re.IGNORECASE)
+
+# Parameter filled by the MCP server from embed_text; shared, never namespaced
+EMBEDDING_PARAM = "embedding"
+
+
+def _as_dict(params: Any) -> dict:
+    if isinstance(params, str):
+        try:
+            params = json.loads(params)
+        except json.JSONDecodeError:
+            return {}
+    return params if isinstance(params, dict) else {}
+
+
+def _params_in(query: str) -> set[str]:
+    return {m.group(2) for m in _PARAM.finditer(query) if m.group(2)}
+
+
+def _composable(query: str, query_params: dict) -> bool:
+    """Every parameter is known and the only RETURN is the top-level final one."""
+    if _NOT_COMPOSABLE.search(query):
+        return False
+    if not _params_in(query) <= set(query_params) | {EMBEDDING_PARAM}:
+        return False
+    returns = len(_RETURN.findall(query))
+    return returns == 0 or (returns == 1 and _FINAL_RETURN.search(query) is not None)
+
+
+def _definitely_rejected(error: Exception) -> bool:
+    """True if the server refused the statement, so nothing was committed."""
+    return isinstance(error, MCPError) and error.status is not None and 400 <= error.status < 500
+
+
+def compose_transaction(
+    queries: list[str],
+    params: list[dict]
+) -> Optional[tuple[str, dict]]:
+    """
+    Compose queries into one statement of sequential unit subqueries.
+
+    Each query's final RETURN is dropped (unit subqueries keep the single
+    outer row, so every subquery runs exactly once, in order) and its
+    parameters are renamed to $q<i>_<name>. Only compiler-generated queries
+    should be composed: their ids are known up front, so nothing is lost
+    with the RETURN.
+
+    Returns:
+        (statement, merged params), or None if some query cannot be composed
+    """
+    parts, merged = [], {}
+    for i, (query, query_params) in enumerate(zip(queries, params)):
+        if not _composable(query, query_params):
+            return None
+        body = _FINAL_RETURN.sub("", query.strip()).strip()
+        if not body:
+            return None
+        body = _PARAM.sub(
+            lambda m: m.group(0) if m.group(1) or m.group(2) == EMBEDDING_PARAM else f"$q{i}_{m.group(2)}",
+            body
+        )
+        parts.append(f"CALL {{\n{body}\n}}")
+        merged.update({f"q{i}_{name}": value for name, value in query_params.items()})
+    parts.append(f"RETURN {len(queries)} AS statements")
+    return "\n".join(parts), merged
+
+
+def _ids_from_records(records: list[dict]) -> list[str]:
+    return [
+        value for record in records for key, value in record.items()
+        if isinstance(value, str) and (key == "id" or key.endswith("_id"))
+    ]
+
+
+async def execute_queries(queries_output: dict, journal_text: Optional[str] = None) -> Optional[dict[str, Any]]:
+    """
+    Execute a turn's queries deterministically.
+
+    Args:
+        queries_output: QueriesOutput / CompiledQueries dict
+        journal_text: embed_text for JournalEntry writes that have none
+
+    Returns:
+        {"success": True, "mode": "transaction", "statements": 5,
+         "node_ids": [...], "error": None}
+        or None when pre-flight blocked a query (run executor_agent instead)
+    """
+    queries = list(queries_output.get("queries") or [])
+    params = [_as_dict(p) for p in (queries_output.get("params") or [])]
+    params += [{}] * (len(queries) - len(params))
+    embed_texts = list(queries_output.get("embed_texts") or [])
+    embed_texts += [None] * (len(queries) - len(embed_texts))
+
+    result = {"success": True, "mode": "transaction", "statements": len(queries), "node_ids": [], "error": None}
+    if not queries:
+        return result
+
+    # Pre-flight: same checks as query_sanitizer_callback
+    blocked = [q for q in queries if is_unsafe_delete(q)]
+    if blocked:
+        print(f"🛑 EXECUTOR pre-flight blocked {len(blocked)} unsafe queries, handing over to executor_agent")
+        return None
+
+    node_ids = list(queries_output.get("node_ids") or []) + extract_node_ids(queries)
+    distinct_embeds = {t for t in embed_texts if t}
+    compiled = "keys" in queries_output  # CompiledQueries; write_agent output has no keys
+    composed = compose_transaction(queries, params) if compiled and len(distinct_embeds) <= 1 else None
+
+    if composed:
+        statement, merged = composed
+        arguments = {"query": statement, "params": json.dumps(merged)}
+        if distinct_embeds:
+            arguments["embed_text"] = distinct_embeds.pop()
+        try:
+            response = await call_mcp_tool("write_neo4j_cypher", arguments)
+        except Exception as e:
+            if not _definitely_rejected(e):
+                # The transaction may have committed: replaying could write twice
+                result.update(success=False, node_ids=list(dict.fromkeys(node_ids)), error=f"Transaction outcome unknown: {e or type(e).__name__}")
+                history_cache.invalidate_for_write(queries, result["node_ids"])
+                print(f"❌ EXECUTOR: {result['error']}")
+                return result
+            response = {"isError": True, "content": [{"text": str(e)}]}
+        if not response.get("isError"):
+            result["node_ids"] = list(dict.fromkeys(node_ids))
+            history_cache.invalidate_for_write(queries, result["node_ids"])
+            print(f"⚡ EXECUTOR: {len(queries)} queries in one transaction")
+            return result
+        # The server refused or rolled back the statement: safe to replay one by one
+        print(f"⚠️ Composite transaction rejected, executing sequentially: {(response.get('content') or [{}])[0].get('text')}")
+
+    result["mode"] = "sequential"
+    for i, (query, query_params, embed_text) in enumerate(zip(queries, params, embed_texts)):
+        arguments = {"query": query}
+        if query_params:
+            arguments["params"] = json.dumps(query_params)
+        embed_text = embed_text or (journal_text if _JOURNAL_WRITE.search(query) else None)
+        if embed_text:
+            arguments["embed_text"] = embed_text
+        try:
+            response = await call_mcp_tool("write_neo4j_cypher", arguments)
+        except Exception as e:
+            response = {"isError": True, "content": [{"text": str(e)}]}
+        if response.get("isError"):
+            result["success"] = False
+            result["error"] = f"Query {i + 1}/{len(queries)} failed: {(response.get('content') or [{}])[0].get('text')}"
+            print(f"❌ EXECUTOR: {result['error']}")
+            break
+        node_ids += _ids_from_records(_records_from_result(response))
+
+    result["node_ids"] = list(dict.fromkeys(node_ids))
+    # Also after a partial failure: the queries before it are committed
+    history_cache.invalidate_for_write(queries, result["node_ids"])
+    print(f"⚡ EXECUTOR: {len(queries)} queries sequentially (success={result['success']})")
+    return result
@@ -0,0 +1,66 @@
+# File: digital_brain/services/schema_setup.py
+"""
+One-time Schema Setup.
+Index creation is a schema write, so it never runs on a read path: the
+SchemaSetupPlugin creates the service indexes once per process, in the
+background, when the runner handles its first invocation. Every statement
+is `IF NOT EXISTS`, so re-running is a no-op.
+
+Run manually: python -m digital_brain.services.schema_setup
+"""
+
+import asyncio
+from typing import Optional
+from google.adk.plugins.base_plugin import BasePlugin
+from ..tools.mcp_client import execute_cypher_many
+from .alias_index import ALIAS_CREATED_AT_INDEX
+from .degree_service import degree_index_statements
+
+
+def schema_statements() -> list[str]:
+    """Indexes the services rely on (alias watermark, degree range scans)."""
+    return [ALIAS_CREATED_AT_INDEX.strip()] + degree_index_statements()
+
+
+async def ensure_indexes() -> int:
+    """
+    Create missing indexes.
+
+    Returns:
+        Number of statements that failed
+    """
+    statements = schema_statements()
+    results = await execute_cypher_many(statements, tool_name="write_neo4j_cypher")
+    failed = 0
+    for statement, result in zip(statements, results):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"⚠️ Index creation failed ({statement}): {result}")
+    print(f"🗂️ Schema setup: {len(statements) - failed}/{len(statements)} indexes ensured")
+    return failed
+
+
+class SchemaSetupPlugin(BasePlugin):
+    """
+    Runs ensure_indexes() once, in the background, on the first invocation.
+    """
+
+    def __init__(self, name: str = "schema_setup"):
+        super().__init__(name=name)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        try:
+            await ensure_indexes()
+        except Exception as e:
+            print(f"⚠️ Schema setup failed: {e}")
+
+    async def before_run_callback(self, *, invocation_context) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return None
+
+
+if __name__ == "__main__":
+    from ..tools.mcp_client import run_with_mcp_client
+    asyncio.run(run_with_mcp_client(ensure_indexes()))
@@ -0,0 +1,133 @@
+# File: digital_brain/services/session_events.py
+"""
+Append-only session event store with incremental compaction.
+session.events only grows between WRITE turns. The old cleanup rescanned the
+whole list, logged every removed event and rebuilt it, so its cost grew with
+the session's age on every WRITE turn.
+
+The store treats the list as two segments:
+
+    [ compacted: user / response turns only | tail: appended since last compaction ]
+
+Only the tail is scanned. Each event in it is tagged once as kept (user input,
+final responses) or internal (router, extractor, retriever, writer, executor,
+tool calls), and the tail is spliced in place. The compacted segment is never
+rescanned. Its size is bounded by a window: once it overflows by a whole
+segment, the oldest events are evicted in one slice and their user messages
+are folded into a rolling summary kept in state. Per-turn work is
+O(new events), plus amortized O(1) per event for eviction.
+
+The offset and the id of the last compacted event are kept in session state.
+If the list no longer matches (for example, a session service reloaded it
+from storage), the next compaction rescans it once.
+
+Configuration: DIGITAL_BRAIN_HISTORY_WINDOW (kept events),
+DIGITAL_BRAIN_HISTORY_SUMMARY_CHARS (rolling summary size).
+"""
+import logging
+import os
+from typing import Any, MutableMapping
+
+logger = logging.getLogger(__name__)
+
+KEPT_AUTHORS = frozenset({"user", "response_agent", "digital_brain_orchestrator"})
+WINDOW_EVENTS = int(os.getenv("DIGITAL_BRAIN_HISTORY_WINDOW", 40))
+SEGMENT_EVENTS = max(1, WINDOW_EVENTS // 2)  # Evict in slices of this size, not one event per turn
+SUMMARY_MAX_CHARS = int(os.getenv("DIGITAL_BRAIN_HISTORY_SUMMARY_CHARS", 4000))
+SUMMARY_LINE_CHARS = 200
+
+STORE_KEY = "event_store"
+SUMMARY_KEY = "history_summary"
+
+event_store_stats = {"compactions": 0, "scanned": 0, "removed": 0, "evicted": 0, "rescans": 0}
+
+
+def is_internal(event: Any) -> bool:
+    """Sub-agent events and tool calls are internal; user input and final responses are kept."""
+    if event.author not in KEPT_AUTHORS:
+        return True
+    try:
+        return bool(event.get_function_calls())
+    except (AttributeError, TypeError):
+        return False
+
+
+def event_text(event: Any) -> str:
+    content = getattr(event, "content", None)
+    parts = getattr(content, "parts", None) or []
+    return "".join(part.text for part in parts if getattr(part, "text", None))
+
+
+class SessionEventStore:
+    """
+    Compaction of one session's event list; the offset is persisted in state.
+    """
+
+    def __init__(self, events: list, state: MutableMapping[str, Any]):
+        self.events = events
+        self.state = state
+        meta = state.get(STORE_KEY) or {}
+        self.compacted = meta.get("compacted", 0)
+        self.last_id = meta.get("last_id")
+
+    def _resume_offset(self) -> int:
+        """Start of the uncompacted tail; 0 (full rescan) if the list changed under us."""
+        offset = self.compacted
+        if offset == 0:
+            return 0
+        if offset <= len(self.events) and getattr(self.events[offset - 1], "id", None) == self.last_id:
+            return offset
+        event_store_stats["rescans"] += 1
+        logger.info("🧹 EventStore: event list changed since last compaction, rescanning")
+        return 0
+
+    def compact(self) -> dict[str, int]:
+        """
+        Drop internal events from the tail and trim the kept window.
+
+        Returns:
+            {"scanned", "removed", "evicted", "kept"} for this compaction
+        """
+        start = self._resume_offset()
+        tail = self.events[start:]
+        kept = [event for event in tail if not is_internal(event)]
+        removed = len(tail) - len(kept)
+        if removed:
+            self.events[start:] = kept  # Splice the tail only; the compacted segment is not touched
+        evicted = self._trim_window()
+        self._checkpoint()
+
+        event_store_stats["compactions"] += 1
+        event_store_stats["scanned"] += len(tail)
+        event_store_stats["removed"] += removed
+        event_store_stats["evicted"] += evicted
+        return {"scanned": len(tail), "removed": removed, "evicted": evicted, "kept": len(self.events)}
+
+    def _trim_window(self) -> int:
+        overflow = len(self.events) - WINDOW_EVENTS
+        if overflow < SEGMENT_EVENTS:
+            return 0
+        evicted = self.events[:overflow]
+        del self.events[:overflow]
+        self._summarize(evicted)
+        return overflow
+
+    def _summarize(self, evicted: list) -> None:
+        """Fold evicted user messages into the rolling summary (newest lines win)."""
+        lines = []
+        for event in evicted:
+            text = event_text(event).strip().replace("\n", " ") if event.author == "user" else ""
+            if text:
+                lines.append(f"- {text[:SUMMARY_LINE_CHARS]}")
+        if not lines:
+            return
+        summary = "\n".join(filter(None, [self.state.get(SUMMARY_KEY) or "", *lines]))
+        if len(summary) > SUMMARY_MAX_CHARS:
+            cut = summary.find("\n", len(summary) - SUMMARY_MAX_CHARS)
+            summary = summary[cut + 1:] if cut != -1 else summary[-SUMMARY_MAX_CHARS:]
+        self.state[SUMMARY_KEY] = summary
+
+    def _checkpoint(self) -> None:
+        self.compacted = len(self.events)
+        self.last_id = getattr(self.events[-1], "id", None) if self.events else None
+        self.state[STORE_KEY] = {"compacted": self.compacted, "last_id": self.last_id}
@@ -0,0 +1,95 @@
+# File: digital_brain/services/speculation.py
+"""
+Speculative Entity Extraction (opt-in).
+Starts entity_extractor (and optionally entity resolution) while
+router_agent is still deciding, since both read the same `current_thoughts`.
+
+The extractor's events are buffered, not yielded, so nothing reaches the
+session until the orchestrator commits them:
+- WRITE: buffered events are replayed (state_delta applies entity_output)
+- SKIP / CLARIFY: the run is cancelled (or its result dropped)
+
+Enable with DIGITAL_BRAIN_SPECULATIVE_EXTRACTION=1, and additionally
+DIGITAL_BRAIN_SPECULATIVE_RESOLUTION=1 to resolve entities speculatively.
+Hit / waste counters in `speculation_stats` weigh saved latency against
+the extra LLM spend of discarded runs.
+"""
+
+import asyncio
+import os
+from typing import Any, Optional
+
+SPECULATIVE_EXTRACTION = os.getenv("DIGITAL_BRAIN_SPECULATIVE_EXTRACTION", "0") == "1"
+SPECULATIVE_RESOLUTION = os.getenv("DIGITAL_BRAIN_SPECULATIVE_RESOLUTION", "0") == "1"
+
+speculation_stats = {
+    "started": 0,
+    "hits": 0,  # WRITE turns that used the speculative result
+    "wasted": 0,  # non-WRITE turns whose extraction already finished (LLM call paid)
+    "cancelled": 0,  # non-WRITE turns cancelled while the extraction was in flight
+    "failed": 0,  # speculative runs that errored (WRITE falls back to a normal run)
+}
+
+
+class SpeculativeExtraction:
+    """
+    One speculative extractor run for the current turn.
+    """
+
+    def __init__(self, extractor, ctx, resolve: bool = SPECULATIVE_RESOLUTION):
+        self.extractor = extractor
+        self.ctx = ctx
+        self.resolve = resolve
+        self.events: list = []
+        self.entity_output: Optional[dict] = None
+        self.resolution: Optional[dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "SpeculativeExtraction":
+        speculation_stats["started"] += 1
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self) -> None:
+        async for event in self.extractor.run_async(self.ctx):
+            self.events.append(event)
+            delta = getattr(getattr(event, "actions", None), "state_delta", None) or {}
+            if delta.get(self.extractor.output_key):
+                self.entity_output = delta[self.extractor.output_key]
+
+        if self.resolve and self.entity_output:
+            from .entity_resolver import resolve_entities
+            self.resolution = await resolve_entities(self.entity_output)
+
+    async def commit(self) -> Optional[list]:
+        """
+        Wait for the speculative run and return its buffered events,
+        or None if it failed (the caller then runs the extractor normally).
+        """
+        try:
+            await self._task
+        except Exception as e:
+            speculation_stats["failed"] += 1
+            print(f"⚠️ Speculative extraction failed, running extractor normally: {e}")
+            return None
+        speculation_stats["hits"] += 1
+        self._report("hit")
+        return self.events
+
+    def discard(self) -> None:
+        """Drop the run on SKIP / CLARIFY; nothing it produced is yielded."""
+        if self._task is None:
+            return
+        if self._task.done():
+            speculation_stats["wasted"] += 1
+            if not self._task.cancelled():
+                self._task.exception()  # Mark a failure as retrieved
+        else:
+            self._task.cancel()
+            speculation_stats["cancelled"] += 1
+        self._report("discarded")
+
+    def _report(self, outcome: str) -> None:
+        s = speculation_stats
+        print(f"🔮 SPECULATION {outcome}: {s['hits']} hits, {s['wasted']} wasted, "
+              f"{s['cancelled']} cancelled, {s['failed']} failed of {s['started']} started")
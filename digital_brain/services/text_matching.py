@@ -0,0 +1,87 @@
+# File: digital_brain/services/text_matching.py
+"""
+Name normalization and similarity helpers shared by the in-process indexes.
+"""
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a name the same way the Cypher lookups did (toLower)."""
+    return " ".join(name.lower().split())
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Character trigrams of a normalized name, padded at word boundaries
+    so short names (1-2 chars) still produce trigrams.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice_similarity(a: set[str], b: set[str]) -> float:
+    """Sørensen–Dice coefficient of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+# Ukrainian/Russian Cyrillic -> Latin, so "Саша" and "Sasha" share blocking keys
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie",
+    "ё": "e", "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k",
+    "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "iu", "я": "ia", "'": "", "ʼ": "",
+})
+
+_VOWELS = set("aeiouy")
+
+
+def transliterate(text: str) -> str:
+    """Lowercase Latin transliteration of a (possibly Cyrillic) name."""
+    return normalize_name(text).translate(_TRANSLIT)
+
+
+def phonetic_key(token: str) -> str:
+    """
+    Consonant skeleton of a transliterated token: first letter kept, later
+    vowels dropped, repeated letters collapsed ("sasha" -> "ssh", "sashko" -> "sshk").
+    """
+    if not token:
+        return ""
+    key = [token[0]]
+    for ch in token[1:]:
+        if ch in _VOWELS or ch == key[-1] or not ch.isalnum():
+            continue
+        key.append(ch)
+    return "".join(key)
+
+
+def blocking_keys(name: str, prefix_len: int = 3) -> set[str]:
+    """
+    Keys used to bucket names before pairwise comparison:
+    the transliterated prefix and the phonetic prefix of every token.
+    """
+    keys = set()
+    for token in transliterate(name).split():
+        if token:
+            keys.add(f"p:{token[:prefix_len]}")
+            keys.add(f"s:{phonetic_key(token)[:prefix_len]}")
+    return keys
+
+
+def levenshtein_similarity(a: str, b: str) -> float:
+    """1 - edit distance / longer length (same scale as apoc.text.levenshteinSimilarity)."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return 1 - previous[-1] / len(a)
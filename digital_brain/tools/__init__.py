@@ -5,14 +5,30 @@ from .neo4j_toolkit import (
     full_access_toolset,
 )
 from .mcp_client import (
+    MCPClient,
+    get_mcp_client,
+    close_mcp_client,
+    run_with_mcp_client,
+    MCPClientPlugin,
+    MCPError,
     call_mcp_tool,
+    call_mcp_tools_batch,
     execute_cypher,
+    execute_cypher_many,
 )
 
 __all__ = [
     'create_neo4j_toolset',
     'read_only_toolset', 
     'full_access_toolset',
+    'MCPClient',
+    'get_mcp_client',
+    'close_mcp_client',
+    'run_with_mcp_client',
+    'MCPClientPlugin',
+    'MCPError',
     'call_mcp_tool',
+    'call_mcp_tools_batch',
     'execute_cypher',
+    'execute_cypher_many',
 ]
@@ -3,12 +3,20 @@
 Direct MCP Client for deterministic Neo4j queries.
 Bypasses LLM agents for reliable entity existence checks.
 Includes retry logic for Cloud Run cold starts.
+
+All calls share one process-wide aiohttp session with a keep-alive
+connection pool, so sequential lookups reuse the same TCP/TLS connection
+instead of paying a fresh handshake per request.
 """
 
 import aiohttp
 import asyncio
+import itertools
 import json
 from typing import Any
+from google.adk.plugins.base_plugin import BasePlugin
+from ..callbacks.rate_limiter import rate_limits
+from .projection_rewriter import rewrite_projections
 
 DEFAULT_MCP_URL = "https://mcp-neo4j-cypher-858161250402.us-central1.run.app/api/mcp/"
 
@@ -16,88 +24,225 @@ DEFAULT_MCP_URL = "https://mcp-neo4j-cypher-858161250402.us-central1.run.app/api
 MAX_RETRIES = 4
 INITIAL_DELAY = 5  # seconds
 
+# Connection pool configuration
+POOL_SIZE = 10  # max simultaneous connections to the MCP endpoint
+DNS_CACHE_TTL = 300  # seconds to cache resolved Cloud Run addresses
+KEEPALIVE_TIMEOUT = 60  # seconds an idle connection stays in the pool
+REQUEST_TIMEOUT = 30  # seconds per request
 
-async def call_mcp_tool(
-    tool_name: str,
-    arguments: dict[str, Any],
-    url: str = DEFAULT_MCP_URL,
-    max_retries: int = MAX_RETRIES,
-    initial_delay: int = INITIAL_DELAY
-) -> dict[str, Any]:
+MCP_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream"
+}
+
+
+class MCPClient:
     """
-    Call an MCP tool directly via HTTP POST with retry logic.
-    
-    Args:
-        tool_name: Name of the MCP tool (e.g., 'read_neo4j_cypher')
-        arguments: Tool arguments as a dictionary
-        url: MCP server endpoint
-        max_retries: Maximum number of retry attempts
-        initial_delay: Initial delay between retries (doubles each attempt)
-    
-    Returns:
-        Tool response as a dictionary
+    Lifecycle-managed HTTP client for the MCP endpoint.
+
+    Owns a single aiohttp.ClientSession backed by a pooled TCPConnector.
+    The session is created lazily on first use and re-created if the
+    running event loop changes (e.g. separate asyncio.run() calls in scripts).
+    """
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        dns_cache_ttl: int = DNS_CACHE_TTL,
+        keepalive_timeout: int = KEEPALIVE_TIMEOUT,
+        request_timeout: int = REQUEST_TIMEOUT
+    ):
+        self.pool_size = pool_size
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _is_usable(self) -> bool:
+        return (
+            self._session is not None
+            and not self._session.closed
+            and self._loop is asyncio.get_running_loop()
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use."""
+        if self._is_usable():
+            return self._session
+
+        if self._session is not None and not self._session.closed:
+            # Session belongs to a previous (possibly closed) event loop
+            try:
+                await self._session.close()
+            except Exception:
+                pass
+
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            headers=MCP_HEADERS,
+        )
+        self._loop = asyncio.get_running_loop()
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and release all pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self) -> "MCPClient":
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+# Process-wide default client shared by execute_cypher and the services
+_default_client: MCPClient | None = None
+
+
+def get_mcp_client() -> MCPClient:
+    """Return the process-wide MCP client (created on first call)."""
+    global _default_client
+    if _default_client is None:
+        _default_client = MCPClient()
+    return _default_client
+
+
+async def close_mcp_client() -> None:
+    """Close the process-wide MCP client. Call on application shutdown."""
+    global _default_client
+    if _default_client is not None:
+        await _default_client.close()
+        _default_client = None
+
+
+async def run_with_mcp_client(coro: Any) -> Any:
+    """Await a coroutine, then close the process-wide MCP client (for scripts)."""
+    try:
+        return await coro
+    finally:
+        await close_mcp_client()
+
+
+class MCPClientPlugin(BasePlugin):
+    """
+    Closes the process-wide MCP client when the runner shuts down
+    (Runner.close() -> plugin close()), so the pooled connections are released.
     """
-    payload = {
+
+    def __init__(self, name: str = "mcp_client_lifecycle"):
+        super().__init__(name=name)
+
+    async def close(self) -> None:
+        await close_mcp_client()
+
+
+class MCPError(Exception):
+    """Error returned by the MCP server (JSON-RPC error or tool isError result)."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status  # HTTP status for transport-level rejections
+
+
+# read_neo4j_cypher calls: total, rewritten to projections, rewrites the
+# server rejected, and response payload bytes
+projection_stats = {"reads": 0, "rewritten": 0, "fallbacks": 0, "response_bytes": 0}
+
+# Unique JSON-RPC request ids so responses can be matched in batches
+_request_ids = itertools.count(1)
+
+# None = not probed yet, True/False = whether the server accepts JSON-RPC batches
+_batch_supported: bool | None = None
+
+
+def _tool_call_payload(tool_name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    """Build a tools/call JSON-RPC request with a fresh id."""
+    return {
         "jsonrpc": "2.0",
-        "id": 1,
+        "id": next(_request_ids),
         "method": "tools/call",
         "params": {
             "name": tool_name,
             "arguments": arguments
         }
     }
-    
+
+
+def _parse_rpc_messages(text: str) -> list[dict[str, Any]]:
+    """
+    Parse JSON-RPC messages from an SSE or plain JSON response body.
+    Batch responses (JSON arrays) are flattened into a single list.
+    """
+    messages = []
+
+    # Try to parse as SSE (Server-Sent Events)
+    # Look for lines starting with "data:"
+    for line in text.splitlines():
+        if line.strip().startswith("data:"):
+            try:
+                parsed = json.loads(line.strip()[5:].strip())
+            except json.JSONDecodeError:
+                continue
+            messages.extend(parsed if isinstance(parsed, list) else [parsed])
+
+    if messages:
+        return messages
+
+    # Fallback: Try to parse the whole body as JSON
+    # This works if the server sent JSON but with wrong mimetype,
+    # or if it's a standard JSON response.
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        raise MCPError(f"Could not parse response (first 200 chars): {text[:200]}")
+    return parsed if isinstance(parsed, list) else [parsed]
+
+
+async def _post_rpc(
+    payload: dict | list,
+    url: str,
+    max_retries: int,
+    initial_delay: int,
+    client: MCPClient
+) -> list[dict[str, Any]]:
+    """
+    POST a JSON-RPC request (or batch) with cold-start retry logic.
+
+    Returns:
+        All JSON-RPC messages found in the response body
+    """
     last_error = None
     delay = initial_delay
-    
+
     for attempt in range(max_retries + 1):
+        # Shared per-endpoint bucket: only this caller waits when over quota
+        await rate_limits.acquire(f"mcp:{url}")
         try:
-            timeout = aiohttp.ClientTimeout(total=30)  # 30 second timeout
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    url,
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Accept": "application/json, text/event-stream"
-                    }
-                ) as response:
-                    if response.status == 200:
-                        # Read raw text to bypass strict mimetype checks of response.json()
-                        text = await response.text()
-                        
-                        # Try to parse as SSE (Server-Sent Events)
-                        # Look for lines starting with "data:"
-                        for line in text.splitlines():
-                            if line.strip().startswith("data:"):
-                                try:
-                                    data_str = line.strip()[5:].strip()
-                                    result = json.loads(data_str)
-                                    if "error" in result:
-                                        raise Exception(f"MCP error: {result['error']}")
-                                    return result.get("result", {})
-                                except json.JSONDecodeError:
-                                    continue
-                        
-                        # Fallback: Try to parse the whole body as JSON
-                        # This works if the server sent JSON but with wrong mimetype,
-                        # or if it's a standard JSON response.
-                        try:
-                            result = json.loads(text)
-                            if "error" in result:
-                                raise Exception(f"MCP error: {result['error']}")
-                            return result.get("result", {})
-                        except json.JSONDecodeError:
-                            raise Exception(f"Could not parse response (first 200 chars): {text[:200]}")
-
-                    elif response.status in [502, 503, 504]:
-                        # Cold start or temporary unavailability
-                        error_text = await response.text()
-                        raise aiohttp.ClientError(f"Server warming up ({response.status}): {error_text}")
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"MCP call failed ({response.status}): {error_text}")
-                        
+            session = await client.get_session()
+            async with session.post(url, json=payload) as response:
+                if response.status == 200:
+                    # Read raw text to bypass strict mimetype checks of response.json()
+                    return _parse_rpc_messages(await response.text())
+                elif response.status in [502, 503, 504]:
+                    # Cold start or temporary unavailability
+                    error_text = await response.text()
+                    raise aiohttp.ClientError(f"Server warming up ({response.status}): {error_text}")
+                else:
+                    error_text = await response.text()
+                    raise MCPError(f"MCP call failed ({response.status}): {error_text}", status=response.status)
+
         except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
             last_error = e
             if attempt < max_retries:
@@ -107,31 +252,169 @@ async def call_mcp_tool(
             else:
                 print(f"❌ MCP call failed after {max_retries} retries: {e}")
                 raise
-        except Exception as e:
-            # Non-retryable error
-            raise
-    
-    raise last_error or Exception("MCP call failed with unknown error")
 
+    raise last_error or MCPError("MCP call failed with unknown error")
+
+
+async def _call_tool(
+    tool_name: str,
+    arguments: dict[str, Any],
+    url: str,
+    max_retries: int,
+    initial_delay: int,
+    client: MCPClient
+) -> dict[str, Any]:
+    payload = _tool_call_payload(tool_name, arguments)
+    messages = await _post_rpc(payload, url, max_retries, initial_delay, client)
+
+    for message in messages:
+        if message.get("id") not in (payload["id"], None):
+            continue
+        if "error" in message:
+            raise MCPError(f"MCP error: {message['error']}")
+        if "result" in message:
+            return message["result"]
+
+    return {}
 
-async def execute_cypher(query: str, params: dict = None) -> list[dict]:
+
+def _response_bytes(result: dict[str, Any]) -> int:
+    """Size of the text payload of a tool result."""
+    content = result.get("content") if isinstance(result, dict) else None
+    if not isinstance(content, list):
+        return 0
+    return sum(len(part.get("text", "").encode("utf-8")) for part in content if isinstance(part, dict))
+
+
+async def call_mcp_tool(
+    tool_name: str,
+    arguments: dict[str, Any],
+    url: str = DEFAULT_MCP_URL,
+    max_retries: int = MAX_RETRIES,
+    initial_delay: int = INITIAL_DELAY,
+    client: MCPClient | None = None
+) -> dict[str, Any]:
     """
-    Execute a Cypher query directly via MCP with retry logic.
-    
+    Call an MCP tool directly via HTTP POST with retry logic.
+
+    Read queries that return whole nodes are rewritten to embedding-free
+    map projections first (see projection_rewriter); if the server rejects
+    the rewrite, the original query is sent instead.
+
     Args:
-        query: Cypher query string
-        params: Query parameters
-    
+        tool_name: Name of the MCP tool (e.g., 'read_neo4j_cypher')
+        arguments: Tool arguments as a dictionary
+        url: MCP server endpoint
+        max_retries: Maximum number of retry attempts
+        initial_delay: Initial delay between retries (doubles each attempt)
+        client: MCP client to send through (defaults to the process-wide client)
+
     Returns:
-        List of result records
+        Tool response as a dictionary
     """
-    arguments = {"query": query}
-    if params:
-        arguments["params"] = params  # Pass dict directly, not JSON string!
-    
-    result = await call_mcp_tool("read_neo4j_cypher", arguments)
-    
-    # Parse the result content
+    client = client or get_mcp_client()
+    if tool_name != "read_neo4j_cypher":
+        return await _call_tool(tool_name, arguments, url, max_retries, initial_delay, client)
+
+    projection_stats["reads"] += 1
+    rewrite = rewrite_projections(arguments.get("query") or "")
+    if rewrite:
+        query, variables = rewrite
+        try:
+            result = await _call_tool(tool_name, {**arguments, "query": query}, url, max_retries, initial_delay, client)
+            error = (result.get("content") or [{}])[0].get("text") if result.get("isError") else None
+        except MCPError as e:
+            error = str(e)
+        if error is None:
+            projection_stats["rewritten"] += 1
+            projection_stats["response_bytes"] += _response_bytes(result)
+            print(f"✂️ PROJECTION: returned {', '.join(variables)} without embeddings")
+            return result
+        projection_stats["fallbacks"] += 1
+        print(f"↩️ PROJECTION: rewrite rejected, sending original query: {str(error)[:120]}")
+
+    result = await _call_tool(tool_name, arguments, url, max_retries, initial_delay, client)
+    projection_stats["response_bytes"] += _response_bytes(result)
+    return result
+
+
+async def call_mcp_tools_batch(
+    calls: list[tuple[str, dict[str, Any]]],
+    url: str = DEFAULT_MCP_URL,
+    max_retries: int = MAX_RETRIES,
+    initial_delay: int = INITIAL_DELAY,
+    client: MCPClient | None = None
+) -> list[dict[str, Any] | Exception]:
+    """
+    Call several MCP tools in one round trip.
+
+    Sends a JSON-RPC batch with unique ids. If the server does not accept
+    batches (HTTP 400 on the array body, or a reply that answers none of
+    the request ids), falls back to multiplexing the calls concurrently over
+    the pooled session and remembers that for the rest of the process.
+    Any other batch failure falls back for this call only.
+
+    Args:
+        calls: List of (tool_name, arguments) pairs
+        url: MCP server endpoint
+        max_retries: Maximum number of retry attempts
+        initial_delay: Initial delay between retries (doubles each attempt)
+        client: MCP client to send through (defaults to the process-wide client)
+
+    Returns:
+        One item per call, in request order: the tool result dict,
+        or the exception raised for that call.
+    """
+    global _batch_supported
+
+    if not calls:
+        return []
+
+    client = client or get_mcp_client()
+
+    if _batch_supported is not False:
+        payloads = [_tool_call_payload(name, args) for name, args in calls]
+        try:
+            messages = await _post_rpc(payloads, url, max_retries, initial_delay, client)
+        except MCPError as e:
+            if e.status == 400:
+                # 400 on an array body: the transport refuses batching
+                _batch_supported = False
+                print(f"⚠️ MCP batch rejected, falling back to concurrent requests: {e}")
+            else:
+                # Server error or unparsable reply: says nothing about batch support
+                print(f"⚠️ MCP batch failed, sending the calls individually: {e}")
+            messages = []
+        except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+            # Retries exhausted: report the transport failure against every item
+            return [e for _ in calls]
+
+        by_id = {m.get("id"): m for m in messages if m.get("id") is not None}
+        if by_id:
+            _batch_supported = True
+            results: list[dict[str, Any] | Exception] = []
+            for payload in payloads:
+                message = by_id.get(payload["id"])
+                if message is None:
+                    results.append(MCPError(f"No response for request id {payload['id']}"))
+                elif "error" in message:
+                    results.append(MCPError(f"MCP error: {message['error']}"))
+                else:
+                    results.append(message.get("result", {}))
+            return results
+
+        if messages:
+            # A reply without any of our ids (e.g. one "Invalid Request" error): no batch support
+            _batch_supported = False
+
+    return await asyncio.gather(
+        *(call_mcp_tool(name, args, url, max_retries, initial_delay, client) for name, args in calls),
+        return_exceptions=True
+    )
+
+
+def _records_from_result(result: dict[str, Any]) -> list[dict]:
+    """Extract the JSON records from a read/write tool result."""
     if isinstance(result, dict) and "content" in result:
         content = result["content"]
         if isinstance(content, list) and len(content) > 0:
@@ -140,5 +423,66 @@ async def execute_cypher(query: str, params: dict = None) -> list[dict]:
                 return json.loads(text)
             except json.JSONDecodeError:
                 return []
-    
+
     return []
+
+
+async def execute_cypher(query: str, params: dict = None, client: MCPClient | None = None) -> list[dict]:
+    """
+    Execute a Cypher query directly via MCP with retry logic.
+
+    Args:
+        query: Cypher query string
+        params: Query parameters
+        client: MCP client to send through (defaults to the process-wide client)
+
+    Returns:
+        List of result records
+    """
+    arguments = {"query": query}
+    if params:
+        arguments["params"] = params  # Pass dict directly, not JSON string!
+
+    result = await call_mcp_tool("read_neo4j_cypher", arguments, client=client)
+
+    # Parse the result content
+    return _records_from_result(result)
+
+
+async def execute_cypher_many(
+    queries: list[str | tuple[str, dict | str | None]],
+    tool_name: str = "read_neo4j_cypher",
+    client: MCPClient | None = None
+) -> list[list[dict] | Exception]:
+    """
+    Execute several Cypher queries in a single MCP round trip.
+
+    Args:
+        queries: Query strings or (query, params) pairs
+        tool_name: 'read_neo4j_cypher' or 'write_neo4j_cypher'
+        client: MCP client to send through (defaults to the process-wide client)
+
+    Returns:
+        One item per query, in request order: the list of result records,
+        or the exception for that query (errors do not fail the whole batch).
+    """
+    calls = []
+    for item in queries:
+        query, params = (item, None) if isinstance(item, str) else item
+        arguments = {"query": query}
+        if params:
+            arguments["params"] = params
+        calls.append((tool_name, arguments))
+
+    results = await call_mcp_tools_batch(calls, client=client)
+
+    records: list[list[dict] | Exception] = []
+    for result in results:
+        if isinstance(result, Exception):
+            records.append(result)
+        elif isinstance(result, dict) and result.get("isError"):
+            content = result.get("content") or [{}]
+            records.append(MCPError(content[0].get("text", "MCP tool error")))
+        else:
+            records.append(_records_from_result(result))
+    return records
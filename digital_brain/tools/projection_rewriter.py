@@ -0,0 +1,114 @@
+# File: digital_brain/tools/projection_rewriter.py
+"""
+Read-query projection rewriter.
+LLM-written read queries often return whole nodes (`RETURN n`, `RETURN e, j`),
+so Neo4j serializes every JournalEntry's 1536-float embedding, sends it over
+HTTP and Python parses it, only for the after-tool callback to strip it.
+
+rewrite_projections() turns bare node variables of the final RETURN into map
+projections without the vector:
+
+    RETURN e, j ORDER BY j.timestamp DESC
+ -> RETURN e {.*, embedding: null} AS e, j {.*, embedding: null} AS j ORDER BY j.timestamp DESC
+
+Column names are kept (AS <original>). The rewrite is conservative: only
+variables bound in a node pattern `(n ...)` or by `YIELD node` are touched,
+and queries with UNION, comments, string literals in the RETURN or any
+RETURN item it does not understand are left as they are. The MCP client
+falls back to the original query if the server rejects the rewrite.
+"""
+import re
+from typing import Optional
+
+EMBEDDING_PROPERTY = "embedding"
+
+_IDENT = r"[A-Za-z_]\w*"
+_FINAL_RETURN = re.compile(r"\bRETURN\b((?:(?!\bRETURN\b|[{}]).)*)$", re.IGNORECASE | re.DOTALL)
+_RETURN_TAIL = re.compile(r"\b(?:ORDER\s+BY|SKIP|LIMIT)\b", re.IGNORECASE)
+_EMBEDDING_ACCESS = re.compile(r"\.\s*embedding\b|\bembedding\s*:", re.IGNORECASE)
+_SKIP_QUERY = re.compile(r"\bUNION\b|//|/\*|\b(?:CREATE|MERGE|SET|DELETE|REMOVE)\b", re.IGNORECASE)
+
+_NODE_PATTERN_VAR = re.compile(rf"\(\s*({_IDENT})\s*[:{{)]")
+_YIELD_NODE = re.compile(rf"\bYIELD\s+node\b(?:\s+AS\s+({_IDENT}))?", re.IGNORECASE)
+_RELATIONSHIP_VAR = re.compile(rf"\[\s*({_IDENT})")
+_PATH_VAR = re.compile(rf"\b({_IDENT})\s*=\s*\(")
+_ALIAS_VAR = re.compile(rf"\bAS\s+({_IDENT})", re.IGNORECASE)
+
+_BARE_ITEM = re.compile(rf"^({_IDENT})(?:\s+AS\s+({_IDENT}))?$", re.IGNORECASE)
+_COLLECT_ITEM = re.compile(rf"^collect\(\s*(DISTINCT\s+)?({_IDENT})\s*\)(?:\s+AS\s+({_IDENT}))?$", re.IGNORECASE)
+
+
+def _node_variables(query: str) -> set[str]:
+    """Variables that certainly hold nodes (bound in a node pattern or YIELD node)."""
+    yielded = {m.group(1) or "node" for m in _YIELD_NODE.finditer(query)}
+    nodes = set(_NODE_PATTERN_VAR.findall(query)) | yielded
+    rebound = set(_RELATIONSHIP_VAR.findall(query)) | set(_PATH_VAR.findall(query))
+    rebound |= set(_ALIAS_VAR.findall(query)) - yielded
+    return nodes - rebound
+
+
+def _split_items(body: str) -> Optional[list[str]]:
+    """Split RETURN items on top-level commas; None if brackets do not balance."""
+    items, depth, start = [], 0, 0
+    for i, char in enumerate(body):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif char == "," and depth == 0:
+            items.append(body[start:i].strip())
+            start = i + 1
+    items.append(body[start:].strip())
+    return items if depth == 0 else None
+
+
+def _projection(variable: str) -> str:
+    return f"{variable} {{.*, {EMBEDDING_PROPERTY}: null}}"
+
+
+def rewrite_projections(query: str) -> Optional[tuple[str, list[str]]]:
+    """
+    Rewrite whole-node RETURN items into embedding-free map projections.
+
+    Returns:
+        (rewritten query, rewritten variables), or None when nothing is
+        (safely) rewritable
+    """
+    if _EMBEDDING_ACCESS.search(query) or _SKIP_QUERY.search(query):
+        return None  # The query handles embeddings itself, or is not a plain read
+    match = _FINAL_RETURN.search(query)
+    if not match or "'" in match.group(1) or '"' in match.group(1) or "`" in match.group(1):
+        return None
+
+    clause = match.group(1)
+    tail = _RETURN_TAIL.search(clause)
+    body, rest = (clause[:tail.start()], clause[tail.start():]) if tail else (clause, "")
+    distinct = re.match(r"\s*DISTINCT\b", body, re.IGNORECASE)
+    prefix = distinct.group(0) if distinct else ""
+    items = _split_items(body[len(prefix):])
+    if not items or "*" in items:
+        return None
+
+    nodes = _node_variables(query[:match.start()])
+    rewritten, variables = [], []
+    for item in items:
+        bare, collected = _BARE_ITEM.match(item), _COLLECT_ITEM.match(item)
+        if bare and bare.group(1) in nodes:
+            variable = bare.group(1)
+            rewritten.append(f"{_projection(variable)} AS {bare.group(2) or variable}")
+        elif collected and collected.group(2) in nodes:
+            variable = collected.group(2)
+            alias = collected.group(3) or f"`{item}`"
+            rewritten.append(f"collect({collected.group(1) or ''}{_projection(variable)}) AS {alias}")
+        else:
+            rewritten.append(item)
+            continue
+        variables.append(variable)
+
+    if not variables:
+        return None
+    separator = body[len(body.rstrip()):] if rest else ""  # Keep the layout before ORDER BY / SKIP / LIMIT
+    new_clause = f"{prefix} {', '.join(rewritten)}{separator}{rest.rstrip()}"
+    return f"{query[:match.start()]}RETURN{new_clause}", list(dict.fromkeys(variables))
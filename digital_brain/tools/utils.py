@@ -1,4 +1,7 @@
 import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
 
 # Retry Generator
 async def retry_generator(async_gen_func, max_retries=3, initial_delay=1):
@@ -35,4 +38,60 @@ def exit_loop_tool(context) -> str:
     Call this tool when the Cypher queries are valid and ready for execution.
     """
     context.session.state["loop_decision"] = "EXIT" 
-    return "Loop exit requested."
\ No newline at end of file
+    return "Loop exit requested."
+
+
+@dataclass
+class Stage:
+    """
+    One step of a stage graph.
+
+    func is called with the results of its dependencies as keyword arguments.
+    On timeout or error the stage yields `default` and its dependents still run.
+    """
+    func: Callable[..., Awaitable[Any]]
+    deps: tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    default: Any = None
+
+
+async def run_stage_graph(stages: dict[str, Stage]) -> dict[str, Any]:
+    """
+    Run a dependency graph of async stages.
+    Every stage starts as soon as its dependencies finish, so independent
+    stages run concurrently and wall time is the slowest dependency chain.
+
+    Args:
+        stages: Stages by name; dependencies must be declared before their dependents
+
+    Returns:
+        Result (or default) of every stage, by name
+    """
+    tasks: dict[str, asyncio.Task] = {}
+    timings: dict[str, str] = {}
+
+    async def run(name: str, stage: Stage) -> Any:
+        inputs = {dep: await tasks[dep] for dep in stage.deps}
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(stage.func(**inputs), stage.timeout)
+            timings[name] = f"{(time.perf_counter() - start) * 1000:.0f}ms"
+            return result
+        except asyncio.TimeoutError:
+            timings[name] = f"timeout after {stage.timeout}s"
+        except Exception as e:
+            timings[name] = f"failed ({e})"
+        print(f"⚠️ Stage {name} {timings[name]}, using default")
+        return stage.default
+
+    for name, stage in stages.items():
+        unknown = [dep for dep in stage.deps if dep not in tasks]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on undeclared stages: {unknown}")
+        tasks[name] = asyncio.create_task(run(name, stage))
+
+    start = time.perf_counter()
+    results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    print(f"⏱️ STAGES: {', '.join(f'{n} {t}' for n, t in timings.items())} "
+          f"(wall {(time.perf_counter() - start) * 1000:.0f}ms)")
+    return results
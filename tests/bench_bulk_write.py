@@ -0,0 +1,119 @@
+"""
+Benchmark: bulk UNWIND write vs per-statement writes, by entries per turn.
+
+Per-statement baseline: one write_neo4j_cypher call per JournalEntry,
+entity and event (the shape write_agent + executor_agent produce), each
+awaited in order. Bulk: compile_bulk_write() statements composed into one
+transaction by the query executor (entries carry precomputed
+embeddings, as with the embedding cache configured). The MCP transport is replaced by a fake
+that sleeps for a fixed round-trip time, so the numbers isolate the effect
+of the number of round trips and statements.
+
+Run: python tests/bench_bulk_write.py
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digital_brain.services import cypher_compiler, query_executor
+
+RTT_SECONDS = 0.040  # typical Cloud Run round trip from a laptop
+ENTRY_COUNTS = [1, 10, 100]
+ENTITIES_PER_ENTRY = 4
+EVENTS_PER_ENTRY = 1
+EMBEDDING_DIM = 768  # Precomputed vectors keep the bulk write in one transaction
+TYPES = ["Person", "Topic", "Pet", "Organization", "Location"]  # State needs an EXPERIENCED edge; left out
+
+round_trips = 0
+payload_bytes = 0
+
+
+async def fake_call_mcp_tool(tool_name, arguments, *args, **kwargs):
+    global round_trips, payload_bytes
+    round_trips += 1
+    payload_bytes += len(json.dumps(arguments, ensure_ascii=False).encode())
+    await asyncio.sleep(RTT_SECONDS)
+    return {"content": [{"type": "text", "text": "[]"}]}
+
+
+def make_entity_output(n):
+    return {
+        "entries": [{
+            "entry_date": f"2019-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}",
+            "mood": "calm",
+            "entities": [
+                {"type": TYPES[(i + k) % len(TYPES)], "name": f"entity_{(i * 3 + k) % 50}"}
+                for k in range(ENTITIES_PER_ENTRY)
+            ],
+            "events": [
+                {"description": f"event {i}.{k}", "type": "life_event", "timestamp": "2019-01-01", "is_clarified": True}
+                for k in range(EVENTS_PER_ENTRY)
+            ],
+        } for i in range(n)],
+        "search_query": "",
+    }
+
+
+async def per_statement_write(entity_output, contents):
+    """One call per node / relationship, awaited in order."""
+    for entry, content in zip(entity_output["entries"], contents):
+        await fake_call_mcp_tool("write_neo4j_cypher", {
+            "query": "CREATE (j:JournalEntry {id: randomUUID(), content: $content, timestamp: $ts, mood: $mood}) RETURN j.id AS id",
+            "params": json.dumps({"content": content, "ts": entry["entry_date"], "mood": entry["mood"]}),
+            "embed_text": content,
+        })
+        for entity in entry["entities"]:
+            await fake_call_mcp_tool("write_neo4j_cypher", {
+                "query": f"MATCH (j:JournalEntry {{id: $jid}}) MERGE (n:{entity['type']} {{name: $name}}) "
+                         "ON CREATE SET n.id = randomUUID() MERGE (j)-[:MENTIONS]->(n)",
+                "params": json.dumps({"jid": "id", "name": entity["name"]}),
+            })
+        for event in entry["events"]:
+            await fake_call_mcp_tool("write_neo4j_cypher", {
+                "query": "MATCH (j:JournalEntry {id: $jid}) CREATE (e:Event {id: randomUUID(), type: $type, "
+                         "description: $description}) MERGE (j)-[:DESCRIBES]->(e)",
+                "params": json.dumps({"jid": "id", "type": event["type"], "description": event["description"]}),
+            })
+
+
+async def bulk(entity_output, contents):
+    embeddings = [[0.01] * EMBEDDING_DIM for _ in contents]
+    result = await cypher_compiler.bulk_write(entity_output, [], contents, "2026-01-01 12:00:00", embeddings=embeddings)
+    assert result["success"] and result["mode"] == "transaction", result
+    return result
+
+
+async def measure(fn, entity_output, contents):
+    global round_trips, payload_bytes
+    round_trips = payload_bytes = 0
+    start = time.perf_counter()
+    await fn(entity_output, contents)
+    return round_trips, payload_bytes, (time.perf_counter() - start) * 1000
+
+
+async def main():
+    query_executor.call_mcp_tool = fake_call_mcp_tool
+
+    print(f"Simulated RTT: {RTT_SECONDS * 1000:.0f} ms, "
+          f"{ENTITIES_PER_ENTRY} entities + {EVENTS_PER_ENTRY} event per entry")
+    print(f"{'entries':>7} | {'per-stmt trips':>14} | {'per-stmt ms':>11} | {'bulk trips':>10} | "
+          f"{'bulk stmts':>10} | {'bulk ms':>7} | {'bulk KB':>7}")
+    print("-" * 86)
+    for n in ENTRY_COUNTS:
+        entity_output = make_entity_output(n)
+        contents = [f"Journal entry number {i}. " * 20 for i in range(n)]
+        legacy_trips, _, legacy_ms = await measure(per_statement_write, entity_output, contents)
+        compiled = cypher_compiler.compile_bulk_write(
+            entity_output, [], contents, "2026-01-01 12:00:00", embeddings=[[0.01] * EMBEDDING_DIM for _ in contents]
+        )
+        bulk_trips, bulk_bytes, bulk_ms = await measure(bulk, entity_output, contents)
+        print(f"{n:>7} | {legacy_trips:>14} | {legacy_ms:>11.1f} | {bulk_trips:>10} | "
+              f"{len(compiled['queries']):>10} | {bulk_ms:>7.1f} | {bulk_bytes / 1024:>7.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
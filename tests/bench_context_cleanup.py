@@ -0,0 +1,116 @@
+"""
+Benchmark: WRITE-turn history cleanup cost vs session length.
+
+Legacy: the previous clean_context_after_write body (full scan, id set,
+preview of every removed event, whole-list replacement). Store:
+SessionEventStore.compact(), which scans only events appended since the
+last compaction and keeps a bounded window plus a rolling summary.
+
+A WRITE turn appends one user message, internal sub-agent events (router,
+extractor, retriever with tool calls, writer, executor) and a response.
+Sessions are grown turn by turn; the cost of the last turn's cleanup is
+reported at each length.
+
+Run: python tests/bench_context_cleanup.py
+"""
+import logging
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digital_brain.services.session_events import SessionEventStore
+
+TURNS = [10, 100, 1000, 5000]
+INTERNAL_AUTHORS = ["router_agent", "entity_extractor", "context_retriever", "context_retriever",
+                    "cypher_writer", "executor_agent"]
+REPEATS = 5
+
+logger = logging.getLogger("bench")
+
+
+class Part:
+    def __init__(self, text):
+        self.text = text
+
+
+class Content:
+    def __init__(self, text):
+        self.parts = [Part(text)]
+
+    def __str__(self):
+        return f"parts=[Part(text={self.parts[0].text!r})]"
+
+
+class Event:
+    def __init__(self, author, text, calls=False):
+        self.id = uuid.uuid4().hex
+        self.author = author
+        self.content = Content(text)
+        self._calls = calls
+
+    def get_function_calls(self):
+        return ["call"] if self._calls else []
+
+
+def write_turn(i):
+    events = [Event("user", f"Сьогодні говорив з мамою про роботу #{i}. " * 3)]
+    events += [Event(author, "{\"entities\": []} " * 20, calls=(k % 2 == 1)) for k, author in enumerate(INTERNAL_AUTHORS)]
+    events.append(Event("response_agent", "Дякую, що поділився. " * 5))
+    return events
+
+
+def legacy_clean(history):
+    """Previous clean_context_after_write (logging at INFO, discarded)."""
+    last_user_idx = -1
+    for i in range(len(history) - 1, -1, -1):
+        if history[i].author == "user":
+            last_user_idx = i
+            break
+    allowed_authors = {"user", "response_agent", "digital_brain_orchestrator"}
+    clean_history = [e for e in history if e.author in allowed_authors and not e.get_function_calls()]
+    kept_ids = {id(e) for e in clean_history}
+    for event in history[last_user_idx:]:
+        if id(event) not in kept_ids:
+            preview = str(event.content)[:150].replace('\n', ' ')
+            logger.info(f"❌ Removing [{event.author}]: {preview}...")
+    history[:] = clean_history
+
+
+def session_at(turns, clean):
+    """Grow a session to `turns` WRITE turns; returns (events, state) before the last cleanup."""
+    events, state = [], {}
+    for i in range(turns - 1):
+        events.extend(write_turn(i))
+        clean(events, state)
+    events.extend(write_turn(turns))
+    return events, state
+
+
+def timed(turns, clean):
+    best = float("inf")
+    for _ in range(REPEATS):
+        events, state = session_at(turns, clean)
+        start = time.perf_counter()
+        clean(events, state)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6, len(events)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+    legacy = lambda events, state: legacy_clean(events)
+    store = lambda events, state: SessionEventStore(events, state).compact()
+
+    print(f"{'turns':>6} | {'legacy us':>10} | {'legacy events':>13} | {'store us':>9} | {'store events':>12}")
+    print("-" * 64)
+    for turns in TURNS:
+        legacy_us, legacy_len = timed(turns, legacy)
+        store_us, store_len = timed(turns, store)
+        print(f"{turns:>6} | {legacy_us:>10.1f} | {legacy_len:>13} | {store_us:>9.1f} | {store_len:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: entity resolution round trips and latency vs entity count.
+
+Compares the legacy per-entity loop (alias lookup + type lookup, awaited
+one after another) with the bulk UNWIND resolver. The MCP transport is
+replaced by a fake that sleeps for a fixed round-trip time, so the numbers
+isolate the effect of the number of round trips.
+
+Run: python tests/bench_entity_resolution.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digital_brain.services import alias_index, entity_resolver, name_index
+
+RTT_SECONDS = 0.040  # typical Cloud Run round trip from a laptop
+ENTITY_COUNTS = [1, 5, 10, 25, 50]
+TYPES = ["Person", "Topic", "State", "Organization", "Event"]
+
+round_trips = 0
+
+
+async def fake_execute_cypher(query, params=None):
+    global round_trips
+    round_trips += 1
+    await asyncio.sleep(RTT_SECONDS)
+    return []
+
+
+async def fake_execute_cypher_many(queries, tool_name="read_neo4j_cypher"):
+    global round_trips
+    round_trips += 1
+    await asyncio.sleep(RTT_SECONDS)
+    return [[] for _ in queries]
+
+
+async def legacy_resolve(entity_output):
+    """Shape of the pre-bulk resolver: two sequential queries per entity."""
+    for entry in entity_output["entries"]:
+        for entity in entry["entities"]:
+            await fake_execute_cypher("alias", {"name": entity["name"]})
+            await fake_execute_cypher("lookup", {"name": entity["name"]})
+
+
+def make_entity_output(n):
+    return {
+        "entries": [{
+            "entry_date": "2025-12-08",
+            "mood": "calm",
+            "entities": [{"type": TYPES[i % len(TYPES)], "name": f"entity_{i}"} for i in range(n)],
+            "events": [],
+        }],
+        "search_query": "",
+    }
+
+
+async def measure(fn, entity_output):
+    global round_trips
+    round_trips = 0
+    start = time.perf_counter()
+    await fn(entity_output)
+    return round_trips, (time.perf_counter() - start) * 1000
+
+
+async def main():
+    entity_resolver.execute_cypher_many = fake_execute_cypher_many
+    alias_index.execute_cypher = fake_execute_cypher
+    alias_index.execute_cypher_many = fake_execute_cypher_many
+    name_index.execute_cypher = fake_execute_cypher
+    await alias_index.alias_index.load()  # one-off warm-ups, not part of a turn
+    await name_index.name_index.load()
+
+    print(f"Simulated RTT: {RTT_SECONDS * 1000:.0f} ms")
+    print(f"{'entities':>8} | {'legacy trips':>12} | {'legacy ms':>9} | {'bulk trips':>10} | {'bulk ms':>7}")
+    print("-" * 60)
+    for n in ENTITY_COUNTS:
+        entity_output = make_entity_output(n)
+        legacy_trips, legacy_ms = await measure(legacy_resolve, entity_output)
+        bulk_trips, bulk_ms = await measure(entity_resolver.resolve_entities, entity_output)
+        print(f"{n:>8} | {legacy_trips:>12} | {legacy_ms:>9.1f} | {bulk_trips:>10} | {bulk_ms:>7.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
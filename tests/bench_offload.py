@@ -0,0 +1,64 @@
+"""
+Benchmark: event loop lag while after-tool processing runs, inline vs offloaded.
+
+Eight concurrent 5 MB read_neo4j_cypher responses (see bench_tool_response)
+go through transform_response inline on the loop, through the bounded thread
+pool, and through the process pool. loop_lag probes the loop every 10 ms
+meanwhile; lag is how late those probes wake up, i.e. how long every other
+session on the process would have been stalled.
+
+Run: python tests/bench_offload.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tool_response import make_records, text_response
+from digital_brain.callbacks import offload
+from digital_brain.callbacks.response_transformer import transform_response
+
+RESPONSES = 8
+RESPONSE_MB = 5
+
+
+async def inline(response):
+    return transform_response(response)
+
+
+async def run(mode, responses):
+    if mode == "thread":
+        offload.OFFLOAD_THRESHOLD_BYTES, offload.PROCESS_THRESHOLD_BYTES = 256 * 1024, 0
+    elif mode == "process":
+        offload.OFFLOAD_THRESHOLD_BYTES = offload.PROCESS_THRESHOLD_BYTES = 256 * 1024
+        # Start the worker before measuring (spawn imports the package once)
+        await asyncio.get_running_loop().run_in_executor(offload._executor("process"), offload._transform_in_process, {})
+    transform = inline if mode == "inline" else offload.transform_response_offloaded
+
+    monitor = offload.LoopLagMonitor(interval=0.01)
+    monitor.ensure_started()
+    await asyncio.sleep(0.05)
+    monitor.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(transform(r) for r in responses))
+    wall = (time.perf_counter() - start) * 1000
+    await asyncio.sleep(0.02)
+    monitor.stop()
+    return wall, monitor.metrics()
+
+
+async def main():
+    responses = [text_response(make_records(RESPONSE_MB * 1024 * 1024)) for _ in range(RESPONSES)]
+    print(f"{RESPONSES} x {RESPONSE_MB} MB responses, loop probed every 10 ms")
+    print(f"{'mode':>8} | {'wall ms':>8} | {'lag p50 ms':>10} | {'lag p99 ms':>10} | {'lag max ms':>10}")
+    print("-" * 58)
+    for mode in ("inline", "thread", "process"):
+        wall, lag = await run(mode, responses)
+        print(f"{mode:>8} | {wall:>8.0f} | {lag['p50_ms']:>10.1f} | {lag['p99_ms']:>10.1f} | {lag['max_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Benchmark: bytes transferred per retriever turn, whole nodes vs projections.
+
+A retriever turn is modeled as the entity-history reads context_retriever
+writes (`MATCH (e {id: $entity_id})-[r]-(j:JournalEntry) RETURN e, j ...`)
+for a few entities. The MCP transport is replaced by a fake that serializes
+rows the way the Neo4j MCP server does (node -> property map), including a
+1536-float embedding on every JournalEntry unless the query projects it out.
+A third run has the fake reject projections to exercise the fallback.
+
+Run: python tests/bench_projection_rewrite.py
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digital_brain.tools import mcp_client
+from digital_brain.tools.projection_rewriter import rewrite_projections
+
+EMBEDDING_DIM = 1536
+ENTITIES_PER_TURN = 3
+ENTRIES_PER_ENTITY = 3
+HISTORY_QUERY = """
+MATCH (e {id: $entity_id})-[r]-(j:JournalEntry)
+RETURN e, j
+ORDER BY j.timestamp DESC
+LIMIT 3
+"""
+
+rng = random.Random(7)
+reject_projections = False
+
+
+def journal_entry(i):
+    return {
+        "id": f"entry-{i}",
+        "content": "Сьогодні говорив з мамою про роботу, відчуваю тривогу. " * 4,
+        "timestamp": f"2025-06-{1 + i % 28:02d} 21:00:00",
+        "mood": "тривога",
+        "embedding": [round(rng.uniform(-1, 1), 8) for _ in range(EMBEDDING_DIM)],
+    }
+
+
+async def fake_call_tool(tool_name, arguments, *args, **kwargs):
+    query = arguments["query"]
+    projected = "embedding: null" in query
+    if projected and reject_projections:
+        return {"isError": True, "content": [{"type": "text", "text": "Neo.ClientError.Statement.SyntaxError"}]}
+    rows = []
+    for i in range(ENTRIES_PER_ENTITY):
+        entry = journal_entry(i)
+        if projected:
+            entry["embedding"] = None
+        rows.append({"e": {"id": "person-1", "name": "Мама", "relation": "mother", "degree": 42}, "j": entry})
+    return {"content": [{"type": "text", "text": json.dumps(rows)}], "isError": False}
+
+
+async def retriever_turn(query):
+    """Bytes and rewrite counters for one turn of entity-history reads."""
+    mcp_client.projection_stats.update(reads=0, rewritten=0, fallbacks=0, response_bytes=0)
+    for k in range(ENTITIES_PER_TURN):
+        await mcp_client.call_mcp_tool("read_neo4j_cypher", {"query": query, "params": {"entity_id": f"person-{k}"}})
+    return dict(mcp_client.projection_stats)
+
+
+async def main():
+    global reject_projections
+    mcp_client._call_tool = fake_call_tool
+
+    print("Rewritten query:")
+    print(rewrite_projections(HISTORY_QUERY)[0].strip())
+    print()
+
+    mcp_client.rewrite_projections = lambda query: None  # Baseline: rewrite disabled
+    before = await retriever_turn(HISTORY_QUERY)
+    mcp_client.rewrite_projections = rewrite_projections
+    after = await retriever_turn(HISTORY_QUERY)
+    reject_projections = True
+    fallback = await retriever_turn(HISTORY_QUERY)
+
+    print(f"{'run':>10} | {'reads':>5} | {'rewritten':>9} | {'fallbacks':>9} | {'KB per turn':>11}")
+    print("-" * 58)
+    for name, stats in (("original", before), ("projected", after), ("fallback", fallback)):
+        print(f"{name:>10} | {stats['reads']:>5} | {stats['rewritten']:>9} | {stats['fallbacks']:>9} | "
+              f"{stats['response_bytes'] / 1024:>11.1f}")
+    print(f"\nReduction: {before['response_bytes'] / after['response_bytes']:.0f}x fewer bytes per retriever turn")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
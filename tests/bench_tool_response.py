@@ -0,0 +1,136 @@
+"""
+Benchmark: after-tool response processing, legacy vs single pass.
+
+Legacy: the previous combined_after_tool_callback body (str() of the whole
+response, a deepcopy + rebuild for embedding stripping, another for unicode
+normalization, an uncompiled regex per string). Single pass:
+response_transformer.transform_response().
+
+Responses are realistic read_neo4j_cypher results of 1-5 MB: JournalEntry
+nodes with Ukrainian content (JSON-escaped as \\uXXXX, emoji as surrogate
+pairs) and a 1536-float embedding each, in both shapes the callback sees:
+the MCP text payload (one big JSON string) and parsed records.
+CPU time via time.process_time(), peak memory via tracemalloc.
+
+Run: python tests/bench_tool_response.py
+"""
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digital_brain.callbacks.response_transformer import transform_response
+
+SIZES_MB = [1, 2, 5]
+EMBEDDING_DIM = 1536
+REPEATS = 3
+CONTENT = "Сьогодні говорив з мамою про роботу, відчуваю тривогу 😟 але і полегшення. "
+
+
+def legacy_transform(tool_response):
+    """Previous combined_after_tool_callback processing (rate limiting omitted)."""
+    modified_response = tool_response
+
+    def remove_embeddings(obj):
+        if isinstance(obj, dict):
+            return {k: remove_embeddings(v) for k, v in obj.items() if k.lower() != 'embedding'}
+        elif isinstance(obj, list):
+            return [remove_embeddings(item) for item in obj]
+        elif isinstance(obj, str):
+            pattern = r"(?:\\?['\"])embedding(?:\\?['\"])\s*:\s*\[.*?\]"
+            if "embedding" in obj:
+                obj = re.sub(pattern, r'"embedding": [<stripped_vector>]', obj, flags=re.DOTALL | re.IGNORECASE)
+            return obj
+        return obj
+
+    def normalize_unicode(obj):
+        if isinstance(obj, dict):
+            return {k: normalize_unicode(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [normalize_unicode(item) for item in obj]
+        elif isinstance(obj, str):
+            if "\\u" in obj:
+                try:
+                    def repl(m):
+                        return m.group(0).encode('utf-8').decode('unicode_escape')
+                    res = re.sub(r'(\\u[0-9a-fA-F]{4})+', repl, obj)
+                    return res.encode('utf-16', 'surrogatepass').decode('utf-16')
+                except Exception:
+                    return obj
+            return obj
+        return obj
+
+    response_str = str(tool_response)
+    if 'embedding' in response_str.lower():
+        modified_response = remove_embeddings(deepcopy(modified_response))
+    if '\\u' in response_str:
+        modified_response = normalize_unicode(deepcopy(modified_response))
+    return modified_response
+
+
+def single_pass(tool_response):
+    return transform_response(tool_response)[0]
+
+
+def make_records(target_bytes):
+    rng = random.Random(42)
+    records, size, i = [], 0, 0
+    while size < target_bytes:
+        record = {"j": {
+            "id": f"entry-{i}",
+            "content": CONTENT * rng.randint(2, 8),
+            "timestamp": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "mood": "тривога",
+            "embedding": [round(rng.uniform(-1, 1), 6) for _ in range(EMBEDDING_DIM)],
+        }, "people": ["Мама", "Саша"]}
+        size += len(json.dumps(record))
+        records.append(record)
+        i += 1
+    return records
+
+
+def text_response(records):
+    """MCP tool result: records serialized (ASCII-escaped) in one text part."""
+    return {"content": [{"type": "text", "text": json.dumps(records)}], "isError": False}
+
+
+def parsed_response(records):
+    """Records as structured data, string fields still carrying escapes."""
+    escaped = json.loads(json.dumps(records).replace("\\\\", "\\\\\\\\").replace("\\u", "\\\\u"))
+    return {"result": escaped}
+
+
+def measure(fn, response):
+    cpu = []
+    for _ in range(REPEATS):
+        start = time.process_time()
+        fn(response)
+        cpu.append(time.process_time() - start)
+    tracemalloc.start()
+    result = fn(response)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(cpu) * 1000, peak / 1024 / 1024, result
+
+
+def main():
+    print(f"{'shape':>6} | {'MB':>4} | {'legacy ms':>9} | {'legacy peak MB':>14} | "
+          f"{'1-pass ms':>9} | {'1-pass peak MB':>14} | {'same output':>11}")
+    print("-" * 86)
+    for mb in SIZES_MB:
+        records = make_records(mb * 1024 * 1024)
+        for shape, response in (("text", text_response(records)), ("parsed", parsed_response(records))):
+            legacy_ms, legacy_peak, legacy_out = measure(legacy_transform, response)
+            new_ms, new_peak, new_out = measure(single_pass, response)
+            print(f"{shape:>6} | {mb:>4} | {legacy_ms:>9.1f} | {legacy_peak:>14.1f} | "
+                  f"{new_ms:>9.1f} | {new_peak:>14.1f} | {str(legacy_out == new_out):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Regression tests for blocking-key duplicate detection
+(consistency_checker.block_duplicate_candidates).
+
+Run: PYTHONPATH=. python -m pytest -q tests/test_duplicate_blocking.py
+"""
+
+from digital_brain.services.consistency_checker import CONTAINS, EXACT, SIMILAR, block_duplicate_candidates
+
+
+def _pairs(nodes):
+    duplicates, _ = block_duplicate_candidates(nodes)
+    return {(d["id_a"], d["id_b"]): d for d in duplicates}
+
+
+def test_lower_id_swap_does_not_rebind_the_anchor():
+    # '3' sorts before '5': the swap for the (5, 3) pair used to replace the
+    # block's anchor with node 3, so 5/7 was never compared
+    for nodes in (
+        [("5", "Sasha"), ("3", "Sasuhu"), ("7", "Sasha")],
+        [("3", "Sasuhu"), ("5", "Sasha"), ("7", "Sasha")],
+        [("7", "Sasha"), ("5", "Sasha"), ("3", "Sasuhu")],
+    ):
+        pairs = _pairs(nodes)
+        assert ("5", "7") in pairs, nodes
+        assert pairs[("5", "7")]["match"] == EXACT
+        assert pairs[("5", "7")]["name_a"] == "Sasha" and pairs[("5", "7")]["name_b"] == "Sasha"
+
+
+def test_pairs_keep_lower_id_first_with_its_own_name():
+    pairs = _pairs([("b", "Олександр"), ("a", "Олександр Петренко")])
+    assert pairs[("a", "b")]["name_a"] == "Олександр Петренко"
+    assert pairs[("a", "b")]["match"] == CONTAINS
+
+
+def test_similarity_only_pairs_are_marked_for_rule_4():
+    pairs = _pairs([("1", "Sasha"), ("2", "Саша")])  # Equal only after transliteration
+    assert pairs[("1", "2")]["match"] == SIMILAR
+
+
+if __name__ == "__main__":
+    test_lower_id_swap_does_not_rebind_the_anchor()
+    test_pairs_keep_lower_id_first_with_its_own_name()
+    test_similarity_only_pairs_are_marked_for_rule_4()
+    print("OK")
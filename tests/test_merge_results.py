@@ -0,0 +1,62 @@
+"""
+Regression tests for merge results and merge ordering
+(consistency_checker._deleted_count, consistency_checker._disjoint_pass,
+consistency_checker._delete_duplicate_query).
+
+Run: PYTHONPATH=. python -m pytest -q tests/test_merge_results.py
+"""
+
+import json
+
+from digital_brain.services.consistency_checker import (
+    MERGE_RELATIONSHIP_TYPES,
+    _delete_duplicate_query,
+    _deleted_count,
+    _disjoint_pass,
+)
+from digital_brain.tools.mcp_client import _records_from_result
+
+
+def _tool_result(payload):
+    return {"content": [{"type": "text", "text": json.dumps(payload)}]}
+
+
+def test_write_counters_dict():
+    # write_neo4j_cypher replies with its counters, not with records
+    counters = {"nodes_deleted": 1, "relationships_deleted": 3, "properties_set": 2}
+    assert _deleted_count(_records_from_result(_tool_result(counters))) == 1
+    assert _deleted_count(_records_from_result(_tool_result({"properties_set": 0}))) == 0
+
+
+def test_records_list():
+    assert _deleted_count(_records_from_result(_tool_result([{"deleted": 1}]))) == 1
+    assert _deleted_count(_records_from_result(_tool_result([{"deleted": 0}]))) == 0
+    assert _deleted_count(_records_from_result(_tool_result([]))) == 0
+
+
+def test_overlapping_pairs_go_to_later_passes():
+    # (A keeps B) and (B keeps C) must not run in the same unordered batch
+    pairs = [{"id_a": "A", "id_b": "B"}, {"id_a": "B", "id_b": "C"},
+             {"id_a": "A", "id_b": "D"}, {"id_a": "E", "id_b": "F"}]
+    batch, rest = _disjoint_pass(pairs)
+    assert batch == [pairs[0], pairs[3]]
+    assert rest == [pairs[1], pairs[2]]
+    batch, rest = _disjoint_pass(rest)
+    assert batch == [pairs[1], pairs[2]] and rest == []
+
+
+def test_merge_moves_journal_history_before_deleting():
+    query = _delete_duplicate_query("Topic")
+    assert {"MENTIONS", "DESCRIBES", "EXPERIENCED"} <= set(MERGE_RELATIONSHIP_TYPES)
+    for rel_type in MERGE_RELATIONSHIP_TYPES:
+        assert f"MERGE (source)-[:{rel_type}]->(keep)" in query
+        assert f"MERGE (keep)-[:{rel_type}]->(target)" in query
+    assert query.index("MERGE (source)-[:MENTIONS]->(keep)") < query.index("DETACH DELETE remove")
+
+
+if __name__ == "__main__":
+    test_write_counters_dict()
+    test_records_list()
+    test_overlapping_pairs_go_to_later_passes()
+    test_merge_moves_journal_history_before_deleting()
+    print("OK")
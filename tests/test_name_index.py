@@ -0,0 +1,46 @@
+"""
+Regression tests for substring recall of the fuzzy name index
+(name_index.FuzzyNameIndex.lookup), which replaced the server-side
+`toLower(p.name) CONTAINS toLower($name)` lookup.
+
+Run: PYTHONPATH=. python -m pytest -q tests/test_name_index.py
+"""
+
+from digital_brain.services.name_index import FuzzyNameIndex
+
+
+def _index():
+    index = FuzzyNameIndex()
+    index.add("Person", "p1", "Оля")
+    index.add("Person", "p2", ["Олександр Петренко", "Саша"])
+    index.add("Pet", "d1", "Барсик")
+    return index
+
+
+def _ids(results):
+    return {r["id"] for r in results}
+
+
+def test_short_queries_match_inside_words():
+    index = _index()
+    assert "p1" in _ids(index.lookup("Person", "ля"))
+    assert "p2" in _ids(index.lookup("Person", "ш"))
+    assert _ids(index.lookup("Pet", "ар")) == {"d1"}
+
+
+def test_longer_queries_match_inside_words():
+    index = _index()
+    assert "p2" in _ids(index.lookup("Person", "лексан"))
+    assert "p2" in _ids(index.lookup("Person", "тренко"))
+    assert "d1" in _ids(index.lookup("Pet", "арси"))
+
+
+def test_short_queries_stay_within_the_label():
+    assert _ids(_index().lookup("Person", "ар")) == set()
+
+
+if __name__ == "__main__":
+    test_short_queries_match_inside_words()
+    test_longer_queries_match_inside_words()
+    test_short_queries_stay_within_the_label()
+    print("OK")